@@ -0,0 +1,239 @@
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+# ==========================
+# Benchmark das Operações
+# ==========================
+# Gera dados sintéticos em um diretório temporário e executa as funções do menu
+# sem interação: input() é respondido por um roteiro, time.sleep é neutralizado e
+# a saída do print é descartada. Para cada escala informa latência (p50, p95 e
+# p99), vazão e pico de memória de cada operação, e pode comparar com uma base
+# salva anteriormente para tornar visíveis as regressões e as melhorias.
+#
+# Uso:
+#   python benchmark.py --escalas 100:1000:2000,1000:10000:20000 --salvar-base base.json
+#   python benchmark.py --escalas 100:1000:2000,1000:10000:20000 --comparar base.json
+ESCALAS_PADRAO = "100:1000:2000,1000:10000:20000"
+REPETICOES_PADRAO = 50
+
+_sleep_original = time.sleep
+
+
+class Roteiro:
+    """Substituto de input(): devolve as respostas na ordem e encerra a paginação das listagens."""
+
+    def __init__(self, *respostas):
+        self.respostas = list(respostas)
+
+    def __call__(self, mensagem=""):
+        if "↩️" in mensagem:
+            return "q"
+        if not self.respostas:
+            raise RuntimeError(f"Roteiro sem resposta para: {mensagem!r}")
+        return self.respostas.pop(0)
+
+
+@contextlib.contextmanager
+def sem_interacao(*respostas):
+    """Executa o bloco com input() roteirizado e print() descartado."""
+    input_original = builtins.input
+    builtins.input = Roteiro(*respostas)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = input_original
+
+def medir(funcao, preparar, repeticoes):
+    """Executa funcao(*preparar()) 'repeticoes' vezes e retorna as latências em segundos.
+        preparar() monta os argumentos fora da medição e retorna (args, respostas do input).
+    """
+    latencias = []
+    for _ in range(repeticoes):
+        args, respostas = preparar()
+        with sem_interacao(*respostas):
+            inicio = time.perf_counter()
+            funcao(*args)
+            latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def pico_memoria(funcao, preparar):
+    """Pico de memória alocada (bytes) durante uma execução da operação."""
+    args, respostas = preparar()
+    with sem_interacao(*respostas):
+        tracemalloc.start()
+        try:
+            funcao(*args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def resumir(latencias, memoria):
+    return {
+        "n": len(latencias),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "vazao_ops_s": len(latencias) / sum(latencias) if sum(latencias) else float("inf"),
+        "pico_memoria_kb": memoria / 1024,
+    }
+
+# ===========================
+# Operações Medidas
+# ===========================
+def operacoes_benchmark(main, persistencia, rng):
+    """Lista de (nome, função, preparar) para as operações do menu."""
+    alunos, _ = persistencia.carregar_usuarios()
+    eventos, _ = persistencia.carregar_eventos()
+    ids_alunos = list(alunos)
+    contador = {"registro": 0}
+    inscritos = []
+
+    def sem_args():
+        return (), ()
+
+    def recarregar():
+        persistencia.limpar_cache()
+        persistencia.carregar_eventos()
+
+    def salvar():
+        eventos_atuais, inscricoes = persistencia.carregar_eventos()
+        persistencia.salvar_eventos(eventos_atuais, inscricoes)
+
+    def preparar_login():
+        aluno = alunos[rng.choice(ids_alunos)]
+        return (), (aluno["email"],)
+
+    def preparar_registro():
+        contador["registro"] += 1
+        return (), (f"Novo Aluno {contador['registro']}", f"novo.benchmark{contador['registro']}@exemplo.com",
+                    "aluno", "ADS")
+
+    def preparar_filtragem():
+        evento = rng.choice(eventos)
+        return (), (evento["nome"].split()[0] + " " + evento["nome"].split()[-1],)
+
+    def registro_aluno(id_aluno):
+        # O menu recebe o registro do aluno (resolvido pela sessão), não só o ID.
+        return persistencia.carregar_usuarios()[0][id_aluno]
+
+    def preparar_inscricao():
+        eventos_atuais, inscricoes = persistencia.carregar_eventos()
+        while True:
+            indice = rng.randrange(len(eventos_atuais))
+            evento = eventos_atuais[indice]
+            id_aluno = rng.choice(ids_alunos)
+            if inscricoes.ocupacao(evento["id"]) < evento["vagas"] and not inscricoes.esta_inscrito(evento["id"], id_aluno):
+                inscritos.append(id_aluno)
+                return (registro_aluno(id_aluno),), (str(indice + 1), "s")
+
+    def preparar_cancelamento():
+        _, inscricoes = persistencia.carregar_eventos()
+        while inscritos:
+            id_aluno = inscritos.pop()
+            if inscricoes.do_aluno(id_aluno):
+                return (registro_aluno(id_aluno),), ("s", "1")
+        id_aluno = next(a for a in ids_alunos if inscricoes.do_aluno(a))
+        return (registro_aluno(id_aluno),), ("s", "1")
+
+    return [
+        ("carregar_eventos (frio)", recarregar, sem_args),
+        ("carregar_eventos (cache)", persistencia.carregar_eventos, sem_args),
+        ("salvar_eventos", salvar, sem_args),
+        ("autenticar_usuario", main.autenticar_usuario, preparar_login),
+        ("registrar_usuario", main.registrar_usuario, preparar_registro),
+        ("filtragem_evento", main.filtragem_evento, preparar_filtragem),
+        ("inscricao_evento", main.inscricao_evento, preparar_inscricao),
+        ("cancelamento", main.visualizar_inscricoes_aluno, preparar_cancelamento),
+        ("atualizar_status_eventos", main.atualizar_status_eventos, sem_args),
+    ]
+
+def executar_escala(eventos_n, alunos_n, inscricoes_n, repeticoes, backend, semente):
+    """Gera os dados de uma escala em um diretório temporário e mede todas as operações."""
+    from gerar_dados import gerar_dados
+    diretorio_original = os.getcwd()
+    temporario = tempfile.mkdtemp(prefix="benchmark_eventos_")
+    try:
+        os.chdir(temporario)
+        gerar_dados("data", eventos_n, alunos_n, inscricoes_n, semente=semente)
+        import persistencia
+        import main
+        if backend != "json":
+            persistencia.migrar("json", backend)
+        persistencia.usar_backend(backend)
+        time.sleep = lambda segundos: None
+        rng = random.Random(semente)
+        resultados = {}
+        for nome, funcao, preparar in operacoes_benchmark(main, persistencia, rng):
+            latencias = medir(funcao, preparar, repeticoes)
+            resultados[nome] = resumir(latencias, pico_memoria(funcao, preparar))
+        return resultados
+    finally:
+        time.sleep = _sleep_original
+        os.chdir(diretorio_original)
+        shutil.rmtree(temporario, ignore_errors=True)
+
+# =====================
+# Relatório e Base
+# =====================
+def imprimir(escala, resultados, base=None):
+    print(f"\n📊 Escala {escala} (eventos:alunos:inscrições)")
+    cabecalho = "{:<28} {:>6} {:>10} {:>10} {:>10} {:>12} {:>12}".format(
+        "Operação", "n", "p50 ms", "p95 ms", "p99 ms", "ops/s", "pico KB")
+    if base:
+        cabecalho += " {:>10}".format("Δ p50")
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for nome, r in resultados.items():
+        linha = "{:<28} {:>6} {:>10.3f} {:>10.3f} {:>10.3f} {:>12.1f} {:>12.1f}".format(
+            nome, r["n"], r["p50_ms"], r["p95_ms"], r["p99_ms"], r["vazao_ops_s"], r["pico_memoria_kb"])
+        anterior = (base or {}).get(nome)
+        if anterior and anterior["p50_ms"]:
+            linha += " {:>+9.1f}%".format((r["p50_ms"] / anterior["p50_ms"] - 1) * 100)
+        print(linha)
+
+def ler_escalas(texto):
+    escalas = []
+    for parte in texto.split(","):
+        eventos_n, alunos_n, inscricoes_n = (int(valor) for valor in parte.split(":"))
+        escalas.append((eventos_n, alunos_n, inscricoes_n))
+    return escalas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das operações do Sistema de Gerenciamento de Eventos")
+    parser.add_argument("--escalas", default=ESCALAS_PADRAO,
+                        help=f"lista de EVENTOS:ALUNOS:INSCRICOES separadas por vírgula (padrão: {ESCALAS_PADRAO})")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO, help="execuções por operação")
+    parser.add_argument("--backend", choices=["json", "sqlite", "fragmentado"], default="json")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar-base", metavar="ARQUIVO", help="grava os resultados como base de comparação")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="compara os resultados com uma base salva")
+    args = parser.parse_args()
+
+    base = {}
+    if args.comparar:
+        with open(args.comparar, "r") as f:
+            base = json.load(f)
+    todos = {}
+    for eventos_n, alunos_n, inscricoes_n in ler_escalas(args.escalas):
+        escala = f"{eventos_n}:{alunos_n}:{inscricoes_n}"
+        todos[escala] = executar_escala(eventos_n, alunos_n, inscricoes_n, args.repeticoes, args.backend, args.semente)
+        imprimir(escala, todos[escala], base.get(escala))
+    if args.salvar_base:
+        with open(args.salvar_base, "w") as f:
+            json.dump(todos, f, indent=4)
+        print(f"\n✅ Resultados salvos em '{args.salvar_base}'.")
@@ -0,0 +1,61 @@
+import json
+import marshal
+import struct
+import zlib
+
+# ================================
+# Codificação dos Snapshots
+# ================================
+# Formatos em que os snapshots (eventos.json, alunos.json, coordenadores.json e o
+# índice de emails) podem ser gravados:
+#   - "json":          JSON indentado, legível (o formato original);
+#   - "json-compacto": JSON sem indentação nem espaços;
+#   - "binario":       cabeçalho fixo + conteúdo em marshal, bem mais rápido de
+#                      ler e gravar e menor em disco.
+# A leitura reconhece o formato pelo próprio conteúdo, então arquivos em formatos
+# diferentes convivem e a troca de formato não exige conversão prévia. Os dados
+# são só dicionários, listas, textos, números e None, e passam sem perdas por
+# qualquer um dos três formatos.
+ASSINATURA = b"EVSNAP"
+VERSAO_FORMATO = 1
+# assinatura, versão do formato, versão do marshal, CRC-32 do conteúdo, tamanho do conteúdo
+CABECALHO = struct.Struct("<6sBBII")
+
+
+class SnapshotInvalido(ValueError):
+    """O arquivo binário está truncado, corrompido ou em uma versão desconhecida."""
+
+
+def _json_legivel(dados):
+    return json.dumps(dados, indent=4).encode("utf-8")
+
+def _json_compacto(dados):
+    return json.dumps(dados, separators=(",", ":")).encode("utf-8")
+
+def _binario(dados):
+    conteudo = marshal.dumps(dados, marshal.version)
+    return CABECALHO.pack(ASSINATURA, VERSAO_FORMATO, marshal.version, zlib.crc32(conteudo), len(conteudo)) + conteudo
+
+CODECS = {"json": _json_legivel, "json-compacto": _json_compacto, "binario": _binario}
+
+
+def codificar(dados, codec="json"):
+    """Converte os dados em bytes no formato pedido."""
+    try:
+        return CODECS[codec](dados)
+    except KeyError:
+        raise ValueError(f"Formato desconhecido: {codec}. Use {', '.join(CODECS)}.") from None
+
+def decodificar(conteudo):
+    """Lê bytes em qualquer um dos formatos, reconhecendo-o pelo cabeçalho."""
+    if not conteudo.startswith(ASSINATURA):
+        return json.loads(conteudo)
+    if len(conteudo) < CABECALHO.size:
+        raise SnapshotInvalido("snapshot binário truncado")
+    _, versao, _, crc, tamanho = CABECALHO.unpack_from(conteudo)
+    if versao > VERSAO_FORMATO:
+        raise SnapshotInvalido(f"versão {versao} do snapshot binário não suportada")
+    dados = memoryview(conteudo)[CABECALHO.size:]
+    if len(dados) != tamanho or zlib.crc32(dados) != crc:
+        raise SnapshotInvalido("snapshot binário corrompido (tamanho ou CRC-32 não conferem)")
+    return marshal.loads(dados)
@@ -0,0 +1,94 @@
+from array import array
+from collections import Counter
+
+from indice_datas import data_evento
+
+# ==========================================
+# Estatísticas de Ocupação e de Inscrições
+# ==========================================
+def mes_do_evento(evento):
+    """Mês do evento no formato 'AAAA-MM' (ordenável), ou None se a data for inválida."""
+    data = data_evento(evento["data"])
+    return data.strftime("%Y-%m") if data else None
+
+
+class Estatisticas:
+    """Contadores agregados para os relatórios dos coordenadores.
+
+    - _por_curso: curso do aluno -> número de inscrições.
+    - _por_mes: mês do evento ('AAAA-MM') -> [inscritos, vagas] dos eventos do mês,
+      a base da taxa de ocupação ao longo do tempo.
+
+    A ocupação de cada evento já é mantida pela TabelaInscricoes e não se repete
+    aqui. Os contadores são montados de uma vez por de_estado (em colunas, ver
+    abaixo) e depois acompanham cada operação: persistencia.aplicar_operacao chama
+    contar_inscricao a cada inscrição ou cancelamento e contar_evento quando um
+    evento é cadastrado, excluído ou muda de data ou de vagas.
+    """
+
+    def __init__(self):
+        self._por_curso = {}
+        self._por_mes = {}
+
+    def contar_inscricao(self, evento, curso, sinal=1):
+        """Soma (sinal=1) ou subtrai (sinal=-1) uma inscrição de um aluno do curso no evento."""
+        self._por_curso[curso] = self._por_curso.get(curso, 0) + sinal
+        if not self._por_curso[curso]:
+            del self._por_curso[curso]
+        mes = mes_do_evento(evento)
+        if mes is not None:
+            self._por_mes.setdefault(mes, [0, 0])[0] += sinal
+
+    def contar_evento(self, evento, inscritos, sinal=1):
+        """Soma ou subtrai as vagas e os 'inscritos' do evento no mês dele."""
+        mes = mes_do_evento(evento)
+        if mes is None:
+            return
+        totais = self._por_mes.setdefault(mes, [0, 0])
+        totais[0] += sinal * inscritos
+        totais[1] += sinal * evento["vagas"]
+        if totais == [0, 0]:
+            del self._por_mes[mes]
+
+    def por_curso(self):
+        """Lista de (curso, inscrições), da maior para a menor."""
+        return sorted(self._por_curso.items(), key=lambda item: (-item[1], item[0] or ""))
+
+    def por_mes(self):
+        """Lista de (mês 'AAAA-MM', inscritos, vagas), em ordem cronológica."""
+        return [(mes, inscritos, vagas) for mes, (inscritos, vagas) in sorted(self._por_mes.items())]
+
+    # ---------- modo em lote ----------
+    @classmethod
+    def de_estado(cls, eventos, inscricoes, alunos):
+        """Calcula todos os contadores de uma vez a partir dos dados carregados.
+
+        A agregação é feita em colunas: cada inscrição vira um código de curso em um
+        array('l') e cada evento, um código de mês, com as vagas e a ocupação em
+        arrays paralelos. A contagem dos códigos (Counter sobre o array) e as somas
+        por mês percorrem só números, sem montar um dicionário por inscrição.
+        """
+        codigos_curso, codigo_do_aluno = {}, {}
+        for id_aluno, aluno in alunos.items():
+            codigo_do_aluno[id_aluno] = codigos_curso.setdefault(aluno.get("curso"), len(codigos_curso))
+        codigos_mes = {}
+        mes_col, vagas_col, ocupacao_col = array("l"), array("l"), array("l")
+        curso_col = array("l")
+        for evento in eventos:
+            mes = mes_do_evento(evento)
+            if mes is not None:
+                mes_col.append(codigos_mes.setdefault(mes, len(codigos_mes)))
+                vagas_col.append(evento["vagas"])
+                ocupacao_col.append(inscricoes.ocupacao(evento["id"]))
+            curso_col.extend(codigo_do_aluno[id_aluno] for _, id_aluno in inscricoes.iterar_evento(evento["id"])
+                             if id_aluno in codigo_do_aluno)
+
+        estatisticas = cls()
+        cursos = list(codigos_curso)
+        estatisticas._por_curso = {cursos[codigo]: total for codigo, total in Counter(curso_col).items()}
+        totais = [[0, 0] for _ in codigos_mes]
+        for codigo, vagas, ocupacao in zip(mes_col, vagas_col, ocupacao_col):
+            totais[codigo][0] += ocupacao
+            totais[codigo][1] += vagas
+        estatisticas._por_mes = dict(zip(codigos_mes, totais))
+        return estatisticas
@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from indice_datas import data_evento, eventos_entre
+from operacoes import ErroOperacao, obter_evento
+from persistencia import carregar_eventos, carregar_usuarios, versao_eventos, bloco_inscricoes
+
+# ===================================
+# Exportação de Inscrições (CSV/JSONL)
+# ===================================
+# Exporta as listas de inscritos (de um evento, de vários ou de todos) sem montar
+# a lista inteira na memória: a exportação é uma cadeia de geradores
+#
+#   eventos escolhidos -> inscrições em blocos -> filtro por curso -> colunas -> arquivo
+#
+# e cada linha é escrita assim que é produzida. As inscrições de cada evento são
+# lidas em blocos de TAMANHO_BLOCO, cada um sob a trava (persistencia.bloco_inscricoes),
+# então a memória usada não depende do tamanho do evento e a exportação pode rodar
+# em segundo plano enquanto o menu continua gravando. Do aluno são lidos só os
+# campos das colunas pedidas.
+TAMANHO_BLOCO = 1000
+
+COLUNAS_EXPORTACAO = {
+    "id_evento": lambda evento, id_inscricao, id_aluno, aluno: evento["id"],
+    "evento": lambda evento, id_inscricao, id_aluno, aluno: evento["nome"],
+    "data": lambda evento, id_inscricao, id_aluno, aluno: evento["data"],
+    "id_inscricao": lambda evento, id_inscricao, id_aluno, aluno: id_inscricao,
+    "id_aluno": lambda evento, id_inscricao, id_aluno, aluno: id_aluno,
+    "nome": lambda evento, id_inscricao, id_aluno, aluno: aluno["nome"] if aluno is not None else "?",
+    "email": lambda evento, id_inscricao, id_aluno, aluno: aluno["email"] if aluno is not None else "?",
+    "curso": lambda evento, id_inscricao, id_aluno, aluno: aluno.get("curso") if aluno is not None else None,
+}
+
+
+def validar_colunas(colunas):
+    """Confere os nomes das colunas. Retorna a tupla de colunas (todas, se None)."""
+    if colunas is None:
+        return tuple(COLUNAS_EXPORTACAO)
+    if not colunas:
+        raise ErroOperacao("Informe ao menos uma coluna.")
+    desconhecidas = [coluna for coluna in colunas if coluna not in COLUNAS_EXPORTACAO]
+    if desconhecidas:
+        raise ErroOperacao("Colunas inválidas: " + ", ".join(desconhecidas) +
+                           ". Use " + ", ".join(COLUNAS_EXPORTACAO) + ".")
+    return tuple(colunas)
+
+def _data(texto):
+    data = data_evento(texto)
+    if data is None:
+        raise ErroOperacao("Data inválida! Use o formato DD/MM/AAAA")
+    return data
+
+def eventos_exportados(ids_eventos=None, de=None, ate=None):
+    """Lista dos eventos a exportar: os de ids_eventos (todos, se None), com data entre
+        'de' e 'ate' (DD/MM/AAAA, inclusive) quando informadas.
+    """
+    inicio = _data(de) if de is not None else datetime.min
+    fim = _data(ate) + timedelta(days=1) if ate is not None else datetime.max
+    if ids_eventos is not None:
+        eventos = [obter_evento(id_evento) for id_evento in ids_eventos]
+        if de is None and ate is None:
+            return eventos
+        return [evento for evento in eventos if data_evento(evento["data"]) and inicio <= data_evento(evento["data"]) < fim]
+    eventos, _ = carregar_eventos()
+    if de is None and ate is None:
+        return list(eventos)
+    return eventos_entre(eventos, versao_eventos(), inicio, fim)
+
+def inscricoes_em_blocos(id_evento):
+    """Gera (id_inscricao, id_aluno) do evento, lendo TAMANHO_BLOCO inscrições por vez."""
+    inicio = 1
+    while True:
+        bloco = bloco_inscricoes(id_evento, inicio, TAMANHO_BLOCO)
+        yield from bloco
+        if len(bloco) < TAMANHO_BLOCO:
+            return
+        inicio = bloco[-1][0] + 1
+
+def linhas_exportadas(eventos, curso=None, colunas=None):
+    """Gera um dicionário por inscrição dos eventos, só com as colunas pedidas."""
+    colunas = validar_colunas(colunas)
+    extratores = [(coluna, COLUNAS_EXPORTACAO[coluna]) for coluna in colunas]
+    curso = curso.strip().lower() if curso else None
+    alunos, _ = carregar_usuarios()
+    for evento in eventos:
+        for id_inscricao, id_aluno in inscricoes_em_blocos(evento["id"]):
+            aluno = alunos.get(id_aluno)
+            if curso is not None and (aluno is None or (aluno.get("curso") or "").strip().lower() != curso):
+                continue
+            yield {coluna: extrator(evento, id_inscricao, id_aluno, aluno) for coluna, extrator in extratores}
+
+def escrever_csv(linhas, arquivo, colunas):
+    """Escreve as linhas em CSV, com cabeçalho. Retorna a quantidade de linhas."""
+    escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+    escritor.writeheader()
+    quantidade = 0
+    for linha in linhas:
+        escritor.writerow(linha)
+        quantidade += 1
+    return quantidade
+
+def escrever_jsonl(linhas, arquivo):
+    """Escreve um objeto JSON por linha. Retorna a quantidade de linhas."""
+    quantidade = 0
+    for linha in linhas:
+        arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+        quantidade += 1
+    return quantidade
+
+def exportar(caminho, ids_eventos=None, de=None, ate=None, curso=None, colunas=None):
+    """Exporta as inscrições para o arquivo e retorna a quantidade exportada.
+        O formato é escolhido pela extensão: .jsonl/.ndjson ou CSV; "-" escreve CSV na
+        saída padrão. O arquivo só aparece no caminho final quando está completo.
+    """
+    colunas = validar_colunas(colunas)
+    linhas = linhas_exportadas(eventos_exportados(ids_eventos, de, ate), curso, colunas)
+    jsonl = os.path.splitext(caminho)[1].lower() in (".jsonl", ".ndjson")
+    if caminho == "-":
+        return escrever_csv(linhas, sys.stdout, colunas)
+    temporario = caminho + ".tmp"
+    try:
+        with open(temporario, "w", encoding="utf-8", newline="") as arquivo:
+            quantidade = escrever_jsonl(linhas, arquivo) if jsonl else escrever_csv(linhas, arquivo, colunas)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return quantidade
+
+def exportar_em_segundo_plano(caminho, ao_terminar, **filtros):
+    """Roda exportar em uma thread e chama ao_terminar(quantidade, erro) no fim (erro é
+        None em caso de sucesso). Os filtros são conferidos antes, para que erros de
+        digitação apareçam na hora. Retorna a thread.
+    """
+    eventos_exportados(filtros.get("ids_eventos"), filtros.get("de"), filtros.get("ate"))
+    validar_colunas(filtros.get("colunas"))
+
+    def executar():
+        try:
+            quantidade = exportar(caminho, **filtros)
+        except (ErroOperacao, OSError) as erro:
+            ao_terminar(0, erro)
+        else:
+            ao_terminar(quantidade, None)
+
+    thread = threading.Thread(target=executar, name="exportacao", daemon=False)
+    thread.start()
+    return thread
@@ -0,0 +1,150 @@
+from registros import internar
+
+# ==================
+# Fila de Espera
+# ==================
+class FilaEspera:
+    """Filas de espera (FIFO) dos eventos lotados e avisos de promoção.
+
+    - _por_evento: ID do evento -> {id_aluno: None}, na ordem de chegada. Entrar
+      é um append e sair é um del no dicionário, ambos O(1); o primeiro da fila
+      é o primeiro item do dicionário.
+    - _por_aluno: id_aluno -> {ID do evento: None}, as filas em que o aluno está.
+    - _avisos: ID do evento -> {id_aluno: None}, alunos promovidos da fila para
+      uma vaga que ainda não viram o aviso (mostrado no próximo login).
+
+    A promoção em si é decidida sob a trava de gravação e registrada junto com o
+    cancelamento que liberou a vaga (ver persistencia.registrar_cancelamento).
+    """
+
+    def __init__(self):
+        self._por_evento = {}
+        self._por_aluno = {}
+        self._avisos = {}
+        self._avisos_por_aluno = {}
+
+    def entrar(self, id_evento, id_aluno):
+        """Coloca o aluno no fim da fila do evento. Retorna False se ele já estava nela."""
+        fila = self._por_evento.setdefault(id_evento, {})
+        if id_aluno in fila:
+            return False
+        id_aluno = internar(id_aluno)
+        fila[id_aluno] = None
+        self._por_aluno.setdefault(id_aluno, {})[id_evento] = None
+        return True
+
+    def sair(self, id_evento, id_aluno):
+        """Tira o aluno da fila do evento. Retorna False se ele não estava nela."""
+        fila = self._por_evento.get(id_evento, {})
+        if id_aluno not in fila:
+            return False
+        del fila[id_aluno]
+        if not fila:
+            del self._por_evento[id_evento]
+        filas_aluno = self._por_aluno[id_aluno]
+        del filas_aluno[id_evento]
+        if not filas_aluno:
+            del self._por_aluno[id_aluno]
+        return True
+
+    def esta_na_fila(self, id_evento, id_aluno):
+        return id_aluno in self._por_evento.get(id_evento, {})
+
+    def tamanho(self, id_evento):
+        return len(self._por_evento.get(id_evento, {}))
+
+    def primeiros(self, id_evento, quantidade):
+        """Os 'quantidade' primeiros alunos da fila do evento, na ordem de chegada."""
+        primeiros = []
+        for id_aluno in self._por_evento.get(id_evento, {}):
+            if len(primeiros) >= quantidade:
+                break
+            primeiros.append(id_aluno)
+        return primeiros
+
+    def posicao(self, id_evento, id_aluno):
+        """Posição do aluno na fila (1 é o próximo a ser promovido), ou None."""
+        for posicao, outro in enumerate(self._por_evento.get(id_evento, {}), start=1):
+            if outro == id_aluno:
+                return posicao
+        return None
+
+    def do_evento(self, id_evento):
+        """Lista dos alunos na fila do evento, na ordem de chegada."""
+        return list(self._por_evento.get(id_evento, {}))
+
+    def do_aluno(self, id_aluno):
+        """Lista dos IDs dos eventos em cuja fila o aluno está."""
+        return list(self._por_aluno.get(id_aluno, {}))
+
+    # ---------- avisos de promoção ----------
+    def avisar(self, id_evento, id_aluno):
+        self._avisos.setdefault(id_evento, {})[id_aluno] = None
+        self._avisos_por_aluno.setdefault(id_aluno, {})[id_evento] = None
+
+    def avisos_do_aluno(self, id_aluno):
+        """IDs dos eventos em que o aluno foi promovido e ainda não viu o aviso."""
+        return list(self._avisos_por_aluno.get(id_aluno, {}))
+
+    def avisos_do_evento(self, id_evento):
+        return list(self._avisos.get(id_evento, {}))
+
+    def descartar_aviso(self, id_evento, id_aluno):
+        avisos = self._avisos.get(id_evento, {})
+        if id_aluno not in avisos:
+            return
+        del avisos[id_aluno]
+        if not avisos:
+            del self._avisos[id_evento]
+        avisos_aluno = self._avisos_por_aluno[id_aluno]
+        del avisos_aluno[id_evento]
+        if not avisos_aluno:
+            del self._avisos_por_aluno[id_aluno]
+
+    # ---------- limpeza ----------
+    def remover_evento(self, id_evento):
+        """Remove a fila e os avisos de um evento excluído."""
+        for id_aluno in self.do_evento(id_evento):
+            self.sair(id_evento, id_aluno)
+        for id_aluno in self.avisos_do_evento(id_evento):
+            self.descartar_aviso(id_evento, id_aluno)
+
+    def remover_aluno(self, id_aluno):
+        """Tira o aluno de todas as filas e descarta os avisos dele."""
+        for id_evento in self.do_aluno(id_aluno):
+            self.sair(id_evento, id_aluno)
+        for id_evento in self.avisos_do_aluno(id_aluno):
+            self.descartar_aviso(id_evento, id_aluno)
+
+    def ids_eventos(self):
+        """IDs dos eventos com fila ou avisos pendentes."""
+        return list(self._por_evento.keys() | self._avisos.keys())
+
+    def substituir_evento(self, id_evento, fila, avisos):
+        """Troca a fila e os avisos do evento pelos recebidos (listas de id_aluno)."""
+        self.remover_evento(id_evento)
+        for id_aluno in fila:
+            self.entrar(id_evento, id_aluno)
+        for id_aluno in avisos:
+            self.avisar(id_evento, id_aluno)
+
+    def para_dict(self):
+        """Formato gravado junto com as inscrições: {"espera": {ID do evento (texto):
+            [id_aluno, ...]}, "avisos": {ID do evento (texto): [id_aluno, ...]}}.
+        """
+        return {
+            "espera": {str(id_evento): list(fila) for id_evento, fila in self._por_evento.items()},
+            "avisos": {str(id_evento): list(avisos) for id_evento, avisos in self._avisos.items()},
+        }
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Monta as filas a partir do formato de para_dict (chaves ausentes: sem filas)."""
+        filas = cls()
+        for id_evento, fila in dados.get("espera", {}).items():
+            for id_aluno in fila:
+                filas.entrar(int(id_evento), id_aluno)
+        for id_evento, avisos in dados.get("avisos", {}).items():
+            for id_aluno in avisos:
+                filas.avisar(int(id_evento), id_aluno)
+        return filas
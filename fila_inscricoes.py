@@ -0,0 +1,133 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from operacoes import ErroOperacao, obter_evento, obter_usuario, conferir_inscricao
+from persistencia import registrar_lote, reservar_ids
+
+# ======================================
+# Recepção de Inscrições em Lote
+# ======================================
+# Na abertura de um evento concorrido, muitos pedidos de inscrição chegam juntos.
+# Gravados um a um, cada pedido disputa a trava e espera o seu próprio fsync. A
+# FilaInscricoes recebe os pedidos de várias threads e uma única thread os efetiva
+# em lotes (group commit): sob uma só passagem pela trava de gravação, confere as
+# vagas de cada pedido contra a ocupação em memória (somando as vagas já tomadas
+# por pedidos aceitos no mesmo lote), reserva os IDs das inscrições aceitas e grava
+# o lote com uma única escrita e um único fsync (persistencia.registrar_lote).
+#
+# O lote começa no primeiro pedido pendente e fecha quando junta 'tamanho'
+# pedidos ou quando passa a 'janela' (em segundos). Enquanto um lote é gravado os
+# pedidos seguintes se acumulam, então quanto maior a carga, maiores os lotes e
+# menor o custo por inscrição. Cada pedido recebe um resultado definitivo: o ID da
+# inscrição, se aceito, ou a ErroOperacao (EventoLotado, inscrição repetida...)
+# que o recusou.
+JANELA_LOTE = 0.002
+TAMANHO_LOTE = 256
+
+
+class FilaInscricoes:
+    """Fila de pedidos de inscrição efetivados em lotes por uma thread própria."""
+
+    def __init__(self, janela=JANELA_LOTE, tamanho=TAMANHO_LOTE):
+        if janela < 0 or tamanho < 1:
+            raise ValueError("A janela não pode ser negativa e o tamanho do lote deve ser ao menos 1.")
+        self.janela = janela
+        self.tamanho = tamanho
+        self._pedidos = []
+        self._condicao = threading.Condition()
+        self._encerrada = False
+        self._thread = threading.Thread(target=self._atender, name="fila-inscricoes", daemon=True)
+        self._thread.start()
+
+    def enviar(self, id_evento, id_aluno):
+        """Coloca o pedido na fila e retorna um Future: result() devolve o ID da inscrição,
+            ou levanta a ErroOperacao que a recusou. Evento ou aluno inexistentes são
+            recusados na hora, sem entrar na fila.
+        """
+        pedido = Future()
+        try:
+            id_evento = obter_evento(id_evento)["id"]
+            obter_usuario(id_aluno, "aluno")
+        except ErroOperacao as erro:
+            pedido.set_exception(erro)
+            return pedido
+        with self._condicao:
+            if self._encerrada:
+                pedido.set_exception(ErroOperacao("A recepção de inscrições foi encerrada."))
+                return pedido
+            self._pedidos.append((pedido, id_evento, id_aluno))
+            self._condicao.notify()
+        return pedido
+
+    def inscrever(self, id_evento, id_aluno):
+        """Envia o pedido e espera o resultado. Retorna o ID da inscrição."""
+        return self.enviar(id_evento, id_aluno).result()
+
+    def encerrar(self):
+        """Efetiva os pedidos que já estão na fila e encerra a thread."""
+        with self._condicao:
+            self._encerrada = True
+            self._condicao.notify()
+        self._thread.join()
+
+    def _proximo_lote(self):
+        """Espera o próximo lote (ou None, com a fila encerrada e vazia)."""
+        with self._condicao:
+            while not self._pedidos and not self._encerrada:
+                self._condicao.wait()
+            if not self._pedidos:
+                return None
+            limite = time.monotonic() + self.janela
+            while len(self._pedidos) < self.tamanho and not self._encerrada:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                self._condicao.wait(restante)
+            lote = self._pedidos[:self.tamanho]
+            del self._pedidos[:self.tamanho]
+            return lote
+
+    def _atender(self):
+        while True:
+            lote = self._proximo_lote()
+            if lote is None:
+                return
+            self._efetivar(lote)
+
+    def _efetivar(self, lote):
+        """Confere e grava um lote de pedidos, entregando o resultado de cada um."""
+        aceitos, recusados = [], []
+
+        def preparar(estado):
+            aceitos.clear()
+            recusados.clear()
+            reservadas, no_lote = {}, set()
+            for pedido, id_evento, id_aluno in lote:
+                try:
+                    if (id_evento, id_aluno) in no_lote:
+                        raise ErroOperacao("Você já está inscrito neste evento!")
+                    conferir_inscricao(estado, id_evento, id_aluno, reservadas.get(id_evento, 0))
+                except ErroOperacao as erro:
+                    recusados.append((pedido, erro))
+                    continue
+                no_lote.add((id_evento, id_aluno))
+                reservadas[id_evento] = reservadas.get(id_evento, 0) + 1
+                aceitos.append((pedido, id_evento, id_aluno))
+            if not aceitos:
+                return []
+            primeiro = reservar_ids(estado, "inscricao", len(aceitos))
+            return [{"op": "inscricao", "evento": id_evento, "id_aluno": id_aluno, "id_inscricao": primeiro + posicao}
+                    for posicao, (_, id_evento, id_aluno) in enumerate(aceitos)]
+
+        try:
+            ops = registrar_lote(preparar)
+        except Exception as erro:
+            # Nada foi aplicado: todos os pedidos do lote recebem o erro da gravação.
+            for pedido, _, _ in lote:
+                pedido.set_exception(erro)
+            return
+        for (pedido, _, _), op in zip(aceitos, ops):
+            pedido.set_result(op["id_inscricao"])
+        for pedido, erro in recusados:
+            pedido.set_exception(erro)
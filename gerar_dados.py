@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+# ===============================
+# Gerador de Dados Sintéticos
+# ===============================
+# Escreve eventos.json, alunos.json e coordenadores.json no formato usado pelo
+# sistema, com N eventos, M alunos e K inscrições, para testes de carga e para o
+# benchmark. Os dados são determinísticos para a mesma semente.
+PALAVRAS_EVENTO = ["Palestra", "Workshop", "Semana", "Encontro", "Oficina", "Seminário", "Congresso",
+                   "Hackathon", "Minicurso", "Mesa-redonda", "Feira", "Maratona"]
+TEMAS = ["Inteligência Artificial", "Ciência de Dados", "Python", "Segurança da Informação",
+         "Engenharia de Software", "Computação em Nuvem", "Redes", "Banco de Dados", "Robótica",
+         "Empreendedorismo", "Design de Interfaces", "Matemática Aplicada", "Física", "Biotecnologia"]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "Yuri"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes"]
+CURSOS = ["ADS", "Ciência da Computação", "Engenharia de Software", "Sistemas de Informação",
+          "Engenharia Elétrica", "Administração", "Design"]
+
+
+def gerar_eventos(rng, quantidade, hoje):
+    eventos = []
+    for i in range(1, quantidade + 1):
+        data = hoje + timedelta(days=rng.randint(-365, 365))
+        nome = f"{rng.choice(PALAVRAS_EVENTO)} de {rng.choice(TEMAS)} {i}"
+        eventos.append({
+            "id": i,
+            "nome": nome,
+            "data": data.strftime("%d/%m/%Y"),
+            "descricao": f"{nome}: atividades, convidados e certificados para os participantes.",
+            "vagas": rng.choice([20, 30, 50, 80, 100, 150, 200, 300, 500]),
+        })
+    return eventos
+
+def gerar_usuarios(rng, quantidade, tipo, prefixo):
+    usuarios = {}
+    for i in range(1, quantidade + 1):
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+        email = f"{nome.split()[0].lower()}.{prefixo}{i}@exemplo.com"
+        usuarios[str(i)] = {"id": str(i), "nome": nome, "email": email, "tipo": tipo,
+                            "curso": rng.choice(CURSOS) if tipo == "aluno" else None}
+    return usuarios
+
+def gerar_inscricoes(rng, eventos, alunos, quantidade):
+    """Distribui as inscrições com popularidade desigual entre os eventos, respeitando as vagas.
+        Retorna {ID do evento (texto): {id_aluno: id_inscricao}}, com IDs de inscrição sequenciais.
+    """
+    vagas = [evento["vagas"] for evento in eventos]
+    ids_alunos = list(alunos)
+    pesos = [1.0 / (posicao + 1) ** 0.6 for posicao in range(len(eventos))]
+    inscricoes = {}
+    pares = set()
+    capacidade = sum(min(v, len(ids_alunos)) for v in vagas)
+    quantidade = min(quantidade, capacidade)
+    while len(pares) < quantidade:
+        antes = len(pares)
+        for indice in rng.choices(range(len(eventos)), weights=pesos, k=min(10000, quantidade - len(pares))):
+            lista = inscricoes.setdefault(str(eventos[indice]["id"]), {})
+            if len(lista) >= vagas[indice]:
+                continue
+            id_aluno = rng.choice(ids_alunos)
+            if (indice, id_aluno) in pares:
+                continue
+            pares.add((indice, id_aluno))
+            lista[id_aluno] = len(pares)
+            if len(pares) >= quantidade:
+                break
+        if len(pares) == antes:  # eventos populares lotados: não há mais como avançar
+            break
+    return inscricoes
+
+def gerar_dados(destino, eventos, alunos, inscricoes, coordenadores=10, semente=42):
+    """Escreve os três arquivos JSON em 'destino' e apaga o diário, o índice de emails e as sequências antigos."""
+    rng = random.Random(semente)
+    hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    lista_eventos = gerar_eventos(rng, eventos, hoje)
+    dict_alunos = gerar_usuarios(rng, alunos, "aluno", "aluno")
+    dict_coordenadores = gerar_usuarios(rng, coordenadores, "coordenador", "coord")
+    tabela = gerar_inscricoes(rng, lista_eventos, dict_alunos, inscricoes) if lista_eventos and dict_alunos else {}
+    os.makedirs(destino, exist_ok=True)
+    for nome, dados in (("eventos.json", {"eventos": lista_eventos, "inscricoes": tabela}),
+                        ("alunos.json", dict_alunos), ("coordenadores.json", dict_coordenadores)):
+        with open(os.path.join(destino, nome), "w") as f:
+            json.dump(dados, f, indent=4)
+    for nome in ("diario.log", "indice_emails.json", "sequencias.json"):
+        caminho = os.path.join(destino, nome)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    return sum(len(lista) for lista in tabela.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para o Sistema de Gerenciamento de Eventos")
+    parser.add_argument("--eventos", type=int, default=1000, help="quantidade de eventos (N)")
+    parser.add_argument("--alunos", type=int, default=10000, help="quantidade de alunos (M)")
+    parser.add_argument("--inscricoes", type=int, default=20000, help="quantidade de inscrições (K)")
+    parser.add_argument("--coordenadores", type=int, default=10, help="quantidade de coordenadores")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador aleatório")
+    parser.add_argument("--destino", default="data", help="diretório de saída (padrão: data)")
+    args = parser.parse_args()
+    total = gerar_dados(args.destino, args.eventos, args.alunos, args.inscricoes, args.coordenadores, args.semente)
+    print(f"✅ {args.eventos} eventos, {args.alunos} alunos, {args.coordenadores} coordenadores "
+          f"e {total} inscrições gravados em '{args.destino}'.")
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+import os
+import sys
+
+from operacoes import ErroOperacao, chave_evento, validar_email, validar_data
+from persistencia import registrar_lote, compactar, normalizar_email, reservar_ids
+
+# ==============================
+# Importação em Lote (CSV/JSONL)
+# ==============================
+# Cadastra alunos, coordenadores ou eventos a partir de um arquivo, sem o menu
+# interativo. As linhas são lidas em fluxo e validadas uma a uma; a checagem de
+# duplicados (contra o que já está gravado e contra as linhas anteriores do
+# próprio arquivo) e a gravação acontecem juntas, em um único lote no final.
+#
+# Colunas esperadas (cabeçalho do CSV ou chaves de cada objeto do JSONL):
+#   alunos:        nome, email, curso
+#   coordenadores: nome, email
+#   eventos:       nome, data, descricao, vagas
+TIPOS_IMPORTACAO = ("alunos", "coordenadores", "eventos")
+
+
+def ler_registros(caminho):
+    """Gera (número da linha, dicionário) para cada registro do arquivo.
+        O formato é escolhido pela extensão: .jsonl/.ndjson ou CSV; "-" lê CSV da entrada padrão.
+    """
+    jsonl = os.path.splitext(caminho)[1].lower() in (".jsonl", ".ndjson")
+    arquivo = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig") if caminho == "-" else \
+        open(caminho, "r", encoding="utf-8-sig", newline="")
+    with arquivo:
+        if jsonl:
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    yield numero, None
+                    continue
+                yield numero, registro if isinstance(registro, dict) else None
+        else:
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                yield leitor.line_num, registro
+
+def _texto(registro, campo, obrigatorio=True):
+    valor = registro.get(campo)
+    valor = "" if valor is None else str(valor).strip()
+    if obrigatorio and not valor:
+        raise ErroOperacao(f"campo '{campo}' vazio")
+    return valor
+
+def validar_usuario(registro, tipo):
+    """Normaliza e valida um aluno ou coordenador. Retorna o registro sem o ID."""
+    nome = _texto(registro, "nome")
+    email = _texto(registro, "email").lower()
+    if not validar_email(email):
+        raise ErroOperacao(f"email inválido: {email}")
+    curso = None
+    if tipo == "aluno":
+        curso = _texto(registro, "curso", obrigatorio=False) or None
+    return {"id": None, "nome": nome, "email": email, "tipo": tipo, "curso": curso}
+
+def validar_evento(registro):
+    """Normaliza e valida um evento (data DD/MM/AAAA e vagas maior que zero)."""
+    nome = _texto(registro, "nome")
+    data = _texto(registro, "data")
+    if not validar_data(data):
+        raise ErroOperacao(f"data inválida: {data}")
+    try:
+        vagas = int(_texto(registro, "vagas"))
+    except ValueError:
+        raise ErroOperacao("vagas deve ser um número inteiro")
+    if vagas <= 0:
+        raise ErroOperacao("o número de vagas deve ser maior que zero")
+    return {"nome": nome, "data": data, "descricao": _texto(registro, "descricao", obrigatorio=False), "vagas": vagas}
+
+
+def importar(tipo, caminho):
+    """Importa o arquivo e retorna (quantidade importada, lista de (linha, erro))."""
+    if tipo not in TIPOS_IMPORTACAO:
+        raise ValueError(f"Tipo de importação desconhecido: {tipo}")
+    erros = []
+    validos = []
+    for numero, registro in ler_registros(caminho):
+        if registro is None:
+            erros.append((numero, "linha não é um objeto JSON válido"))
+            continue
+        try:
+            if tipo == "eventos":
+                validos.append((numero, validar_evento(registro)))
+            else:
+                validos.append((numero, validar_usuario(registro, "aluno" if tipo == "alunos" else "coordenador")))
+        except ErroOperacao as erro:
+            erros.append((numero, str(erro)))
+
+    def montar_operacoes(estado):
+        ops = []
+        if tipo == "eventos":
+            # Mesma regra de operacoes.evento_duplicado: nome, data, descrição e vagas.
+            existentes = {chave_evento(e) for e in estado["eventos"]}
+            aceitos = []
+            for numero, evento in validos:
+                identificacao = chave_evento(evento)
+                if identificacao in existentes:
+                    erros.append((numero, f"evento já existe: {evento['nome']} em {evento['data']}"))
+                    continue
+                existentes.add(identificacao)
+                aceitos.append(evento)
+            # Uma única reserva para o lote inteiro.
+            primeiro_id = reservar_ids(estado, "evento", len(aceitos))
+            return [{"op": "evento_cadastrado", "evento": {"id": primeiro_id + posicao, **evento}}
+                    for posicao, evento in enumerate(aceitos)]
+        emails_lote = set()
+        aceitos = []
+        for numero, usuario in validos:
+            email = normalizar_email(usuario["email"])
+            if email in estado["emails"] or email in emails_lote:
+                erros.append((numero, f"email já registrado: {usuario['email']}"))
+                continue
+            emails_lote.add(email)
+            aceitos.append(usuario)
+        primeiro_id = reservar_ids(estado, "aluno" if tipo == "alunos" else "coordenador", len(aceitos))
+        for posicao, usuario in enumerate(aceitos):
+            usuario["id"] = str(primeiro_id + posicao)
+            ops.append({"op": "usuario_cadastrado", "usuario": usuario})
+        return ops
+
+    ops = registrar_lote(montar_operacoes)
+    if ops:
+        compactar()
+    erros.sort()
+    return len(ops), erros
@@ -0,0 +1,93 @@
+import unicodedata
+
+# ==================
+# Índice de Busca
+# ==================
+def normalizar_texto(texto):
+    """Remove acentos, converte para minúsculas e junta espaços repetidos."""
+    if not texto.isascii():
+        decomposto = unicodedata.normalize("NFKD", texto)
+        texto = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split())
+
+def trigramas(texto):
+    """Conjunto de trechos de 3 caracteres do texto (já normalizado)."""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusca:
+    """Índice de trigramas sobre o nome e a descrição dos eventos.
+
+    Cada trigrama aponta para o conjunto de IDs de eventos que o contêm. Uma
+    busca por um termo com 3 ou mais caracteres intersecta os conjuntos dos
+    trigramas do termo (começando pelo menor) e só então confirma, nos poucos
+    candidatos restantes, se o termo aparece de fato como trecho do texto. Termos
+    mais curtos são conferidos diretamente em todos os textos.
+
+    A busca ignora maiúsculas e acentos e devolve os resultados ordenados por
+    relevância: nome igual ao termo, nome começando pelo termo, alguma palavra do
+    nome começando pelo termo, termo no meio do nome e, por último, termo na descrição.
+    """
+
+    def __init__(self):
+        self._textos = {}
+        self._trigramas = {}
+
+    @classmethod
+    def de_eventos(cls, eventos):
+        indice = cls()
+        for evento in eventos:
+            indice.adicionar(evento["id"], evento["nome"], evento.get("descricao", ""))
+        return indice
+
+    def adicionar(self, id_evento, nome, descricao):
+        """Indexa (ou reindexa) o evento com o ID informado."""
+        if id_evento in self._textos:
+            self.remover(id_evento)
+        textos = (normalizar_texto(nome), normalizar_texto(descricao))
+        self._textos[id_evento] = textos
+        for trigrama in trigramas(textos[0]) | trigramas(textos[1]):
+            self._trigramas.setdefault(trigrama, set()).add(id_evento)
+
+    def remover(self, id_evento):
+        textos = self._textos.pop(id_evento, None)
+        if textos is None:
+            return
+        for trigrama in trigramas(textos[0]) | trigramas(textos[1]):
+            ids = self._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id_evento)
+                if not ids:
+                    del self._trigramas[trigrama]
+
+    def _relevancia(self, termo, nome, descricao):
+        if nome == termo:
+            return 0
+        if nome.startswith(termo):
+            return 1
+        if (" " + termo) in nome:
+            return 2
+        if termo in nome:
+            return 3
+        if termo in descricao:
+            return 4
+        return None
+
+    def buscar(self, termo):
+        """Retorna os IDs dos eventos que contêm o termo, da mais para a menos relevante."""
+        termo = normalizar_texto(termo)
+        if not termo:
+            return []
+        if len(termo) < 3:
+            candidatos = self._textos
+        else:
+            conjuntos = sorted((self._trigramas.get(t, set()) for t in trigramas(termo)), key=len)
+            candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+        resultados = []
+        for id_evento in candidatos:
+            nome, descricao = self._textos[id_evento]
+            relevancia = self._relevancia(termo, nome, descricao)
+            if relevancia is not None:
+                resultados.append((relevancia, nome, id_evento))
+        resultados.sort()
+        return [id_evento for _, _, id_evento in resultados]
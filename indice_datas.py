@@ -0,0 +1,87 @@
+import bisect
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# ==========================
+# Datas e Status dos Eventos
+# ==========================
+@lru_cache(maxsize=None)
+def data_evento(texto):
+    """Converte uma data 'DD/MM/AAAA' em datetime, guardando o resultado em cache.
+        Retorna None se a data for inválida.
+    """
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y")
+    except (TypeError, ValueError):
+        return None
+
+def status_evento(evento, agora=None):
+    """Calcula o status do evento a partir da data: 'Finalizado', 'Disponível' ou 'Desconhecido'."""
+    data = data_evento(evento["data"])
+    if data is None:
+        return "Desconhecido"
+    return "Finalizado" if data < (agora or datetime.now()) else "Disponível"
+
+# ===========================
+# Índice Ordenado por Data
+# ===========================
+# Guarda os eventos ordenados por data para que cada verificação de status só
+# precise olhar os eventos cuja data ficou entre a verificação anterior e agora,
+# e para que as consultas por período (próximos dias, um dia, um mês) custem
+# O(log n + k) com bisect, sem percorrer nem converter o catálogo todo. O índice
+# é reconstruído quando a lista de eventos é substituída (recarga do disco) ou
+# quando muda a versão estrutural dos eventos (cadastro, exclusão ou alteração
+# de nome ou data).
+_indice = {"eventos": None, "versao": None, "datas": [], "ordenados": [], "ultima_verificacao": None}
+
+def _atualizar_indice(eventos, versao):
+    """Reconstrói o índice se os eventos mudaram. Retorna True quando houve reconstrução."""
+    if _indice["eventos"] is eventos and _indice["versao"] == versao:
+        return False
+    com_data = [(data_evento(evento["data"]), posicao, evento) for posicao, evento in enumerate(eventos)
+                if data_evento(evento["data"]) is not None]
+    com_data.sort(key=lambda item: (item[0], item[1]))
+    _indice["eventos"] = eventos
+    _indice["versao"] = versao
+    _indice["datas"] = [data for data, _, _ in com_data]
+    _indice["ordenados"] = [evento for _, _, evento in com_data]
+    # Eventos novos ou com a data alterada podem já ter passado: a próxima
+    # verificação de status confere todos.
+    _indice["ultima_verificacao"] = None
+    return True
+
+def eventos_com_status_alterado(eventos, versao, agora):
+    """Retorna os eventos cujo status armazenado difere do status calculado para 'agora'.
+        Após uma reconstrução do índice todos os eventos são conferidos; nas demais
+        chamadas, apenas os que tiveram a data ultrapassada desde a última verificação.
+    """
+    ultima = _indice["ultima_verificacao"]
+    if _atualizar_indice(eventos, versao) or ultima is None or agora < ultima:
+        candidatos = eventos
+    else:
+        inicio = bisect.bisect_left(_indice["datas"], ultima)
+        fim = bisect.bisect_left(_indice["datas"], agora)
+        candidatos = _indice["ordenados"][inicio:fim]
+    _indice["ultima_verificacao"] = agora
+    return [evento for evento in candidatos if evento.get("status") != status_evento(evento, agora)]
+
+# ========================
+# Consultas por Período
+# ========================
+def eventos_entre(eventos, versao, inicio, fim):
+    """Eventos com data em [inicio, fim), em ordem de data (e de cadastro, no mesmo dia)."""
+    _atualizar_indice(eventos, versao)
+    datas = _indice["datas"]
+    return _indice["ordenados"][bisect.bisect_left(datas, inicio):bisect.bisect_left(datas, fim)]
+
+def eventos_no_dia(eventos, versao, dia):
+    inicio = datetime(dia.year, dia.month, dia.day)
+    return eventos_entre(eventos, versao, inicio, inicio + timedelta(days=1))
+
+def eventos_no_mes(eventos, versao, ano, mes):
+    return eventos_entre(eventos, versao, datetime(ano, mes, 1), datetime(ano + mes // 12, mes % 12 + 1, 1))
+
+def proximos_eventos(eventos, versao, dias=7, agora=None):
+    """Eventos ainda não realizados (o mesmo critério de status_evento) dos próximos 'dias' dias."""
+    agora = agora or datetime.now()
+    return eventos_entre(eventos, versao, agora, agora + timedelta(days=dias))
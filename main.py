@@ -1,18 +1,26 @@
-import time
-import json
+import argparse
+import atexit
+import cProfile
 import os
-import re
+import pstats
+import sys
+import time
 from datetime import datetime
-
-# ===================================
-# Configuração do diretório de dados
-# ===================================
-data_dir = "data"
-os.makedirs(data_dir, exist_ok=True)
-
-eventos_json = os.path.join(data_dir, "eventos.json")
-alunos_json = os.path.join(data_dir, "alunos.json")
-coordenadores_json = os.path.join(data_dir, "coordenadores.json")
+from itertools import groupby
+
+import operacoes
+from operacoes import ErroOperacao, EventoLotado, validar_email, validar_data
+from indice_datas import data_evento, status_evento, eventos_com_status_alterado
+from paginacao import TAMANHO_PAGINA, iterar_eventos, paginas
+import metricas
+from metricas import instrumentar
+from exportacao import COLUNAS_EXPORTACAO, escrever_csv, exportar, exportar_em_segundo_plano
+from fila_inscricoes import JANELA_LOTE, TAMANHO_LOTE
+from sessoes import abrir_sessao, usuario_da_sessao, encerrar_sessao
+from persistencia import (
+    carregar_eventos, carregar_usuarios, BACKENDS, usar_backend, usar_codec, regravar_snapshots, migrar, buscar_usuario_por_email, versao_eventos,
+    buscar_evento_por_id, buscar_eventos, registrar_status_eventos
+)
 
 # ===================
 # Funções de Suporte
@@ -28,66 +36,81 @@ def confirmar_acao(mensagem):
         else:
             print("❌ Opção inválida. Digite 'S' para Sim ou 'N' para Não.")
 
-def gerar_user_id(usuarios):
-    """Gera um ID sequencial para os usuários."""
-    return str(max(map(int, usuarios.keys()), default=0) + 1)
-
-def validar_email(email):
-    """Valida o formato do email."""
-    padrao = r"[^@]+@[^@]+\.[^@]+"
-    return re.match(padrao, email) is not None
-
-def validar_data(data):
-    """Valida o formato da data (DD/MM/AAAA)."""
-    try:
-        datetime.strptime(data, "%d/%m/%Y")
-        return True
-    except ValueError:
-        return False
-
 # ==================================
 # Atualização de Status dos Eventos
 # ==================================
+@instrumentar
 def atualizar_status_eventos():
-    """Atualiza o status dos eventos com base na data.
+    """Atualiza o status salvo dos eventos com base na data.
         Se a data do evento já passou, define 'Finalizado';
-        caso contrário, 'Disponível'.
+        caso contrário, 'Disponível'. Só são conferidos os eventos cuja data
+        passou desde a última verificação, e só há gravação se algum status mudou
+        (uma só, com um único fsync, para todos os eventos alterados).
     """
-    eventos, eventos_inscricoes = carregar_eventos()
-    hoje = datetime.now()
-    for evento in eventos:
-        try:
-            data_evento = datetime.strptime(evento["data"], "%d/%m/%Y")
-            if data_evento < hoje:
-                evento["status"] = "Finalizado"
-            else:
-                evento["status"] = "Disponível"
-        except Exception:
-            evento["status"] = "Desconhecido"
-    salvar_eventos(eventos, eventos_inscricoes)
+    eventos, _ = carregar_eventos()
+    agora = datetime.now()
+    registrar_status_eventos({evento["id"]: status_evento(evento, agora)
+                              for evento in eventos_com_status_alterado(eventos, versao_eventos(), agora)})
 
 # ============================
 # Exibição Tabular de Eventos
 # ============================
+def continuar_paginacao():
+    """Pergunta se a próxima página deve ser exibida."""
+    return input("\n↩️ Enter para ver mais, ou 'q' para parar: ").strip().lower() not in ["q", "n", "nao", "não"]
+
 def exibir_eventos(eventos):
-    """Exibe a lista de eventos em formato tabular com cabeçalho."""
-    if not eventos:
+    """Exibe a lista de eventos em formato tabular com cabeçalho, TAMANHO_PAGINA por vez.
+        Aceita qualquer iterável (inclusive um gerador): só os eventos exibidos são lidos.
+    """
+    _, inscricoes = carregar_eventos()
+    i = 0
+    for numero_pagina, bloco in enumerate(paginas(eventos, TAMANHO_PAGINA)):
+        if numero_pagina == 0:
+            print("\n{:<7} {:<25} {:<12} {:<14} {:<12}".format("🎫 ID", "👤 Nome", "📅 Data", "🟢 Status", "🔢 Vagas Rest."))
+            print("-" * 80)
+        elif not continuar_paginacao():
+            return
+        for evento in bloco:
+            i += 1
+            vagas_restantes = evento['vagas'] - inscricoes.ocupacao(evento['id'])
+            status = status_evento(evento)
+            print("{:<8} {:<26} {:<14} {:<14} {:<12}".format(i, evento['nome'], evento['data'], status, vagas_restantes))
+    if i == 0:
         print("❌ Nenhum evento disponível.")
-        return
-    print("\n{:<7} {:<25} {:<12} {:<14} {:<12}".format("🎫 ID", "👤 Nome", "📅 Data", "🟢 Status", "🔢 Vagas Rest."))
-    print("-" * 80)
-    for i, evento in enumerate(eventos, 1):
-        vagas_restantes = evento['vagas'] - len(evento['inscritos'])
-        status = evento.get("status", "Desconhecido")
-        print("{:<8} {:<26} {:<14} {:<14} {:<12}".format(i, evento['nome'], evento['data'], status, vagas_restantes))
+
+DIAS_SEMANA = ("segunda-feira", "terça-feira", "quarta-feira", "quinta-feira", "sexta-feira", "sábado", "domingo")
+
+def exibir_calendario(eventos):
+    """Exibe os eventos (em ordem de data) agrupados por dia, cada dia em uma tabela de exibir_eventos."""
+    vazio = True
+    for dia, eventos_do_dia in groupby(eventos, key=lambda evento: data_evento(evento["data"])):
+        vazio = False
+        print(f"\n📆 {dia.strftime('%d/%m/%Y')} ({DIAS_SEMANA[dia.weekday()]})")
+        exibir_eventos(eventos_do_dia)
+    if vazio:
+        print("❌ Nenhum evento no período.")
+
+def escolher_ordem():
+    """Pergunta a ordem de exibição dos eventos. Retorna "data", "nome", "vagas" ou None (ordem de cadastro)."""
+    ordem = input("\n↕️ Ordenar por Data, Nome ou Vagas? (Enter para a ordem de cadastro): ").strip().lower()
+    return ordem if ordem in ["data", "nome", "vagas"] else None
+
+def exibir_eventos_ordenados():
+    """Exibe todos os eventos na ordem escolhida pelo usuário, página a página."""
+    eventos, inscricoes = carregar_eventos()
+    ordem = escolher_ordem()
+    exibir_eventos(evento for _, evento in iterar_eventos(eventos, versao_eventos(), inscricoes, ordem))
 
 # ===============================
 # Função de Filtragem de Evento
 # ===============================
+@instrumentar
 def filtragem_evento():
     """Filtra eventos com base no termo digitado.
         - Se o termo for numérico, retorna o evento correspondente pelo índice.
-        - Se for um trecho do nome, retorna os eventos que contenham esse trecho (case-insensitive).
+        - Se for um trecho do nome ou da descrição, retorna os eventos que contenham
+          esse trecho (ignorando maiúsculas e acentos), ordenados por relevância.
     """
     atualizar_status_eventos()
     eventos, _ = carregar_eventos()
@@ -97,8 +120,6 @@ def filtragem_evento():
     print("\nEventos disponíveis:")
     exibir_eventos(eventos)
     termo = input("\nDigite o número do evento ou um trecho do nome para filtrar (ex: '1' ou 'Nome do Evento'): ").strip()
-    print("\n⏳ Filtrando eventos...")
-    time.sleep(1.5)
     if termo.isdigit():
         indice = int(termo)
         if 1 <= indice <= len(eventos):
@@ -107,75 +128,25 @@ def filtragem_evento():
             print("🛑 Número inválido.")
             return []
     else:
-        eventos_filtrados = [evento for evento in eventos if termo.lower() in evento["nome"].lower()]
+        eventos_filtrados = buscar_eventos(termo)
         if not eventos_filtrados:
             print("🛑 Nenhum evento encontrado com esse termo\n")
         return eventos_filtrados
     
 
-# ======================
-# Persistência de Dados
-# ======================
-def carregar_eventos():
-    """Carrega os eventos do JSON e normaliza as chaves de inscrições para lowercase."""
-    if not os.path.exists(eventos_json):
-        with open(eventos_json, "w") as f:
-            json.dump({"eventos": [], "inscricoes": {}}, f)
-    with open(eventos_json, "r") as f:
-        dados_eventos = json.load(f)
-    inscricoes = {k.lower(): v for k, v in dados_eventos.get("inscricoes", {}).items()}
-    return dados_eventos.get("eventos", []), inscricoes
-
-def salvar_eventos(eventos, eventos_inscricoes):
-    """Salva os eventos e inscrições no JSON."""
-    with open(eventos_json, "w") as f:
-        json.dump({"eventos": eventos, "inscricoes": eventos_inscricoes}, f, indent=4)
-
-def carregar_usuarios():
-    """Carrega os usuários dos arquivos JSON."""
-    if not os.path.exists(alunos_json):
-        with open(alunos_json, "w") as f:
-            json.dump({}, f)
-    if not os.path.exists(coordenadores_json):
-        with open(coordenadores_json, "w") as f:
-            json.dump({}, f)
-    with open(alunos_json, "r") as f:
-        alunos = json.load(f)
-    with open(coordenadores_json, "r") as f:
-        coordenadores = json.load(f)
-    return alunos, coordenadores
-
-def salvar_usuarios(alunos, coordenadores):
-    """Salva os usuários no JSON."""
-    with open(alunos_json, "w") as f:
-        json.dump(alunos, f, indent=4)
-    with open(coordenadores_json, "w") as f:
-        json.dump(coordenadores, f, indent=4)
-
-
 # ==================
 # Funções de Login
 # ==================
+@instrumentar
 def registrar_usuario():
     """Registra um novo usuário no sistema, garantindo email único (case-insensitive)."""
-    alunos, coordenadores = carregar_usuarios()
     nome = input("\n🆕 Digite seu nome: ").strip()
     while True:
         email = input("📧 Digite seu email: ").strip().lower()
         if not validar_email(email):
             print("❌ Email inválido. Use o formato usuario@exemplo.com")
             continue
-        email_ja_registrado = False
-        for usuario in alunos.values():
-            if usuario["email"].strip().lower() == email:
-                email_ja_registrado = True
-                break
-        if not email_ja_registrado:
-            for usuario in coordenadores.values():
-                if usuario["email"].strip().lower() == email:
-                    email_ja_registrado = True
-                    break
-        if email_ja_registrado:
+        if buscar_usuario_por_email(email):
             time.sleep(1.5)
             print("🛑 Esse email já está registrado!")
             if confirmar_acao("📧 Gostaria de tentar outro email? (S/N)"):
@@ -189,43 +160,40 @@ def registrar_usuario():
         if tipo in ["aluno", "coordenador"]:
             break
         print("❌ Tipo inválido! Digite 'Aluno' ou 'Coordenador'.")
-    user_id = gerar_user_id(alunos) if tipo == "aluno" else gerar_user_id(coordenadores)
     curso = input("📚 Digite o curso que você está matriculado: ").strip() if tipo == "aluno" else None
-    usuario = {"id": user_id, "nome": nome, "email": email, "tipo": tipo, "curso": curso, "inscricoes": []}
-    if tipo == "aluno":
-        alunos[user_id] = usuario
-    else:
-        coordenadores[user_id] = usuario
-    salvar_usuarios(alunos, coordenadores)
+    try:
+        usuario = operacoes.registrar_usuario(nome, email, tipo, curso)
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return None, None
     print("\n⌛ Salvando suas credenciais, aguarde...")
     time.sleep(2)
-    print(f"✅ Registro realizado com sucesso! Seu ID é {user_id}")
+    print(f"✅ Registro realizado com sucesso! Seu ID é {usuario['id']}")
     time.sleep(1.75)
-    return user_id, tipo
+    return usuario["id"], tipo
+
+def exibir_avisos_promocao(usuario_id):
+    """Mostra os eventos em que o aluno saiu da fila de espera e foi inscrito desde o último login."""
+    eventos_promovidos = operacoes.avisos_promocao(usuario_id)
+    if eventos_promovidos:
+        print("\n🎉 Uma vaga foi liberada! Você saiu da fila de espera e está inscrito em:")
+        for evento in eventos_promovidos:
+            print(f"   ✅ {evento['nome']} ({evento['data']})")
+        time.sleep(1.5)
 
+@instrumentar
 def autenticar_usuario():
     """Autentica o usuário e retorna seu user_id e tipo."""
     while True:
-        alunos, coordenadores = carregar_usuarios()
         email = input("\n👤 Digite seu email para login: ").strip().lower()
-        usuario_encontrado = None
-        usuario_id = None
-        for key, usuario in alunos.items():
-            if usuario["email"].strip().lower() == email:
-                usuario_encontrado = usuario
-                usuario_id = key
-                break
-        if not usuario_encontrado:
-            for key, usuario in coordenadores.items():
-                if usuario["email"].strip().lower() == email:
-                    usuario_encontrado = usuario
-                    usuario_id = key
-                    break
+        usuario_encontrado = operacoes.autenticar_usuario(email)
         if usuario_encontrado:
             print("\n⌛ Efetuando login, aguarde...")
             time.sleep(2)
             print(f"✅ Login bem-sucedido! Olá, {usuario_encontrado['nome']} ({usuario_encontrado['tipo'].capitalize()})!")
-            return usuario_id, usuario_encontrado["tipo"]
+            if usuario_encontrado["tipo"] == "aluno":
+                exibir_avisos_promocao(usuario_encontrado["id"])
+            return usuario_encontrado["id"], usuario_encontrado["tipo"]
         if not confirmar_acao("❌ Usuário não encontrado. Deseja se cadastrar? (S/N)"):
             return None, None
         return registrar_usuario()
@@ -233,12 +201,12 @@ def autenticar_usuario():
 # ===================
 # Funções Principais
 # ===================
+@instrumentar
 def cadastrar_evento():
     """Cadastra um novo evento no sistema, validando duplicidade.
         Se o evento já existir, exibe o evento e interrompe o cadastro.
     """
     while True:
-        eventos, eventos_inscricoes = carregar_eventos()
         nome = input("📌 Nome do evento: ").strip()
         data = input("📅 Data do evento (DD/MM/AAAA): ").strip()
         if not validar_data(data):
@@ -259,37 +227,26 @@ def cadastrar_evento():
                 print("❌ Valor inválido. Insira um número.")
                 continue
 
-        novo_evento = {
-            'nome': nome,
-            'data': data,
-            'descricao': descricao,
-            'vagas': vagas,
-            'inscritos': []
-        }
-
-        evento_existente = None
-        for evento in eventos:
-            if (evento['nome'].strip().lower() == novo_evento['nome'].strip().lower() and
-                evento['data'].strip() == novo_evento['data'].strip() and
-                evento['descricao'].strip().lower() == novo_evento['descricao'].strip().lower() and
-                evento['vagas'] == novo_evento['vagas']):
-                evento_existente = evento
+        evento_existente = operacoes.evento_duplicado(nome, data, descricao, vagas)
 
         if evento_existente:
             print("\n🛑 Evento já existe no sistema.")
-            exibir_eventos([evento])
+            exibir_eventos([evento_existente])
             time.sleep(1.5)
             if confirmar_acao("\n❓ Gostaria de cadastrar outro evento? (S/N) "):
                 continue
             else:
                 return
         else:
-            eventos.append(novo_evento)
-            eventos_inscricoes[nome.lower()] = []
-            salvar_eventos(eventos, eventos_inscricoes)
+            try:
+                operacoes.cadastrar_evento(nome, data, descricao, vagas)
+            except ErroOperacao as erro:
+                print(f"🛑 {erro}")
+                return
             print("✅ Evento cadastrado com sucesso!")
 
 
+@instrumentar
 def atualizar_evento():
     """Atualiza os dados de um evento existente utilizando filtragem."""
     atualizar_status_eventos()
@@ -314,54 +271,45 @@ def atualizar_evento():
         else:
             evento_escolhido = eventos_filtrados[0]
         
-        eventos, eventos_inscricoes = carregar_eventos()
-        chave_evento = evento_escolhido["nome"].strip().lower()
-        for evento in eventos:
-            if evento["nome"].strip().lower() == chave_evento:
-                print("\n✅ Evento encontrado para atualização!")
-                while True:
-                    alteracao = input("\n📝 O que deseja alterar? (Nome, Data, Descrição ou Qtde de vagas): ").strip().lower()
-                    if alteracao == "nome":
-                        novo_nome = input("\n📌 Novo nome: ").strip()
-                        chave_antiga = None
-                        for chave in eventos_inscricoes:
-                            if chave == chave_evento:
-                                chave_antiga = chave
-                                break
-                        if chave_antiga:
-                            eventos_inscricoes[novo_nome.lower()] = eventos_inscricoes.pop(chave_antiga)
-                        else:
-                            eventos_inscricoes[novo_nome.lower()] = []
-                        evento["nome"] = novo_nome
-                        chave_evento = novo_nome.strip().lower()
-                    elif alteracao == "data":
-                        evento["data"] = input("\n📅 Nova data (DD/MM/AAAA): ").strip()
-                    elif alteracao in ["descricao", "descrição"]:
-                        evento["descricao"] = input("\n📖 Nova descrição: ").strip()
-                    elif alteracao in ["qtde", "qtde de vagas"]:
-                        while True:
-                            try:
-                                evento["vagas"] = int(input("\n👥 Nova quantidade de vagas: "))
-                                if evento["vagas"] <= 0:
-                                    if not confirmar_acao("🛑 Número de vagas deve ser maior que zero. Tentar novamente? (S/N) "):
-                                        return
-                                    continue
-                                break
-                            except ValueError:
-                                print("🛑 Valor inválido. Opereção cancelada.")
+        evento = buscar_evento_por_id(evento_escolhido["id"])
+        if evento:
+            print("\n✅ Evento encontrado para atualização!")
+            while True:
+                alteracao = input("\n📝 O que deseja alterar? (Nome, Data, Descrição ou Qtde de vagas): ").strip().lower()
+                if alteracao == "nome":
+                    campos = {"nome": input("\n📌 Novo nome: ").strip()}
+                elif alteracao == "data":
+                    campos = {"data": input("\n📅 Nova data (DD/MM/AAAA): ").strip()}
+                elif alteracao in ["descricao", "descrição"]:
+                    campos = {"descricao": input("\n📖 Nova descrição: ").strip()}
+                elif alteracao in ["qtde", "qtde de vagas"]:
+                    while True:
+                        try:
+                            campos = {"vagas": int(input("\n👥 Nova quantidade de vagas: "))}
+                            if campos["vagas"] <= 0:
+                                if not confirmar_acao("🛑 Número de vagas deve ser maior que zero. Tentar novamente? (S/N) "):
+                                    return
                                 continue
-                    else:
-                        print("🛑 Opção inválida. Escolha entre Nome, Data, Descrição ou Qtde de vagas.")
-                        continue
-                    print("\n⏳ Atualizando evento...")
-                    time.sleep(2)
-                    salvar_eventos(eventos, eventos_inscricoes)
-                    print("✅ Evento atualizado com sucesso!\n")
-                    if not confirmar_acao("📝 Deseja alterar mais algo neste evento? (S/N)"):
-                        print("\n⏪ Retornando ao menu")
-                        time.sleep(1.5)
-                        return
-                    break
+                            break
+                        except ValueError:
+                            print("🛑 Valor inválido. Opereção cancelada.")
+                            continue
+                else:
+                    print("🛑 Opção inválida. Escolha entre Nome, Data, Descrição ou Qtde de vagas.")
+                    continue
+                print("\n⏳ Atualizando evento...")
+                time.sleep(2)
+                try:
+                    operacoes.atualizar_evento(evento["id"], campos)
+                except ErroOperacao as erro:
+                    print(f"🛑 {erro}")
+                    continue
+                print("✅ Evento atualizado com sucesso!\n")
+                if not confirmar_acao("📝 Deseja alterar mais algo neste evento? (S/N)"):
+                    print("\n⏪ Retornando ao menu")
+                    time.sleep(1.5)
+                    return
+                break
         else:
             if not confirmar_acao("🙁 Evento não encontrado. Deseja cadastrar um novo evento? (S/N) "):
                 print("\n⏪ Retornando ao menu")
@@ -369,6 +317,7 @@ def atualizar_evento():
                 return
 
 
+@instrumentar
 def visualizar_eventos_coord():
     """Exibe a lista de eventos disponíveis em formato tabular."""
     atualizar_status_eventos()
@@ -379,7 +328,7 @@ def visualizar_eventos_coord():
         print("❌ Nenhum evento disponível.")
         return
     print("\n🎭 Eventos Disponíveis:")
-    exibir_eventos(eventos)
+    exibir_eventos_ordenados()
     time.sleep(1.5)
     print("\n❔ O que deseja fazer:\n")
     print("1️⃣ - Atualizar Evento")
@@ -403,6 +352,7 @@ def visualizar_eventos_coord():
         return
 
 
+@instrumentar
 def visualizar_eventos_alunos():
     """Exibe a lista de eventos disponíveis em formato tabular para os alunos"""
     atualizar_status_eventos()
@@ -412,9 +362,159 @@ def visualizar_eventos_alunos():
     if not eventos:
         print("❌ Nenhum evento disponível.")
         return
-    exibir_eventos(eventos)
+    exibir_eventos_ordenados()
+
+
+@instrumentar
+def calendario_eventos():
+    """Exibe o calendário dos eventos de um período: os próximos 7 dias, um dia ou um mês."""
+    atualizar_status_eventos()
+    print("\n📅 Calendário de Eventos")
+    print("1️⃣ - Próximos 7 dias")
+    print("2️⃣ - Um dia")
+    print("3️⃣ - Um mês")
+    opcao = input("👉 Escolha uma opção: ").strip()
+    try:
+        if opcao == "1":
+            eventos = operacoes.eventos_do_calendario(proximos=7)
+        elif opcao == "2":
+            eventos = operacoes.eventos_do_calendario(dia=input("📅 Digite o dia (DD/MM/AAAA): "))
+        elif opcao == "3":
+            eventos = operacoes.eventos_do_calendario(mes=input("📅 Digite o mês (MM/AAAA): "))
+        else:
+            print("❌ Opção inválida.")
+            return
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return
+    exibir_calendario(eventos)
 
+DESCRICOES_MUDANCAS = {
+    "vaga_liberada": "🟢 {quantidade} vaga(s) liberada(s)",
+    "vaga_ocupada": "🔴 {quantidade} vaga(s) ocupada(s)",
+    "evento_atualizado": "✏️ Evento alterado ({alteracoes})",
+}
 
+def acompanhar_evento(id_evento=None):
+    """Acompanha as vagas de um evento pelo feed de mudanças: a tela só é atualizada
+        quando algo muda, sem recarregar a lista de eventos. Ctrl+C encerra.
+    """
+    if id_evento is None:
+        eventos = filtragem_evento()
+        if not eventos:
+            return
+        if len(eventos) > 1:
+            exibir_eventos(eventos)
+            escolha = input("\n🔢 Número do evento a acompanhar: ").strip()
+            if not escolha.isdigit() or not 1 <= int(escolha) <= len(eventos):
+                print("🛑 Número inválido.")
+                return
+            eventos = [eventos[int(escolha) - 1]]
+        id_evento = eventos[0]["id"]
+    try:
+        resumo = operacoes.resumo_evento(operacoes.obter_evento(id_evento))
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return
+    print(f"\n👀 Acompanhando '{resumo['nome']}' ({resumo['data']}): {resumo['vagas_restantes']} de {resumo['vagas']} vagas restantes.")
+    print("   A tela só muda quando algo acontece. Pressione Ctrl+C para parar.")
+    desde = None
+    try:
+        while True:
+            resultado = operacoes.aguardar_mudancas(desde, resumo["id"])
+            desde = resultado["ultima"]
+            hora = datetime.now().strftime("%H:%M:%S")
+            if resultado["perdidas"]:
+                try:
+                    resumo = operacoes.resumo_evento(operacoes.obter_evento(resumo["id"]))
+                except ErroOperacao as erro:
+                    print(f"[{hora}] 🛑 {erro}")
+                    return
+                print(f"[{hora}] 🔄 {resumo['vagas_restantes']} vagas restantes.")
+            for mudanca in resultado["mudancas"]:
+                if mudanca["tipo"] == "evento_excluido":
+                    print(f"[{hora}] 🗑️ O evento foi excluído.")
+                    return
+                alteracoes = ", ".join(f"{campo}: {valor}" for campo, valor in mudanca.get("campos", {}).items())
+                descricao = DESCRICOES_MUDANCAS[mudanca["tipo"]].format(alteracoes=alteracoes, **mudanca)
+                print(f"[{hora}] {descricao} → {mudanca['vagas_restantes']} vagas restantes.")
+    except KeyboardInterrupt:
+        print("\n⏹️ Acompanhamento encerrado.")
+
+
+# ==========================
+# Relatórios (coordenadores)
+# ==========================
+def exibir_tabela(linhas):
+    """Exibe as linhas de um relatório como tabela, com as chaves como cabeçalho."""
+    if not linhas:
+        print("❌ Nenhum dado para o relatório.")
+        return
+    colunas = list(linhas[0])
+    larguras = [max(len(str(coluna)), *(len(str(linha[coluna])) for linha in linhas)) for coluna in colunas]
+    print("\n" + "  ".join(str(coluna).ljust(largura) for coluna, largura in zip(colunas, larguras)))
+    print("-" * (sum(larguras) + 2 * (len(colunas) - 1)))
+    for linha in linhas:
+        print("  ".join(str(linha[coluna]).ljust(largura) for coluna, largura in zip(colunas, larguras)))
+
+def aviso_exportacao(caminho):
+    """Função chamada pela thread de exportação ao terminar."""
+    def avisar(quantidade, erro):
+        if erro:
+            print(f"\n🛑 A exportação para '{caminho}' falhou: {erro}")
+        else:
+            print(f"\n✅ Exportação concluída: {quantidade} inscrições em '{caminho}'.")
+    return avisar
+
+def exportar_inscricoes_coord():
+    """Exporta listas de inscritos em CSV ou JSONL, em segundo plano, com filtros opcionais."""
+    print("\n📤 Exportar inscrições (deixe em branco para não filtrar)")
+    ids = input("🎫 IDs dos eventos, separados por vírgula: ").strip()
+    de = input("📅 Eventos a partir de (DD/MM/AAAA): ").strip() or None
+    ate = input("📅 Eventos até (DD/MM/AAAA): ").strip() or None
+    curso = input("🎓 Curso dos alunos: ").strip() or None
+    colunas = input(f"📋 Colunas ({', '.join(COLUNAS_EXPORTACAO)}): ").strip()
+    caminho = input("📄 Arquivo (.csv ou .jsonl, Enter para inscricoes.csv): ").strip() or "inscricoes.csv"
+    try:
+        exportar_em_segundo_plano(
+            caminho, aviso_exportacao(caminho),
+            ids_eventos=[parte.strip() for parte in ids.split(",")] if ids else None, de=de, ate=ate, curso=curso,
+            colunas=[parte.strip() for parte in colunas.split(",")] if colunas else None)
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return
+    print("⏳ Exportação iniciada em segundo plano; você pode continuar usando o menu.")
+
+@instrumentar
+def relatorios_coord():
+    """Exibe um dos relatórios de ocupação e inscrições e, se desejado, o exporta em CSV."""
+    print("\n📊 Relatórios:")
+    nomes = list(operacoes.RELATORIOS)
+    for numero, nome in enumerate(nomes, start=1):
+        print(f"{numero} - {operacoes.RELATORIOS[nome][0]}")
+    print(f"{len(nomes) + 1} - Exportar inscrições (CSV/JSONL)")
+    opcao = input("👉 Escolha um relatório: ").strip()
+    if opcao == str(len(nomes) + 1):
+        exportar_inscricoes_coord()
+        return
+    if not opcao.isdigit() or not 1 <= int(opcao) <= len(nomes):
+        print("❌ Opção inválida.")
+        return
+    nome = nomes[int(opcao) - 1]
+    linhas = operacoes.gerar_relatorio(nome)
+    exibir_tabela(linhas)
+    if linhas and confirmar_acao("\n💾 Deseja exportar o relatório em CSV? (S/N)"):
+        caminho = input(f"📄 Nome do arquivo (Enter para relatorio_{nome}.csv): ").strip() or f"relatorio_{nome}.csv"
+        try:
+            with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+                escrever_csv(linhas, arquivo, list(linhas[0]))
+        except OSError as erro:
+            print(f"🛑 Não foi possível gravar o arquivo: {erro}")
+            return
+        print(f"✅ Relatório exportado para '{caminho}'.")
+
+
+@instrumentar
 def excluir_evento():
     """Exclui um evento utilizando filtragem."""
     eventos_filtrados = filtragem_evento()
@@ -440,25 +540,25 @@ def excluir_evento():
         print("\n⏪ Retornando ao menu")
         time.sleep(1.5)
         return
-    eventos, eventos_inscricoes = carregar_eventos()
-    eventos = [evento for evento in eventos if evento["nome"].strip().lower() != evento_para_excluir["nome"].strip().lower()]
-    chave = evento_para_excluir["nome"].strip().lower()
-    if chave in eventos_inscricoes:
-        eventos_inscricoes.pop(chave, None)
     print("\n🚮 Excluindo evento do sistema, aguarde...")
     time.sleep(1.5)
-    salvar_eventos(eventos, eventos_inscricoes)
+    try:
+        operacoes.excluir_evento(evento_para_excluir["id"])
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return
     print("✅ Evento excluído com sucesso!")
     print("\n⏪ Retornando ao menu")
     time.sleep(1.5)
 
 
+@instrumentar
 def gerenciar_inscricoes_coord():
     """Permite ao coordenador visualizar e gerenciar inscrições de um evento."""
     while True:
         eventos_filtrados = filtragem_evento()
-        alunos, coordenadores = carregar_usuarios()
-        eventos, eventos_inscricoes = carregar_eventos()
+        _, eventos_inscricoes = carregar_eventos()
+        alunos, _ = carregar_usuarios()
         if not eventos_filtrados:
             if confirmar_acao("❌ Nenhum evento encontrado. Deseja cadastrar um evento? (S/N)"):
                 cadastrar_evento()
@@ -477,9 +577,8 @@ def gerenciar_inscricoes_coord():
                 return
         else:
             evento_escolhido = eventos_filtrados[0]
-        chave = evento_escolhido["nome"].strip().lower()
-        inscricoes = eventos_inscricoes.get(chave, [])
-        if not inscricoes:
+        id_evento = evento_escolhido["id"]
+        if not eventos_inscricoes.ocupacao(id_evento):
             if confirmar_acao(f"🛑 Não há inscrições para '{evento_escolhido['nome']}'. Deseja pesquisar outro evento? (S/N)"):
                 gerenciar_inscricoes_coord()
             else:
@@ -489,8 +588,12 @@ def gerenciar_inscricoes_coord():
         print(f"\n📋 Inscrições para '{evento_escolhido['nome']}':\n")
         print("{:<15} {:<10} {:<25} {:<30}".format("🔖 ID Inscrição", "👤 Aluno ID", "👥 Nome", "📧 Email"))
         print("-" * 80)
-        for insc in inscricoes:
-            print("{:<15} {:<10} {:<25} {:<30}".format(insc['id_inscricao'], insc['id_aluno'], insc['aluno_nome'], insc['aluno_email']))
+        for numero_pagina, bloco in enumerate(paginas(eventos_inscricoes.iterar_evento(id_evento), TAMANHO_PAGINA)):
+            if numero_pagina and not continuar_paginacao():
+                break
+            for id_inscricao, id_aluno in bloco:
+                aluno = alunos.get(id_aluno, {"nome": "?", "email": "?"})
+                print("{:<15} {:<10} {:<25} {:<30}".format(id_inscricao, id_aluno, aluno['nome'], aluno['email']))
         time.sleep(2)
         if not confirmar_acao("\n❓ Deseja excluir alguma inscrição? (S/N)"):
             return
@@ -499,55 +602,45 @@ def gerenciar_inscricoes_coord():
         except ValueError:
             print("❌ Entrada inválida. Operação cancelada!")
             return
-        inscricoes_restantes = [insc for insc in inscricoes if insc["id_inscricao"] != id_para_excluir]
-        if len(inscricoes_restantes) == len(inscricoes):
+        # O ID da inscrição não muda quando outras são canceladas: a busca é exata e
+        # feita sobre os dados atuais, então nunca atinge outro aluno.
+        _, eventos_inscricoes = carregar_eventos()
+        aluno_id_excluir = eventos_inscricoes.aluno_da_inscricao(id_evento, id_para_excluir)
+        if not aluno_id_excluir:
             if not confirmar_acao("🛑 Inscrição não encontrada. Pesquisar outro ID? (S/N)"):
                 return
-        for idx, insc in enumerate(inscricoes_restantes, start = 1):
-            insc["id_inscricao"] = idx
-        eventos_inscricoes[chave] = inscricoes_restantes
-        aluno_id_excluir = None
-        for insc in inscricoes:
-            if insc["id_inscricao"] == id_para_excluir:
-                aluno_id_excluir = insc["id_aluno"]
-                break
-        if aluno_id_excluir:
-            aluno_registrado = alunos.get(aluno_id_excluir)
-            if aluno_registrado and evento_escolhido["nome"] in aluno_registrado["inscricoes"]:
-                aluno_registrado["inscricoes"].remove(evento_escolhido["nome"])
-            nova_lista_inscritos = [al for al in evento_escolhido["inscritos"] if al["id_aluno"] != aluno_id_excluir]
-            evento_escolhido["inscritos"] = nova_lista_inscritos
-        for ev in eventos:
-            if ev["nome"].strip().lower() == chave:
-                ev["inscritos"] = evento_escolhido["inscritos"]
-                break
-        salvar_eventos(eventos, eventos_inscricoes)
-        salvar_usuarios(alunos, coordenadores)
+            continue
+        try:
+            operacoes.cancelar_inscricao(id_evento, aluno_id_excluir)
+        except ErroOperacao as erro:
+            print(f"🛑 {erro}")
+            continue
         print("✅ Inscrição excluída com sucesso!")
 
 
-def visualizar_inscricoes_aluno(usuario_id):
+@instrumentar
+def visualizar_inscricoes_aluno(aluno):
     """Permite ao aluno visualizar os eventos nos quais está inscrito e cancelar sua inscrição, se desejar."""
 
-    eventos_completos, eventos_inscricoes = carregar_eventos()
-    alunos, _ = carregar_usuarios()
-    aluno = alunos.get(usuario_id)
+    _, eventos_inscricoes = carregar_eventos()
+    usuario_id = aluno["id"]
     
     print("\n🔎 Buscando suas inscrições...")
     time.sleep(2.5)
-    
-    inscricoes = aluno.get("inscricoes", [])
+
+    gerenciar_filas_espera(usuario_id)
+    inscricoes = eventos_inscricoes.do_aluno(usuario_id)
     if not inscricoes:
         if confirmar_acao("\n😞 Você não está inscrito em nenhum evento. Deseja ver os eventos disponíveis e se inscrever? (S/N)"):
             print("\n🔎 Buscando eventos disponíveis...")
             time.sleep(2.5)
-            inscricao_evento(usuario_id)
+            inscricao_evento(aluno)
         print("\n⏪ Retornando ao menu...")
         time.sleep(1.5)
         return
 
 
-    eventos_inscritos = [evento for evento in eventos_completos if evento["nome"] in inscricoes]
+    eventos_inscritos = [buscar_evento_por_id(id_evento) for id_evento in inscricoes]
     print(f"\n👋 Olá, {aluno['nome']}! Você está inscrito nos seguintes eventos:")
     exibir_eventos(eventos_inscritos)
     
@@ -567,27 +660,14 @@ def visualizar_inscricoes_aluno(usuario_id):
             return
         
         evento_cancelar = eventos_inscritos[escolha - 1]
-        chave = evento_cancelar["nome"].strip().lower()
         
         print("\n⏳ Processando cancelamento...")
         time.sleep(2)
-        if evento_cancelar["nome"] in aluno["inscricoes"]:
-            aluno["inscricoes"].remove(evento_cancelar["nome"])
-        
-        for evento in eventos_completos:
-            if evento["nome"].strip().lower() == chave:
-                evento["inscritos"] = [insc for insc in evento["inscritos"] if insc["id_aluno"] != usuario_id]
-                break
-        
-        inscricoes_evento = eventos_inscricoes.get(chave, [])
-        novas_inscricoes = [insc for insc in inscricoes_evento if insc["id_aluno"] != usuario_id]
-        for idx, insc in enumerate(novas_inscricoes, start=1):
-            insc["id_inscricao"] = idx
-        eventos_inscricoes[chave] = novas_inscricoes
-        
-
-        salvar_eventos(eventos_completos, eventos_inscricoes)
-        salvar_usuarios(alunos, _)
+        try:
+            operacoes.cancelar_inscricao(evento_cancelar["id"], usuario_id)
+        except ErroOperacao as erro:
+            print(f"🛑 {erro}")
+            return
         print("✅ Sua inscrição foi cancelada com sucesso!")
         print("⏪ Retornando ao menu")
         time.sleep(1.5)
@@ -598,11 +678,12 @@ def visualizar_inscricoes_aluno(usuario_id):
 
 
 
-def inscricao_evento(usuario_id):
+@instrumentar
+def inscricao_evento(aluno):
     """Permite que um aluno se inscreva em um evento disponível."""
+    usuario_id = aluno["id"]
     atualizar_status_eventos()
     eventos, eventos_inscricoes = carregar_eventos()
-    alunos, coordenadores = carregar_usuarios()
 
     if not eventos:
         print("❌ Nenhum evento disponível.")
@@ -630,11 +711,11 @@ def inscricao_evento(usuario_id):
             print("🛑 Entrada inválida. Insira um número.")
 
     evento_escolhido = eventos[escolha - 1]
-    vagas_restantes = evento_escolhido['vagas'] - len(evento_escolhido['inscritos'])
+    id_evento = evento_escolhido["id"]
+    vagas_restantes = evento_escolhido['vagas'] - eventos_inscricoes.ocupacao(id_evento)
     if vagas_restantes <= 0:
         print("❌ Limite de inscrições atingido.")
-        print("⏪ Retornando ao menu")
-        time.sleep(1.5)
+        oferecer_fila_espera(usuario_id, evento_escolhido)
         return
 
     if not confirmar_acao(f"❓ Confirmar inscrição no evento '{evento_escolhido['nome']}'? (S/N)"):
@@ -643,38 +724,63 @@ def inscricao_evento(usuario_id):
         time.sleep(1.5)
         return
 
-    aluno_registrado = alunos.get(usuario_id)
-    if evento_escolhido["nome"] in aluno_registrado["inscricoes"]:
+    if eventos_inscricoes.esta_inscrito(id_evento, usuario_id):
         print("🛑 Você já está inscrito neste evento!")
-        visualizar_inscricoes_aluno(usuario_id)
+        visualizar_inscricoes_aluno(aluno)
         return
 
-    aluno_info = {
-        "id_aluno": usuario_id,
-        "aluno_nome": aluno_registrado["nome"],
-        "aluno_email": aluno_registrado["email"]
-    }
-    evento_escolhido["inscritos"].append(aluno_info)
-    aluno_registrado["inscricoes"].append(evento_escolhido["nome"])
-
-    chave_evento = evento_escolhido["nome"].strip().lower()
-    inscricoes_evento = eventos_inscricoes.get(chave_evento, [])
-    novo_id = len(inscricoes_evento) + 1
-    nova_inscricao = {
-        "id_inscricao": novo_id,
-        "id_aluno": usuario_id,
-        "aluno_nome": aluno_registrado["nome"],
-        "aluno_email": aluno_registrado["email"]
-    }
-    inscricoes_evento.append(nova_inscricao)
-    eventos_inscricoes[chave_evento] = inscricoes_evento
-
-    salvar_eventos(eventos, eventos_inscricoes)
-    salvar_usuarios(alunos, coordenadores)
+    try:
+        operacoes.inscrever_aluno(id_evento, usuario_id)
+    except EventoLotado as erro:
+        print(f"❌ {erro}")
+        oferecer_fila_espera(usuario_id, evento_escolhido)
+        return
+    except ErroOperacao as erro:
+        print(f"❌ {erro}")
+        print("⏪ Retornando ao menu")
+        time.sleep(1.5)
+        return
     print(f"✅ Inscrição realizada com sucesso no evento '{evento_escolhido['nome']}'!")
     print("⏪ Retornando ao menu")
     time.sleep(1.5)
 
+def oferecer_fila_espera(usuario_id, evento):
+    """Oferece ao aluno a fila de espera de um evento lotado."""
+    if confirmar_acao(f"⏳ Deseja entrar na fila de espera de '{evento['nome']}'? "
+                      "Você será inscrito automaticamente quando uma vaga for liberada. (S/N)"):
+        try:
+            posicao = operacoes.entrar_fila_espera(evento["id"], usuario_id)
+        except ErroOperacao as erro:
+            print(f"🛑 {erro}")
+        else:
+            print(f"✅ Você está na fila de espera, na posição {posicao}. Avisaremos no seu próximo login.")
+    print("⏪ Retornando ao menu")
+    time.sleep(1.5)
+
+def gerenciar_filas_espera(usuario_id):
+    """Mostra as filas de espera em que o aluno está e permite sair de uma delas."""
+    filas = operacoes.filas_do_aluno(usuario_id)
+    if not filas:
+        return
+    print("\n⏳ Você está na fila de espera dos seguintes eventos:")
+    for numero, (evento, posicao) in enumerate(filas, start=1):
+        print(f"   {numero}. {evento['nome']} ({evento['data']}) - posição {posicao}")
+    if not confirmar_acao("\n❓ Deseja sair de alguma fila de espera? (S/N)"):
+        return
+    try:
+        escolha = int(input("\nDigite o número da fila: ").strip())
+    except ValueError:
+        escolha = 0
+    if escolha < 1 or escolha > len(filas):
+        print("🛑 Número inválido. Operação cancelada.")
+        return
+    try:
+        operacoes.sair_fila_espera(filas[escolha - 1][0]["id"], usuario_id)
+    except ErroOperacao as erro:
+        print(f"🛑 {erro}")
+        return
+    print("✅ Você saiu da fila de espera.")
+
 
 # ===============
 # Menu Principal
@@ -694,8 +800,11 @@ def menu():
             usuario_atual, tipo_usuario = autenticar_usuario()
         else:
             print("❌ Opção inválida! Registre-se [1] ou Faça Login [2].")
+    # A partir daqui o usuário é resolvido pela sessão, em memória, a cada opção. A
+    # sessão do menu não expira por tempo parado (só as do modo serviço).
+    sessao = abrir_sessao(operacoes.obter_usuario(usuario_atual, tipo_usuario), expira=False)
     if tipo_usuario == "coordenador":
-        while True:
+        while usuario_da_sessao(sessao):
             print("\n" + "="*50)
             print("          MENU COORDENADOR          ")
             print("="*50)
@@ -704,7 +813,8 @@ def menu():
             print("3️⃣ - Visualizar Eventos")
             print("4️⃣ - Gerenciar Inscrições de Alunos")
             print("5️⃣ - Excluir Evento")
-            print("6️⃣ - Sair")
+            print("6️⃣ - Relatórios")
+            print("7️⃣ - Sair")
             opcao = input("👉 Escolha uma opção: ").strip()
             if opcao == "1":
                 cadastrar_evento()
@@ -717,30 +827,142 @@ def menu():
             elif opcao == "5":
                 excluir_evento()
             elif opcao == "6":
+                relatorios_coord()
+            elif opcao == "7":
                 print("\n👋 Saindo...\n")
                 break
             else:
                 print("❌ Opção inválida, tente novamente.")
     else:
         while True:
+            aluno = usuario_da_sessao(sessao)
+            if not aluno:
+                break
             print("\n" + "="*40)
             print("            MENU ALUNO             ")
             print("="*40)
             print("1️⃣ - Visualizar Eventos")
             print("2️⃣ - Me inscrever em Evento")
             print("3️⃣ - Minhas Inscrições")
-            print("4️⃣ - Sair")
+            print("4️⃣ - Calendário de Eventos")
+            print("5️⃣ - Acompanhar Vagas de um Evento")
+            print("6️⃣ - Sair")
             opcao = input("👉 Escolha uma opção: ").strip()
             if opcao == "1":
                 visualizar_eventos_alunos()
             elif opcao == "2":
-                inscricao_evento(usuario_atual)
+                inscricao_evento(aluno)
             elif opcao == "3":
-                visualizar_inscricoes_aluno(usuario_atual)
+                visualizar_inscricoes_aluno(aluno)
             elif opcao == "4":
+                calendario_eventos()
+            elif opcao == "5":
+                acompanhar_evento()
+            elif opcao == "6":
                 print("\n👋 Saindo...\n")
                 break
             else:
                 print("❌ Opção inválida, tente novamente.")
-
-menu()
\ No newline at end of file
+    if not encerrar_sessao(sessao):
+        print("\n🔒 Seu usuário foi removido. Faça login novamente.\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistema de Gerenciamento de Eventos")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("EVENTOS_BACKEND", "json"),
+                        help="armazenamento dos dados (padrão: json, ou a variável EVENTOS_BACKEND)")
+    parser.add_argument("--migrar-para", choices=BACKENDS, metavar="BACKEND",
+                        help="copia os dados do backend atual para BACKEND e encerra")
+    parser.add_argument("--codec", choices=["json", "json-compacto", "binario"],
+                        default=os.environ.get("EVENTOS_CODEC", "json"),
+                        help="formato de gravação dos snapshots e fragmentos (padrão: json, ou EVENTOS_CODEC)")
+    parser.add_argument("--regravar-snapshots", action="store_true",
+                        help="regrava os snapshots no formato de --codec e encerra")
+    parser.add_argument("--importar", nargs=2, metavar=("TIPO", "ARQUIVO"),
+                        help="importa alunos, coordenadores ou eventos de um arquivo CSV ou JSONL e encerra")
+    parser.add_argument("--relatorio", choices=list(operacoes.RELATORIOS),
+                        help="escreve o relatório em CSV na saída padrão e encerra")
+    parser.add_argument("--lote", action="store_true",
+                        help="com --relatorio, recalcula as estatísticas do zero a partir dos dados")
+    parser.add_argument("--exportar-inscricoes", metavar="ARQUIVO",
+                        help="exporta as inscrições em CSV ou JSONL (pela extensão; '-' para a saída padrão) e encerra")
+    parser.add_argument("--evento", action="append", metavar="ID", help="com --exportar-inscricoes, só este evento (repetível)")
+    parser.add_argument("--de", metavar="DD/MM/AAAA", help="com --exportar-inscricoes, eventos a partir desta data")
+    parser.add_argument("--ate", metavar="DD/MM/AAAA", help="com --exportar-inscricoes, eventos até esta data")
+    parser.add_argument("--curso", help="com --exportar-inscricoes, só alunos deste curso")
+    parser.add_argument("--colunas", help="com --exportar-inscricoes, colunas separadas por vírgula: " + ",".join(COLUNAS_EXPORTACAO))
+    parser.add_argument("--acompanhar", metavar="ID_EVENTO",
+                        help="acompanha as vagas do evento, mostrando só as mudanças (Ctrl+C para sair)")
+    parser.add_argument("--servico", action="store_true",
+                        help="inicia o serviço HTTP/JSON em vez do menu interativo")
+    parser.add_argument("--metricas", metavar="DIRETORIO", default=os.environ.get("EVENTOS_METRICAS"),
+                        help="coleta métricas das operações e as grava em DIRETORIO/metricas.prom e metricas.json ao sair")
+    parser.add_argument("--perfil", metavar="ARQUIVO",
+                        help="executa a sessão sob o cProfile e grava as estatísticas em ARQUIVO")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço do serviço (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=8080, help="porta do serviço (padrão: 8080)")
+    parser.add_argument("--lote-janela-ms", type=float, default=JANELA_LOTE * 1000,
+                        help=f"no serviço, tempo máximo de espera para juntar inscrições em um lote (padrão: {JANELA_LOTE * 1000:g} ms)")
+    parser.add_argument("--lote-tamanho", type=int, default=TAMANHO_LOTE,
+                        help=f"no serviço, máximo de inscrições gravadas por lote (padrão: {TAMANHO_LOTE})")
+    args = parser.parse_args()
+    if args.metricas:
+        metricas.ativar()
+        os.makedirs(args.metricas, exist_ok=True)
+        atexit.register(metricas.exportar, os.path.join(args.metricas, "metricas.prom"),
+                        os.path.join(args.metricas, "metricas.json"))
+    perfil = cProfile.Profile() if args.perfil else None
+    if perfil:
+        perfil.enable()
+    usar_codec(args.codec)
+    try:
+        if args.regravar_snapshots:
+            if args.backend == "sqlite":
+                parser.error("--regravar-snapshots só se aplica aos backends json e fragmentado")
+            usar_backend(args.backend)
+            regravar_snapshots()
+            print(f"✅ Snapshots regravados no formato '{args.codec}'.")
+        elif args.migrar_para:
+            migrar(args.backend, args.migrar_para)
+            print(f"✅ Dados migrados de '{args.backend}' para '{args.migrar_para}'.")
+        elif args.importar:
+            from importacao import importar
+            usar_backend(args.backend)
+            tipo, caminho = args.importar
+            inicio = time.perf_counter()
+            importados, erros = importar(tipo, caminho)
+            for linha, erro in erros:
+                print(f"❌ Linha {linha}: {erro}")
+            print(f"✅ {importados} {tipo} importados em {time.perf_counter() - inicio:.2f}s ({len(erros)} linhas com erro).")
+        elif args.relatorio:
+            usar_backend(args.backend)
+            linhas = operacoes.gerar_relatorio(args.relatorio, args.lote)
+            if linhas:
+                escrever_csv(linhas, sys.stdout, list(linhas[0]))
+        elif args.exportar_inscricoes:
+            usar_backend(args.backend)
+            inicio = time.perf_counter()
+            try:
+                quantidade = exportar(args.exportar_inscricoes, args.evento, args.de, args.ate, args.curso,
+                                      args.colunas.split(",") if args.colunas else None)
+            except ErroOperacao as erro:
+                parser.error(str(erro))
+            print(f"✅ {quantidade} inscrições exportadas em {time.perf_counter() - inicio:.2f}s.",
+                  file=sys.stderr if args.exportar_inscricoes == "-" else sys.stdout)
+        elif args.acompanhar:
+            usar_backend(args.backend)
+            acompanhar_evento(args.acompanhar)
+        elif args.servico:
+            from servico import iniciar
+            if args.lote_janela_ms < 0 or args.lote_tamanho < 1:
+                parser.error("--lote-janela-ms não pode ser negativo e --lote-tamanho deve ser ao menos 1")
+            usar_backend(args.backend)
+            iniciar(args.host, args.porta, args.lote_janela_ms / 1000, args.lote_tamanho)
+        else:
+            usar_backend(args.backend)
+            menu()
+    finally:
+        if perfil:
+            perfil.disable()
+            perfil.dump_stats(args.perfil)
+            print(f"\n📈 Perfil gravado em '{args.perfil}'. Funções mais custosas (tempo acumulado):")
+            pstats.Stats(perfil).sort_stats("cumulative").print_stats(15)
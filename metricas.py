@@ -0,0 +1,136 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# ==================================
+# Métricas de Operações (opcional)
+# ==================================
+# Conta, para cada operação do menu e da persistência, quantas vezes ela foi
+# chamada, o tempo total gasto (inclusive em time.sleep), os bytes lidos e
+# escritos e quantas vezes um arquivo inteiro foi regravado. Os valores são
+# inclusivos: a escrita feita por registrar_inscricao também conta para a
+# inscricao_evento do menu que a chamou.
+#
+# Fica desligado até ativar() ser chamado (main.py --metricas), e então custa
+# apenas um par de perf_counter por chamada instrumentada.
+ATIVO = False
+
+CAMPOS = ("chamadas", "segundos", "segundos_espera", "bytes_lidos", "bytes_escritos", "regravacoes")
+DESCRICOES = {
+    "chamadas": "Número de chamadas da operação",
+    "segundos": "Tempo total gasto na operação, em segundos",
+    "segundos_espera": "Tempo gasto em time.sleep dentro da operação, em segundos",
+    "bytes_lidos": "Bytes lidos do armazenamento durante a operação",
+    "bytes_escritos": "Bytes escritos no armazenamento durante a operação",
+    "regravacoes": "Arquivos inteiros regravados durante a operação",
+}
+
+_valores = {}
+_trava = threading.Lock()
+_local = threading.local()
+_sleep_original = time.sleep
+
+
+def _pilha():
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    return pilha
+
+def _somar(campo, valor):
+    """Soma o valor ao campo de todas as operações em andamento nesta thread."""
+    pilha = _pilha()
+    if not pilha:
+        return
+    with _trava:
+        for nome in set(pilha):
+            _valores.setdefault(nome, dict.fromkeys(CAMPOS, 0))[campo] += valor
+
+@contextmanager
+def medir(nome):
+    """Mede o bloco como uma chamada da operação 'nome'."""
+    if not ATIVO:
+        yield
+        return
+    pilha = _pilha()
+    pilha.append(nome)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        pilha.pop()
+        with _trava:
+            valores = _valores.setdefault(nome, dict.fromkeys(CAMPOS, 0))
+            valores["chamadas"] += 1
+            valores["segundos"] += duracao
+
+def instrumentar(funcao):
+    """Decorador: mede cada chamada da função com o nome dela."""
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        if not ATIVO:
+            return funcao(*args, **kwargs)
+        with medir(funcao.__name__):
+            return funcao(*args, **kwargs)
+    return medida
+
+def contar_leitura(quantidade):
+    if ATIVO:
+        _somar("bytes_lidos", quantidade)
+
+def contar_escrita(quantidade, regravacao=False):
+    if ATIVO:
+        _somar("bytes_escritos", quantidade)
+        if regravacao:
+            _somar("regravacoes", 1)
+
+def _sleep_medido(segundos):
+    inicio = time.perf_counter()
+    try:
+        _sleep_original(segundos)
+    finally:
+        _somar("segundos_espera", time.perf_counter() - inicio)
+
+def ativar():
+    """Liga a coleta e passa a contar o tempo de time.sleep nas operações."""
+    global ATIVO
+    ATIVO = True
+    time.sleep = _sleep_medido
+
+def instantaneo():
+    """Cópia dos valores atuais: {operação: {campo: valor}}."""
+    with _trava:
+        return {nome: dict(valores) for nome, valores in sorted(_valores.items())}
+
+def limpar():
+    with _trava:
+        _valores.clear()
+
+# ===========
+# Exportação
+# ===========
+def texto_prometheus():
+    """Métricas no formato de texto do Prometheus."""
+    valores = instantaneo()
+    linhas = []
+    for campo in CAMPOS:
+        metrica = f"eventos_operacao_{campo}_total"
+        linhas.append(f"# HELP {metrica} {DESCRICOES[campo]}")
+        linhas.append(f"# TYPE {metrica} counter")
+        # Contadores inteiros saem exatos; só os tempos, em segundos, são float.
+        formatar = repr if campo.startswith("segundos") else lambda valor: str(int(valor))
+        for nome, campos in valores.items():
+            linhas.append(f'{metrica}{{operacao="{nome}"}} {formatar(campos[campo])}')
+    return "\n".join(linhas) + "\n"
+
+def exportar(caminho_prometheus=None, caminho_json=None):
+    """Grava as métricas atuais nos arquivos informados (texto do Prometheus e/ou JSON)."""
+    if caminho_prometheus:
+        with open(caminho_prometheus, "w", encoding="utf-8") as f:
+            f.write(texto_prometheus())
+    if caminho_json:
+        with open(caminho_json, "w", encoding="utf-8") as f:
+            json.dump(instantaneo(), f, indent=4, ensure_ascii=False)
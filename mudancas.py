@@ -0,0 +1,147 @@
+import threading
+from collections import deque
+from itertools import islice
+
+# ====================================
+# Feed de Mudanças (eventos e vagas)
+# ====================================
+# Em vez de recarregar a lista de eventos de tempos em tempos para ver se abriu
+# uma vaga, um cliente pede as mudanças a partir de um número de sequência e
+# espera (long-poll) até que haja alguma. Cada mudança é um dicionário com "seq"
+# (crescente, sem buracos), "tipo", "evento" (o ID) e "vagas_restantes":
+#
+#   evento_cadastrado / evento_atualizado  -> "campos" (todos, ou só os alterados)
+#   evento_excluido
+#   vaga_ocupada / vaga_liberada           -> "quantidade"
+#
+# As mudanças não são montadas a partir das operações, e sim comparando cada
+# evento afetado com o seu último retrato (campos e ocupação). A persistência
+# chama conferir depois de cada operação aplicada (inclusive as de outros
+# processos, lidas do diário) e conferir_todos quando os dados são relidos do
+# disco (backends sqlite e fragmentado, ou um snapshot novo): o resultado é o
+# mesmo em qualquer backend. Uma inscrição e a promoção da fila que ocupa a vaga
+# na mesma operação não aparecem como mudança.
+#
+# O feed fica desligado (sem custo) até o primeiro assinante (ver
+# persistencia.ativar_mudancas). As últimas MAXIMO_MUDANCAS mudanças ficam em
+# memória; quem pedir a partir de uma sequência mais antiga, ou de outra execução
+# do processo, recebe "perdidas" e deve reler os eventos.
+MAXIMO_MUDANCAS = 10000
+CAMPOS_EVENTO = ("nome", "data", "descricao", "vagas", "status")
+
+
+def _retrato(evento, inscricoes):
+    return tuple(evento.get(campo) for campo in CAMPOS_EVENTO), inscricoes.ocupacao(evento["id"])
+
+
+class FeedMudancas:
+    """Mudanças numeradas dos eventos e das vagas, com espera por novidades."""
+
+    def __init__(self, maximo=MAXIMO_MUDANCAS):
+        self._retratos = None  # ID do evento -> (campos, ocupação); None: feed desligado
+        self._mudancas = deque(maxlen=maximo)
+        self._ultima = 0
+        self._condicao = threading.Condition()
+        self._ouvintes = []
+
+    @property
+    def ativo(self):
+        return self._retratos is not None
+
+    @property
+    def ultima(self):
+        """Sequência da mudança mais recente (0 se ainda não houve nenhuma)."""
+        return self._ultima
+
+    def ativar(self, eventos, inscricoes):
+        """Tira o retrato inicial dos eventos; a partir daí as mudanças são publicadas."""
+        if self._retratos is None:
+            self._retratos = {evento["id"]: _retrato(evento, inscricoes) for evento in eventos}
+
+    def ouvir(self, funcao):
+        """Chama funcao() (sem argumentos, na thread de quem gravou) a cada nova publicação."""
+        self._ouvintes.append(funcao)
+
+    def deixar_de_ouvir(self, funcao):
+        self._ouvintes.remove(funcao)
+
+    # ---------- publicação (chamada pela persistência, sob a sua trava) ----------
+    def conferir(self, id_evento, evento, inscricoes):
+        """Compara o evento (None se ele não existe mais) com o último retrato e publica a diferença."""
+        anterior = self._retratos.get(id_evento)
+        if evento is None:
+            if anterior is not None:
+                del self._retratos[id_evento]
+                self._publicar([{"tipo": "evento_excluido", "evento": id_evento, "vagas_restantes": 0}])
+            return
+        atual = _retrato(evento, inscricoes)
+        if atual == anterior:
+            return
+        self._retratos[id_evento] = atual
+        campos, ocupacao = atual
+        restantes = evento["vagas"] - ocupacao
+        if anterior is None:
+            self._publicar([{"tipo": "evento_cadastrado", "evento": id_evento,
+                             "campos": dict(zip(CAMPOS_EVENTO, campos)), "vagas_restantes": restantes}])
+            return
+        novas = []
+        alterados = {campo: valor for campo, valor, antigo in zip(CAMPOS_EVENTO, campos, anterior[0]) if valor != antigo}
+        if alterados:
+            novas.append({"tipo": "evento_atualizado", "evento": id_evento, "campos": alterados, "vagas_restantes": restantes})
+        if ocupacao != anterior[1]:
+            novas.append({"tipo": "vaga_ocupada" if ocupacao > anterior[1] else "vaga_liberada", "evento": id_evento,
+                          "quantidade": abs(ocupacao - anterior[1]), "vagas_restantes": restantes})
+        self._publicar(novas)
+
+    def conferir_todos(self, eventos, inscricoes):
+        """Confere todos os eventos (depois de os dados serem relidos do disco)."""
+        vistos = set()
+        for evento in eventos:
+            vistos.add(evento["id"])
+            self.conferir(evento["id"], evento, inscricoes)
+        for id_evento in self._retratos.keys() - vistos:
+            self.conferir(id_evento, None, inscricoes)
+
+    def _publicar(self, novas):
+        if not novas:
+            return
+        with self._condicao:
+            for mudanca in novas:
+                self._ultima += 1
+                self._mudancas.append({"seq": self._ultima, **mudanca})
+            self._condicao.notify_all()
+        for ouvinte in self._ouvintes:
+            ouvinte()
+
+    # ---------- consulta ----------
+    def _ler(self, desde, id_evento):
+        primeira = self._mudancas[0]["seq"] if self._mudancas else self._ultima + 1
+        if desde > self._ultima or desde < primeira - 1:
+            return [], self._ultima, True
+        mudancas = islice(self._mudancas, desde - primeira + 1, None)
+        if id_evento is not None:
+            mudancas = (mudanca for mudanca in mudancas if mudanca["evento"] == id_evento)
+        return list(mudancas), self._ultima, False
+
+    def desde(self, desde, id_evento=None):
+        """Mudanças com sequência maior que 'desde' (só as do evento, se informado).
+            Retorna (mudanças, última sequência, perdidas).
+        """
+        with self._condicao:
+            return self._ler(desde, id_evento)
+
+    def esperar(self, desde, id_evento=None, tempo=None):
+        """Como desde, mas espera até 'tempo' segundos enquanto não houver mudança."""
+        resultado = None
+
+        def pronto():
+            nonlocal resultado
+            resultado = self._ler(desde, id_evento)
+            return resultado[0] or resultado[2]
+
+        with self._condicao:
+            self._condicao.wait_for(pronto, tempo)
+            return resultado
+
+
+feed = FeedMudancas()
@@ -0,0 +1,412 @@
+import heapq
+import re
+import time
+from datetime import datetime
+
+from estatisticas import Estatisticas
+from paginacao import TAMANHO_PAGINA, iterar_eventos, pagina, decodificar_cursor, posicao_valida
+from indice_datas import data_evento, status_evento, eventos_entre, eventos_no_dia, eventos_no_mes, proximos_eventos
+from persistencia import (
+    carregar_eventos, carregar_usuarios, carregar_fila_espera, carregar_estatisticas, buscar_evento, buscar_usuario_por_email, versao_eventos,
+    buscar_evento_por_id, buscar_eventos_por_nome, buscar_eventos,
+    registrar_inscricao, registrar_cancelamento, registrar_usuario_cadastrado,
+    registrar_evento_cadastrado, registrar_evento_atualizado, registrar_evento_excluido,
+    registrar_entrada_espera, registrar_saida_espera, registrar_avisos_lidos,
+    ativar_mudancas, sincronizar
+)
+
+# ==========================================
+# Operações do Sistema (sem entrada/saída)
+# ==========================================
+# Regras de negócio compartilhadas pelo menu interativo (main.py) e pelo modo
+# serviço (servico.py). As funções não leem do teclado nem imprimem nada: em caso
+# de problema levantam ErroOperacao com a mensagem a ser mostrada ao usuário.
+class ErroOperacao(Exception):
+    """Erro de regra de negócio (email repetido, evento lotado etc.)."""
+
+class NaoEncontrado(ErroOperacao):
+    """O evento, usuário ou inscrição informado não existe."""
+
+class EventoLotado(ErroOperacao):
+    """O evento não tem mais vagas; o aluno pode entrar na fila de espera."""
+
+
+def validar_email(email):
+    """Valida o formato do email."""
+    padrao = r"[^@]+@[^@]+\.[^@]+"
+    return re.match(padrao, email) is not None
+
+def validar_data(data):
+    """Valida o formato da data (DD/MM/AAAA)."""
+    return data_evento(data) is not None
+
+# ========
+# Usuários
+# ========
+def registrar_usuario(nome, email, tipo, curso=None):
+    """Cadastra um aluno ou coordenador e retorna o registro criado."""
+    email = email.strip().lower()
+    tipo = tipo.strip().lower()
+    if not validar_email(email):
+        raise ErroOperacao("Email inválido. Use o formato usuario@exemplo.com")
+    if buscar_usuario_por_email(email):
+        raise ErroOperacao("Esse email já está registrado!")
+    if tipo not in ["aluno", "coordenador"]:
+        raise ErroOperacao("Tipo inválido! Use 'aluno' ou 'coordenador'.")
+    usuario = {"id": None, "nome": nome.strip(), "email": email, "tipo": tipo,
+               "curso": curso.strip() if tipo == "aluno" and curso else None}
+
+    def conferir_email(estado):
+        # Conferido de novo sob a trava de gravação: dois cadastros simultâneos não
+        # podem usar o mesmo email. O ID é reservado por registrar_usuario_cadastrado.
+        if estado["emails"].get(email):
+            raise ErroOperacao("Esse email já está registrado!")
+
+    registrar_usuario_cadastrado(usuario, conferir_email)
+    return usuario
+
+def autenticar_usuario(email):
+    """Retorna o registro do usuário com o email informado, ou None."""
+    encontrado = buscar_usuario_por_email(email)
+    if not encontrado:
+        return None
+    tipo, user_id = encontrado
+    alunos, coordenadores = carregar_usuarios()
+    return alunos[user_id] if tipo == "aluno" else coordenadores[user_id]
+
+def obter_usuario(user_id, tipo):
+    """Retorna o registro do usuário, ou levanta ErroOperacao se ele não existir."""
+    alunos, coordenadores = carregar_usuarios()
+    usuario = (alunos if tipo == "aluno" else coordenadores).get(user_id)
+    if not usuario:
+        raise NaoEncontrado("Usuário não encontrado.")
+    return usuario
+
+# =======
+# Eventos
+# =======
+def resumo_evento(evento, inscricoes=None):
+    """Dicionário com os dados do evento, o status calculado e as vagas restantes."""
+    if inscricoes is None:
+        _, inscricoes = carregar_eventos()
+    return {
+        "id": evento["id"],
+        "nome": evento["nome"],
+        "data": evento["data"],
+        "descricao": evento.get("descricao", ""),
+        "vagas": evento["vagas"],
+        "vagas_restantes": evento["vagas"] - inscricoes.ocupacao(evento["id"]),
+        "status": status_evento(evento),
+    }
+
+def listar_eventos():
+    eventos, inscricoes = carregar_eventos()
+    return [resumo_evento(evento, inscricoes) for evento in eventos]
+
+def pesquisar_eventos(termo):
+    _, inscricoes = carregar_eventos()
+    return [resumo_evento(evento, inscricoes) for evento in buscar_eventos(termo)]
+
+def _cursor(cursor, ordem=None):
+    """Posição guardada no cursor, conferida para a ordem pedida (None: cadastro, ou
+        inscrições). Um cursor malformado ou de outra ordem levanta ErroOperacao.
+    """
+    if cursor is None:
+        return None
+    posicao = decodificar_cursor(cursor)
+    if posicao is None or not posicao_valida(posicao, ordem):
+        raise ErroOperacao("Cursor de paginação inválido.")
+    return posicao
+
+def pagina_eventos(ordem=None, cursor=None, tamanho=TAMANHO_PAGINA):
+    """Uma página de eventos na ordem pedida ("data", "nome", "vagas" ou de cadastro).
+        Retorna (resumos, cursor da próxima página ou None).
+    """
+    if ordem not in (None, "data", "nome", "vagas"):
+        raise ErroOperacao("Ordem inválida. Use data, nome ou vagas.")
+    if tamanho <= 0:
+        raise ErroOperacao("O tamanho da página deve ser maior que zero.")
+    eventos, inscricoes = carregar_eventos()
+    itens, proximo = pagina(iterar_eventos(eventos, versao_eventos(), inscricoes, ordem, _cursor(cursor, ordem)), tamanho)
+    return [resumo_evento(evento, inscricoes) for evento in itens], proximo
+
+def eventos_do_calendario(dia=None, mes=None, proximos=None):
+    """Eventos de um dia ('DD/MM/AAAA'), de um mês ('MM/AAAA') ou dos próximos N
+        dias (ainda não realizados), em ordem de data. Informe só um dos três.
+    """
+    if [dia, mes, proximos].count(None) != 2:
+        raise ErroOperacao("Informe um dia, um mês ou um número de dias.")
+    eventos, _ = carregar_eventos()
+    if dia is not None:
+        data = data_evento(dia.strip())
+        if data is None:
+            raise ErroOperacao("Data inválida! Use o formato DD/MM/AAAA")
+        return eventos_no_dia(eventos, versao_eventos(), data)
+    if mes is not None:
+        data = data_evento("01/" + mes.strip())
+        if data is None:
+            raise ErroOperacao("Mês inválido! Use o formato MM/AAAA")
+        return eventos_no_mes(eventos, versao_eventos(), data.year, data.month)
+    if proximos < 1:
+        raise ErroOperacao("O número de dias deve ser maior que zero.")
+    return proximos_eventos(eventos, versao_eventos(), proximos)
+
+def obter_evento(id_evento):
+    """Retorna o evento pelo ID (número ou texto com o número), ou levanta ErroOperacao se ele não existir."""
+    try:
+        evento = buscar_evento_por_id(int(id_evento))
+    except (TypeError, ValueError):
+        evento = None
+    if not evento:
+        raise NaoEncontrado("Evento não encontrado.")
+    return evento
+
+def chave_evento(evento):
+    """Dados que identificam um evento repetido: nome, data, descrição e vagas
+        (nome e descrição sem diferenciar maiúsculas).
+    """
+    return (evento["nome"].strip().lower(), evento["data"].strip(),
+            evento["descricao"].strip().lower(), evento["vagas"])
+
+def evento_duplicado(nome, data, descricao, vagas):
+    """Retorna o evento já cadastrado com os mesmos dados, se houver.
+        Eventos com o mesmo nome, mas data, descrição ou vagas diferentes, não são duplicados.
+    """
+    chave = chave_evento({"nome": nome, "data": data, "descricao": descricao, "vagas": vagas})
+    for evento in buscar_eventos_por_nome(nome):
+        if chave_evento(evento) == chave:
+            return evento
+    return None
+
+def _validar_vagas(vagas):
+    if not isinstance(vagas, int) or isinstance(vagas, bool) or vagas <= 0:
+        raise ErroOperacao("O número de vagas deve ser maior que zero.")
+
+def cadastrar_evento(nome, data, descricao, vagas):
+    """Cadastra um evento, validando data, vagas e duplicidade."""
+    if not nome.strip():
+        raise ErroOperacao("Informe o nome do evento.")
+    if not validar_data(data):
+        raise ErroOperacao("Data inválida! Use o formato DD/MM/AAAA")
+    _validar_vagas(vagas)
+    if evento_duplicado(nome, data, descricao, vagas):
+        raise ErroOperacao("Evento já existe no sistema.")
+    evento = {"id": None, "nome": nome.strip(), "data": data.strip(), "descricao": descricao.strip(), "vagas": vagas}
+    chave = chave_evento(evento)
+
+    def conferir_duplicado(estado):
+        # Conferido de novo sob a trava de gravação, como o email em registrar_usuario:
+        # dois cadastros simultâneos não podem criar o mesmo evento.
+        if any(chave_evento(existente) == chave for existente in estado["eventos_por_nome"].get(chave[0], {}).values()):
+            raise ErroOperacao("Evento já existe no sistema.")
+
+    registrar_evento_cadastrado(evento, conferir_duplicado)
+    return evento
+
+def atualizar_evento(id_evento, campos):
+    """Altera nome, data, descrição e/ou vagas de um evento e retorna o evento atualizado."""
+    evento = obter_evento(id_evento)
+    campos = {campo: valor for campo, valor in campos.items() if campo in ("nome", "data", "descricao", "vagas")}
+    if not campos:
+        raise ErroOperacao("Nada para alterar. Use nome, data, descricao ou vagas.")
+    for campo in ("nome", "data", "descricao"):
+        if campo in campos and not isinstance(campos[campo], str):
+            raise ErroOperacao(f"Campo '{campo}' inválido: informe um texto.")
+    if "data" in campos and not validar_data(campos["data"]):
+        raise ErroOperacao("Data inválida! Use o formato DD/MM/AAAA")
+    if "vagas" in campos:
+        _validar_vagas(campos["vagas"])
+    if "nome" in campos and not campos["nome"].strip():
+        raise ErroOperacao("Informe o nome do evento.")
+    registrar_evento_atualizado(evento["id"], campos)
+    return evento
+
+def excluir_evento(id_evento):
+    registrar_evento_excluido(obter_evento(id_evento)["id"])
+
+# ==========
+# Inscrições
+# ==========
+def conferir_inscricao(estado, id_evento, id_aluno, reservadas=0):
+    """Confere vagas e inscrição repetida sobre o estado já sincronizado, sob a trava de
+        gravação. 'reservadas' são as vagas do evento já tomadas por inscrições ainda não
+        aplicadas (as aceitas antes no mesmo lote; ver fila_inscricoes.py).
+    """
+    evento = buscar_evento(estado, id_evento)
+    if evento is None:
+        raise NaoEncontrado("Evento não encontrado.")
+    if estado["inscricoes"].esta_inscrito(id_evento, id_aluno):
+        raise ErroOperacao("Você já está inscrito neste evento!")
+    if evento["vagas"] - estado["inscricoes"].ocupacao(id_evento) - reservadas <= 0:
+        raise EventoLotado("Limite de inscrições atingido.")
+
+def inscrever_aluno(id_evento, id_aluno):
+    """Inscreve o aluno no evento, conferindo vagas e inscrição repetida.
+        A conferência é refeita sob a trava de gravação, junto com o registro da
+        inscrição: dois alunos disputando a última vaga não podem ambos entrar.
+    """
+    id_evento = obter_evento(id_evento)["id"]
+    obter_usuario(id_aluno, "aluno")
+    registrar_inscricao(id_evento, id_aluno, lambda estado: conferir_inscricao(estado, id_evento, id_aluno))
+
+def cancelar_inscricao(id_evento, id_aluno):
+    id_evento = obter_evento(id_evento)["id"]
+    _, inscricoes = carregar_eventos()
+    if not inscricoes.esta_inscrito(id_evento, id_aluno):
+        raise NaoEncontrado("Inscrição não encontrada.")
+    registrar_cancelamento(id_evento, id_aluno)
+
+def iterar_inscricoes_evento(id_evento, apos=0):
+    """Gera as inscrições do evento (ID da inscrição, ID, nome e email do aluno) depois da de ID 'apos'."""
+    evento = obter_evento(id_evento)
+    _, inscricoes = carregar_eventos()
+    alunos, _ = carregar_usuarios()
+    for id_inscricao, id_aluno in inscricoes.iterar_evento(evento["id"], apos + 1):
+        aluno = alunos.get(id_aluno, {"nome": "?", "email": "?"})
+        yield {"id_inscricao": id_inscricao, "id_aluno": id_aluno,
+               "aluno_nome": aluno["nome"], "aluno_email": aluno["email"]}
+
+def inscricoes_do_evento(id_evento):
+    """Lista as inscrições do evento com ID da inscrição, ID, nome e email do aluno."""
+    return list(iterar_inscricoes_evento(id_evento))
+
+def pagina_inscricoes_evento(id_evento, cursor=None, tamanho=TAMANHO_PAGINA):
+    """Uma página das inscrições do evento. Retorna (inscrições, cursor da próxima página ou None)."""
+    if tamanho <= 0:
+        raise ErroOperacao("O tamanho da página deve ser maior que zero.")
+    apos = _cursor(cursor)
+    inscricoes = iterar_inscricoes_evento(id_evento, apos[0] if apos else 0)
+    return pagina((((insc["id_inscricao"],), insc) for insc in inscricoes), tamanho)
+
+def eventos_do_aluno(id_aluno):
+    """Lista os eventos em que o aluno está inscrito."""
+    obter_usuario(id_aluno, "aluno")
+    _, inscricoes = carregar_eventos()
+    return [buscar_evento_por_id(id_evento) for id_evento in inscricoes.do_aluno(id_aluno)]
+
+# ==============
+# Fila de Espera
+# ==============
+def entrar_fila_espera(id_evento, id_aluno):
+    """Coloca o aluno na fila de espera do evento lotado e retorna a posição dele na fila.
+        Quando uma vaga for liberada, o primeiro da fila é inscrito automaticamente.
+    """
+    id_evento = obter_evento(id_evento)["id"]
+    obter_usuario(id_aluno, "aluno")
+
+    def conferir_lotado(estado):
+        evento = buscar_evento(estado, id_evento)
+        if evento is None:
+            raise NaoEncontrado("Evento não encontrado.")
+        if estado["inscricoes"].esta_inscrito(id_evento, id_aluno):
+            raise ErroOperacao("Você já está inscrito neste evento!")
+        if estado["espera"].esta_na_fila(id_evento, id_aluno):
+            raise ErroOperacao("Você já está na fila de espera deste evento!")
+        if evento["vagas"] - estado["inscricoes"].ocupacao(id_evento) > 0:
+            raise ErroOperacao("Ainda há vagas neste evento: faça a inscrição.")
+
+    registrar_entrada_espera(id_evento, id_aluno, conferir_lotado)
+    return carregar_fila_espera().posicao(id_evento, id_aluno)
+
+def sair_fila_espera(id_evento, id_aluno):
+    id_evento = obter_evento(id_evento)["id"]
+    if not carregar_fila_espera().esta_na_fila(id_evento, id_aluno):
+        raise NaoEncontrado("Você não está na fila de espera deste evento.")
+    registrar_saida_espera(id_evento, id_aluno)
+
+def filas_do_aluno(id_aluno):
+    """Lista de (evento, posição na fila) das filas de espera em que o aluno está."""
+    espera = carregar_fila_espera()
+    return [(buscar_evento_por_id(id_evento), espera.posicao(id_evento, id_aluno))
+            for id_evento in espera.do_aluno(id_aluno)]
+
+def avisos_promocao(id_aluno):
+    """Eventos em que o aluno foi inscrito a partir da fila de espera desde o último aviso.
+        Os avisos são descartados depois de lidos.
+    """
+    ids_eventos = carregar_fila_espera().avisos_do_aluno(id_aluno)
+    if not ids_eventos:
+        return []
+    registrar_avisos_lidos(id_aluno, ids_eventos)
+    return [evento for evento in map(buscar_evento_por_id, ids_eventos) if evento]
+
+# ==================
+# Feed de Mudanças
+# ==================
+# Intervalo (em segundos) entre as conferências do armazenamento enquanto se espera
+# por mudanças: as gravações deste processo chegam na hora, as de outros processos
+# aparecem na conferência seguinte (ver mudancas.py).
+INTERVALO_SINCRONIZACAO = 0.5
+
+def aguardar_mudancas(desde=None, id_evento=None, espera=30):
+    """Mudanças de eventos e vagas com sequência maior que 'desde' (None: a partir de
+        agora), só as do evento, se informado. Espera até 'espera' segundos enquanto não
+        houver nenhuma. Retorna {"mudancas": [...], "ultima": seq, "perdidas": bool};
+        com "perdidas", parte das mudanças não está mais disponível e os eventos devem
+        ser relidos.
+    """
+    feed = ativar_mudancas()
+    if desde is None:
+        desde = feed.ultima
+    limite = time.monotonic() + espera
+    while True:
+        restante = limite - time.monotonic()
+        mudancas, ultima, perdidas = feed.esperar(desde, id_evento, max(0, min(restante, INTERVALO_SINCRONIZACAO)))
+        if mudancas or perdidas or restante <= 0:
+            return {"mudancas": mudancas, "ultima": ultima, "perdidas": perdidas}
+        sincronizar()
+
+# ==========
+# Relatórios
+# ==========
+# Cada relatório é uma lista de linhas: dicionários com as mesmas chaves, na ordem
+# das colunas, prontos para serem exibidos como tabela ou exportados em CSV.
+def _taxa(inscritos, vagas):
+    return round(100 * inscritos / vagas, 1) if vagas else 0.0
+
+def _linha_ocupacao(evento, inscricoes):
+    inscritos = inscricoes.ocupacao(evento["id"])
+    return {"id": evento["id"], "nome": evento["nome"], "data": evento["data"], "vagas": evento["vagas"],
+            "inscritos": inscritos, "ocupacao_pct": _taxa(inscritos, evento["vagas"])}
+
+def relatorio_ocupacao():
+    """Ocupação de cada evento, na ordem de cadastro."""
+    eventos, inscricoes = carregar_eventos()
+    return [_linha_ocupacao(evento, inscricoes) for evento in eventos]
+
+def relatorio_populares(quantidade=10):
+    """Os eventos ainda não realizados com mais inscritos (empates: o mais próximo primeiro)."""
+    eventos, inscricoes = carregar_eventos()
+    futuros = eventos_entre(eventos, versao_eventos(), datetime.now(), datetime.max)
+    populares = heapq.nlargest(quantidade, futuros, key=lambda evento: inscricoes.ocupacao(evento["id"]))
+    return [_linha_ocupacao(evento, inscricoes) for evento in populares]
+
+def _estatisticas(lote):
+    if not lote:
+        return carregar_estatisticas()
+    eventos, inscricoes = carregar_eventos()
+    alunos, _ = carregar_usuarios()
+    return Estatisticas.de_estado(eventos, inscricoes, alunos)
+
+def relatorio_cursos(lote=False):
+    """Inscrições por curso dos alunos. Com lote=True os contadores são recalculados do zero."""
+    return [{"curso": curso or "(sem curso)", "inscricoes": total} for curso, total in _estatisticas(lote).por_curso()]
+
+def relatorio_mensal(lote=False):
+    """Taxa de ocupação ao longo do tempo: inscritos e vagas somados por mês dos eventos."""
+    return [{"mes": f"{mes[5:]}/{mes[:4]}", "inscritos": inscritos, "vagas": vagas, "ocupacao_pct": _taxa(inscritos, vagas)}
+            for mes, inscritos, vagas in _estatisticas(lote).por_mes()]
+
+RELATORIOS = {
+    "ocupacao": ("Ocupação por evento", relatorio_ocupacao),
+    "cursos": ("Inscrições por curso", relatorio_cursos),
+    "mensal": ("Ocupação por mês", relatorio_mensal),
+    "populares": ("Próximos eventos mais procurados", relatorio_populares),
+}
+
+def gerar_relatorio(nome, lote=False):
+    """Linhas do relatório 'nome' (uma das chaves de RELATORIOS)."""
+    if nome not in RELATORIOS:
+        raise ErroOperacao("Relatório inválido. Use " + ", ".join(RELATORIOS) + ".")
+    _, funcao = RELATORIOS[nome]
+    return funcao(lote) if nome in ("cursos", "mensal") else funcao()
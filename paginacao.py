@@ -0,0 +1,107 @@
+import base64
+import bisect
+import heapq
+import json
+from itertools import islice
+
+from indice_datas import data_evento
+from indice_busca import normalizar_texto
+
+# ======================
+# Paginação por Cursor
+# ======================
+# As listagens são geradores preguiçosos que produzem pares (posição, item),
+# onde a posição é a chave de ordenação do item (desempatada pelo ID). O cursor
+# de uma página é a posição do último item exibido; a página seguinte começa
+# logo depois dele, mesmo que eventos tenham sido cadastrados ou excluídos nesse
+# meio tempo. Na ordem de cadastro a posição é o ID do evento, que só cresce.
+#
+# Para as ordens por data, por nome e de cadastro é mantido um índice ordenado
+# (reconstruído só quando a versão dos eventos muda), então cada página custa
+# O(log n + página).
+# A ordem por vagas restantes muda a cada inscrição e não tem índice: os eventos
+# são organizados em um heap e retirados um a um, só até completar a página.
+TAMANHO_PAGINA = 20
+ORDENS_EVENTOS = ("data", "nome", "vagas")
+
+# Tipos dos elementos da posição guardada no cursor de cada ordem (None: cadastro).
+FORMATOS_POSICAO = {None: (int,), "data": (str, int), "nome": (str, int), "vagas": (int, int)}
+
+_indices = {}
+
+
+def codificar_cursor(posicao):
+    """Transforma a posição de um item em um texto opaco, seguro para URLs."""
+    return base64.urlsafe_b64encode(json.dumps(posicao).encode("utf-8")).decode("ascii")
+
+def decodificar_cursor(cursor):
+    """Retorna a posição guardada no cursor, ou None se ele for inválido."""
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii"))))
+    except (ValueError, TypeError):
+        return None
+
+def posicao_valida(posicao, ordem=None):
+    """Confere se a posição decodificada de um cursor tem o formato da ordem pedida
+        (um cursor de outra ordem não serve para continuar a listagem).
+    """
+    formato = FORMATOS_POSICAO[ordem]
+    return (len(posicao) == len(formato) and
+            all(type(valor) is tipo for valor, tipo in zip(posicao, formato)))
+
+def _posicao_data(evento):
+    data = data_evento(evento["data"])
+    return (data.strftime("%Y-%m-%d") if data else "9999-99-99", evento["id"])
+
+def _posicao_nome(evento):
+    return (normalizar_texto(evento["nome"]), evento["id"])
+
+def _posicao_cadastro(evento):
+    return (evento["id"],)
+
+_POSICOES = {"data": _posicao_data, "nome": _posicao_nome, None: _posicao_cadastro}
+
+def _indice_ordenado(eventos, versao, ordem):
+    """Posições e eventos ordenados, guardados até a próxima mudança de versão."""
+    indice = _indices.get(ordem)
+    if indice is None or indice[0] is not eventos or indice[1] != versao:
+        posicao = _POSICOES[ordem]
+        pares = sorted(((posicao(evento), evento) for evento in eventos), key=lambda par: par[0])
+        indice = (eventos, versao, [p for p, _ in pares], [e for _, e in pares])
+        _indices[ordem] = indice
+    return indice[2], indice[3]
+
+def iterar_eventos(eventos, versao, inscricoes, ordem=None, apos=None):
+    """Gera (posição, evento) na ordem pedida ("data", "nome", "vagas" ou None para a
+        ordem de cadastro), começando depois da posição 'apos'.
+    """
+    if ordem == "vagas":
+        heap = []
+        for numero, evento in enumerate(eventos):
+            posicao = (inscricoes.ocupacao(evento["id"]) - evento["vagas"], evento["id"])
+            if apos is None or posicao > apos:
+                heap.append((posicao, numero, evento))
+        heapq.heapify(heap)
+        while heap:
+            posicao, _, evento = heapq.heappop(heap)
+            yield posicao, evento
+    else:
+        posicoes, ordenados = _indice_ordenado(eventos, versao, ordem)
+        inicio = bisect.bisect_right(posicoes, apos) if apos else 0
+        for i in range(inicio, len(ordenados)):
+            yield posicoes[i], ordenados[i]
+
+def pagina(itens, tamanho=TAMANHO_PAGINA):
+    """Lê do gerador apenas uma página. Retorna (itens, cursor da próxima página ou None)."""
+    pares = list(islice(itens, tamanho + 1))
+    proximo = codificar_cursor(pares[tamanho - 1][0]) if len(pares) > tamanho else None
+    return [item for _, item in pares[:tamanho]], proximo
+
+def paginas(itens, tamanho=TAMANHO_PAGINA):
+    """Divide qualquer iterável em listas de até 'tamanho' itens, sob demanda."""
+    itens = iter(itens)
+    while True:
+        bloco = list(islice(itens, tamanho))
+        if not bloco:
+            return
+        yield bloco
@@ -0,0 +1,863 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+from codificacao import CODECS, codificar, decodificar
+from fila_espera import FilaEspera
+from estatisticas import Estatisticas
+from indice_busca import IndiceBusca
+from metricas import instrumentar, medir, contar_leitura, contar_escrita
+from mudancas import feed
+from registros import (
+    Evento, Aluno, Coordenador, internar, usuarios_de_dict, usuarios_para_dict, eventos_para_lista
+)
+from tabela_inscricoes import TabelaInscricoes
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+# ===================================
+# Configuração do diretório de dados
+# ===================================
+data_dir = "data"
+os.makedirs(data_dir, exist_ok=True)
+
+eventos_json = os.path.join(data_dir, "eventos.json")
+alunos_json = os.path.join(data_dir, "alunos.json")
+coordenadores_json = os.path.join(data_dir, "coordenadores.json")
+diario_log = os.path.join(data_dir, "diario.log")
+indice_emails_json = os.path.join(data_dir, "indice_emails.json")
+sequencias_json = os.path.join(data_dir, "sequencias.json")
+
+# Quantidade de operações no diário que dispara a compactação em segundo plano.
+LIMITE_DIARIO = 500
+
+# Salva o índice de emails em data/indice_emails.json para não reconstruí-lo a cada inicialização.
+INDICE_EMAILS_PERSISTENTE = True
+
+# Backends de armazenamento disponíveis (ver usar_backend).
+BACKENDS = ("json", "sqlite", "fragmentado")
+
+# Tipos de entidade com sequência própria de IDs (ver reservar_ids).
+SEQUENCIAS = ("aluno", "coordenador", "evento", "inscricao")
+
+# Formato em que os snapshots são gravados: "json" (indentado), "json-compacto" ou
+# "binario" (ver codificacao.py). A leitura aceita qualquer um deles.
+CODEC_SNAPSHOTS = os.environ.get("EVENTOS_CODEC", "json")
+
+# ===========================
+# Estado em Memória dos Dados
+# ===========================
+# Os dados são lidos do armazenamento uma única vez por processo e mantidos em
+# _estado: "eventos", "inscricoes" (uma TabelaInscricoes), "espera" (uma FilaEspera),
+# "alunos", "coordenadores" e os índices "eventos_por_id" (ID -> evento), "eventos_por_nome" (nome em
+# lowercase -> {ID: evento}), "emails" (email -> (tipo, id) para os dois arquivos
+# de usuários), "busca" (IndiceBusca, montado na primeira busca e depois mantido
+# a cada operação) e "estatisticas" (Estatisticas, da mesma forma, no primeiro
+# relatório). Cada evento tem um "id" numérico que nunca muda; o nome é só
+# um atributo, então dois eventos podem ter o mesmo nome. Os IDs de alunos,
+# coordenadores, eventos e inscrições saem de "sequencias" (tipo -> próximo ID),
+# gravada junto com os dados: um ID nunca é reaproveitado. A cada consulta o
+# backend verifica, de forma barata, se outro processo alterou os dados e só então
+# os relê. Inscrições, cancelamentos e alterações de eventos são operações
+# (dicionários com a chave "op") aplicadas em memória por aplicar_operacao e
+# persistidas pelo backend sem regravar todo o conjunto de dados.
+#
+# Eventos, alunos e coordenadores são registros compactos (ver registros.py), que
+# se usam como dicionários e voltam a ser dicionários na gravação.
+#
+# Os objetos devolvidos por carregar_* são os mesmos guardados em memória: quem
+# alterar uma lista ou dicionário retornado deve persistir a alteração com a função
+# salvar_* correspondente ou com uma das funções registrar_*.
+_estado = {}
+_trava = threading.RLock()
+
+def escrever_snapshot(caminho, dados):
+    """Grava os dados (no formato CODEC_SNAPSHOTS) em um arquivo temporário e o renomeia,
+        para nunca deixar um arquivo pela metade.
+    """
+    conteudo = codificar(dados, CODEC_SNAPSHOTS)
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    contar_escrita(len(conteudo), regravacao=True)
+    os.replace(temporario, caminho)
+
+def ler_snapshot(caminho, padrao):
+    if not os.path.exists(caminho):
+        escrever_snapshot(caminho, padrao)
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    contar_leitura(len(conteudo))
+    return decodificar(conteudo)
+
+# =================
+# Índice de Emails
+# =================
+def normalizar_email(email):
+    return email.strip().lower()
+
+def construir_indice_emails(alunos, coordenadores):
+    """Monta o índice email -> (tipo, id). Em caso de email repetido, o aluno tem prioridade, como no login."""
+    indice = {}
+    for tipo, usuarios in (("aluno", alunos), ("coordenador", coordenadores)):
+        for user_id, usuario in usuarios.items():
+            indice.setdefault(internar(normalizar_email(usuario["email"])), (tipo, user_id))
+    return indice
+
+# =====================================
+# Operações (inscrições, eventos etc.)
+# =====================================
+# As operações são idempotentes: reaplicá-las sobre um estado que já as contém
+# (ex.: queda do processo entre gravar o snapshot e truncar o diário) não duplica dados.
+def migrar_ids_eventos(eventos, inscricoes):
+    """Converte o formato antigo, em que os eventos não tinham ID e as inscrições eram
+        indexadas pelo nome em lowercase: numera os eventos na ordem da lista (sempre
+        do mesmo jeito, em qualquer processo) e retorna as inscrições indexadas pelo ID.
+        Com nomes repetidos, as inscrições ficam com o primeiro evento, como antes.
+    """
+    if all("id" in evento for evento in eventos):
+        return inscricoes
+    proximo_id = max((evento["id"] for evento in eventos if "id" in evento), default=0) + 1
+    por_nome = {}
+    for posicao, evento in enumerate(eventos):
+        if "id" not in evento:
+            eventos[posicao] = evento = {"id": proximo_id, **evento}
+            proximo_id += 1
+        por_nome.setdefault(evento["nome"].strip().lower(), evento["id"])
+    return {str(por_nome[nome.lower()]): lista for nome, lista in inscricoes.items() if nome.lower() in por_nome}
+
+def indexar_eventos(estado):
+    """Monta os índices ID -> evento e nome (em lowercase) -> {ID: evento}.
+        O índice de busca e as estatísticas são descartados e remontados no próximo uso.
+    """
+    por_id, por_nome = {}, {}
+    for evento in estado["eventos"]:
+        por_id[evento["id"]] = evento
+        por_nome.setdefault(evento["nome"].strip().lower(), {})[evento["id"]] = evento
+    estado["eventos_por_id"] = por_id
+    estado["eventos_por_nome"] = por_nome
+    estado["busca"] = None
+    estado["estatisticas"] = None
+    if feed.ativo:
+        feed.conferir_todos(estado["eventos"], estado["inscricoes"])
+
+def indexar_sequencias(estado, salvas=None):
+    """Calcula o próximo ID de cada tipo de entidade: o maior entre o valor salvo (ou o
+        atual, se salvas não for informado) e o maior ID em uso + 1. Assim dados antigos,
+        sem sequências gravadas, continuam de onde pararam, e um ID excluído não volta.
+    """
+    if salvas is None:
+        salvas = estado.get("sequencias", {})
+    em_uso = {
+        "aluno": max(map(int, estado["alunos"]), default=0),
+        "coordenador": max(map(int, estado["coordenadores"]), default=0),
+        "evento": max(estado["eventos_por_id"], default=0),
+        "inscricao": estado["inscricoes"].maior_id(),
+    }
+    estado["sequencias"] = {entidade: max(salvas.get(entidade, 1), em_uso[entidade] + 1)
+                            for entidade in SEQUENCIAS}
+
+def reservar_ids(estado, entidade, quantidade=1):
+    """Reserva 'quantidade' IDs consecutivos do tipo de entidade e retorna o primeiro. O(1).
+        Deve ser chamada sob a trava de gravação (em conferir ou preparar), para que dois
+        processos não reservem o mesmo ID.
+    """
+    sequencias = estado["sequencias"]
+    primeiro = sequencias[entidade]
+    sequencias[entidade] = primeiro + quantidade
+    return primeiro
+
+def _avancar_sequencia(estado, entidade, id_usado):
+    """Garante que a sequência fique depois de um ID já usado (operações de outros processos)."""
+    sequencias = estado["sequencias"]
+    if id_usado >= sequencias[entidade]:
+        sequencias[entidade] = id_usado + 1
+
+def buscar_evento(estado, id_evento):
+    """Retorna o evento com o ID informado, ou None."""
+    return estado["eventos_por_id"].get(id_evento)
+
+def _promocoes(estado, id_evento, vagas_livres):
+    """Escolhe os primeiros da fila de espera para as vagas livres do evento e reserva os
+        IDs das inscrições. Retorna a lista para o campo "promovidos" da operação.
+    """
+    return [{"id_aluno": id_aluno, "id_inscricao": reservar_ids(estado, "inscricao")}
+            for id_aluno in estado["espera"].primeiros(id_evento, vagas_livres)]
+
+def _aplicar_promocoes(estado, id_evento, promovidos):
+    """Inscreve os alunos promovidos da fila e guarda o aviso para o próximo login."""
+    for promovido in promovidos:
+        id_aluno = promovido["id_aluno"]
+        _avancar_sequencia(estado, "inscricao", promovido["id_inscricao"])
+        estado["espera"].sair(id_evento, id_aluno)
+        if id_aluno in estado["alunos"] and estado["inscricoes"].inscrever(id_evento, id_aluno, promovido["id_inscricao"]):
+            estado["espera"].avisar(id_evento, id_aluno)
+            _contar_inscricao(estado, estado["eventos_por_id"][id_evento], id_aluno, 1)
+
+def _contar_inscricao(estado, evento, id_aluno, sinal):
+    """Atualiza as estatísticas (se já montadas) com uma inscrição ou um cancelamento."""
+    if estado["estatisticas"] and evento:
+        aluno = estado["alunos"].get(id_aluno)
+        estado["estatisticas"].contar_inscricao(evento, aluno.get("curso") if aluno else None, sinal)
+
+def _id_evento_da_operacao(estado, referencia):
+    """Diários gravados antes dos IDs identificam o evento pelo nome em lowercase
+        (vale o primeiro evento com esse nome); os atuais, pelo ID.
+    """
+    if isinstance(referencia, str):
+        return next(iter(estado["eventos_por_nome"].get(referencia, ())), None)
+    return referencia
+
+def _indexar_nome(estado, evento):
+    estado["eventos_por_nome"].setdefault(evento["nome"].strip().lower(), {})[evento["id"]] = evento
+
+def _desindexar_nome(estado, evento):
+    nome = evento["nome"].strip().lower()
+    mesmo_nome = estado["eventos_por_nome"].get(nome, {})
+    mesmo_nome.pop(evento["id"], None)
+    if not mesmo_nome:
+        estado["eventos_por_nome"].pop(nome, None)
+
+def _eventos_afetados(estado, op):
+    """IDs dos eventos cujos dados ou vagas a operação pode alterar (ver mudancas.py)."""
+    tipo = op["op"]
+    if tipo in ("inscricao", "cancelamento", "evento_atualizado", "evento_excluido"):
+        return [_id_evento_da_operacao(estado, op["evento"])]
+    if tipo == "evento_cadastrado":
+        return [op["evento"]["id"]] if "id" in op["evento"] else []
+    if tipo == "usuario_excluido" and op["tipo"] == "aluno":
+        return list(estado["inscricoes"].do_aluno(op["id"]))
+    return []
+
+def aplicar_operacao(estado, op):
+    """Aplica uma operação ao estado em memória e, com o feed de mudanças ligado,
+        publica o que mudou nos eventos afetados.
+    """
+    if not feed.ativo:
+        _aplicar_operacao(estado, op)
+        return
+    afetados = _eventos_afetados(estado, op)
+    _aplicar_operacao(estado, op)
+    for id_evento in afetados:
+        feed.conferir(id_evento, buscar_evento(estado, id_evento), estado["inscricoes"])
+
+def _aplicar_operacao(estado, op):
+    eventos = estado["eventos"]
+    inscricoes = estado["inscricoes"]
+    espera = estado["espera"]
+    alunos = estado["alunos"]
+    tipo = op["op"]
+    if tipo in ("evento_cadastrado", "evento_excluido") or (tipo == "evento_atualizado" and ("data" in op["campos"] or "nome" in op["campos"])):
+        estado["versao_eventos"] = estado.get("versao_eventos", 0) + 1
+    if tipo == "inscricao":
+        id_evento = _id_evento_da_operacao(estado, op["evento"])
+        if "id_inscricao" in op:
+            _avancar_sequencia(estado, "inscricao", op["id_inscricao"])
+        if (buscar_evento(estado, id_evento) and op["id_aluno"] in alunos
+                and not inscricoes.esta_inscrito(id_evento, op["id_aluno"])):
+            # Diários antigos não trazem o ID da inscrição: todos os processos reaplicam
+            # o diário na mesma ordem, então reservam o mesmo ID.
+            id_inscricao = op.get("id_inscricao") or reservar_ids(estado, "inscricao")
+            inscricoes.inscrever(id_evento, op["id_aluno"], id_inscricao)
+            espera.sair(id_evento, op["id_aluno"])
+            _contar_inscricao(estado, buscar_evento(estado, id_evento), op["id_aluno"], 1)
+    elif tipo == "cancelamento":
+        id_evento = _id_evento_da_operacao(estado, op["evento"])
+        if inscricoes.cancelar(id_evento, op["id_aluno"]):
+            _contar_inscricao(estado, buscar_evento(estado, id_evento), op["id_aluno"], -1)
+        if buscar_evento(estado, id_evento):
+            _aplicar_promocoes(estado, id_evento, op.get("promovidos", ()))
+    elif tipo == "espera_entrada":
+        id_evento = op["evento"]
+        if (buscar_evento(estado, id_evento) and op["id_aluno"] in alunos
+                and not inscricoes.esta_inscrito(id_evento, op["id_aluno"])):
+            espera.entrar(id_evento, op["id_aluno"])
+    elif tipo == "espera_saida":
+        espera.sair(op["evento"], op["id_aluno"])
+    elif tipo == "avisos_lidos":
+        for id_evento in op["eventos"]:
+            espera.descartar_aviso(id_evento, op["id_aluno"])
+    elif tipo == "evento_cadastrado":
+        novo_evento = op["evento"]
+        if "id" not in novo_evento:  # diário antigo: nome e data iguais indicam o mesmo evento
+            mesmo_nome = estado["eventos_por_nome"].get(novo_evento["nome"].strip().lower(), {})
+            if any(evento["data"] == novo_evento["data"] for evento in mesmo_nome.values()):
+                return
+            novo_evento = {"id": reservar_ids(estado, "evento"), **novo_evento}
+        _avancar_sequencia(estado, "evento", novo_evento["id"])
+        if novo_evento["id"] in estado["eventos_por_id"]:
+            return
+        novo_evento = Evento(novo_evento)
+        eventos.append(novo_evento)
+        estado["eventos_por_id"][novo_evento["id"]] = novo_evento
+        _indexar_nome(estado, novo_evento)
+        if estado["busca"]:
+            estado["busca"].adicionar(novo_evento["id"], novo_evento["nome"], novo_evento.get("descricao", ""))
+        if estado["estatisticas"]:
+            estado["estatisticas"].contar_evento(novo_evento, 0)
+    elif tipo == "evento_atualizado":
+        evento = buscar_evento(estado, _id_evento_da_operacao(estado, op["evento"]))
+        if not evento:
+            return
+        campos = op["campos"]
+        recontar = estado["estatisticas"] and ("data" in campos or "vagas" in campos)
+        if recontar:
+            estado["estatisticas"].contar_evento(evento, inscricoes.ocupacao(evento["id"]), -1)
+        if "nome" in campos:
+            _desindexar_nome(estado, evento)
+        evento.update(campos)
+        if "nome" in campos:
+            _indexar_nome(estado, evento)
+        if recontar:
+            estado["estatisticas"].contar_evento(evento, inscricoes.ocupacao(evento["id"]))
+        if estado["busca"] and ("nome" in campos or "descricao" in campos):
+            estado["busca"].adicionar(evento["id"], evento["nome"], evento.get("descricao", ""))
+        _aplicar_promocoes(estado, evento["id"], op.get("promovidos", ()))
+    elif tipo == "evento_excluido":
+        evento = estado["eventos_por_id"].pop(_id_evento_da_operacao(estado, op["evento"]), None)
+        if not evento:
+            return
+        eventos[:] = [outro for outro in eventos if outro is not evento]
+        _desindexar_nome(estado, evento)
+        if estado["estatisticas"]:
+            for _, id_aluno in inscricoes.iterar_evento(evento["id"]):
+                _contar_inscricao(estado, evento, id_aluno, -1)
+            estado["estatisticas"].contar_evento(evento, 0, -1)
+        inscricoes.remover_evento(evento["id"])
+        espera.remover_evento(evento["id"])
+        if estado["busca"]:
+            estado["busca"].remover(evento["id"])
+    elif tipo == "usuario_cadastrado":
+        usuario = op["usuario"]
+        usuarios = alunos if usuario["tipo"] == "aluno" else estado["coordenadores"]
+        _avancar_sequencia(estado, usuario["tipo"], int(usuario["id"]))
+        if usuario["id"] in usuarios:
+            return
+        usuario = (Aluno if usuario["tipo"] == "aluno" else Coordenador)(usuario)
+        usuarios[usuario["id"]] = usuario
+        estado["emails"].setdefault(normalizar_email(usuario["email"]), (usuario["tipo"], usuario["id"]))
+    elif tipo == "usuario_excluido":
+        usuarios = alunos if op["tipo"] == "aluno" else estado["coordenadores"]
+        usuario = usuarios.get(op["id"])
+        if not usuario:
+            return
+        if op["tipo"] == "aluno":
+            for id_evento in inscricoes.do_aluno(op["id"]):
+                inscricoes.cancelar(id_evento, op["id"])
+                _contar_inscricao(estado, buscar_evento(estado, id_evento), op["id"], -1)
+            espera.remover_aluno(op["id"])
+        del usuarios[op["id"]]
+        email = normalizar_email(usuario["email"])
+        if estado["emails"].get(email) == (op["tipo"], op["id"]):
+            del estado["emails"][email]
+
+# =================================
+# Backend JSON (snapshots + diário)
+# =================================
+class BackendJson:
+    """Armazena os dados em eventos.json, alunos.json e coordenadores.json (snapshots)
+    e em diario.log, um arquivo append-only com uma operação JSON por linha. As
+    sequências de IDs ficam em sequencias.json, regravado junto com os snapshots; entre
+    uma gravação e outra, as operações do diário trazem os IDs que já foram usados.
+
+    Os snapshots são identificados por uma assinatura (mtime, tamanho e inode); se
+    outro processo os substituir, eles são relidos. Por cima deles é reaplicado o
+    diário. Ao atingir LIMITE_DIARIO operações, uma thread em segundo plano grava um
+    novo snapshot e esvazia o diário.
+
+    Sob a trava exclusiva só ficam a conferência da operação e o append no diário;
+    o fsync é feito depois de liberá-la (em apos_registro), de modo que gravações
+    simultâneas, em eventos diferentes ou não, esperam o disco em paralelo. A ordem
+    das linhas no diário continua decidindo quem ficou com a última vaga.
+    """
+    nome = "json"
+
+    def __init__(self):
+        self._arquivo = None
+        self._assinaturas = None
+        self._offset = 0
+        self._operacoes = 0
+        self._compactando = threading.Event()
+
+    def _assinaturas_snapshots(self):
+        assinaturas = []
+        for caminho in (eventos_json, alunos_json, coordenadores_json):
+            info = os.stat(caminho)
+            assinaturas.append((info.st_mtime_ns, info.st_size, info.st_ino))
+        return tuple(assinaturas)
+
+    @contextmanager
+    def sessao(self, exclusiva):
+        """Abre o diário com trava de arquivo (compartilhada para leitura, exclusiva para escrita)."""
+        with open(diario_log, "a+b") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            self._arquivo = f
+            try:
+                yield
+            finally:
+                self._arquivo = None
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _carregar_snapshots(self, estado):
+        dados_eventos = ler_snapshot(eventos_json, {"eventos": [], "inscricoes": {}})
+        estado["eventos"] = dados_eventos.get("eventos", [])
+        inscricoes = migrar_ids_eventos(estado["eventos"], dados_eventos.get("inscricoes", {}))
+        estado["inscricoes"] = TabelaInscricoes.de_dict(inscricoes, estado["eventos"])
+        estado["eventos"] = [Evento(evento) for evento in estado["eventos"]]
+        estado["espera"] = FilaEspera.de_dict(dados_eventos)
+        estado["alunos"] = usuarios_de_dict(ler_snapshot(alunos_json, {}), Aluno)
+        estado["coordenadores"] = usuarios_de_dict(ler_snapshot(coordenadores_json, {}), Coordenador)
+        for usuario in (*estado["alunos"].values(), *estado["coordenadores"].values()):
+            usuario.pop("inscricoes", None)  # formato antigo: as inscrições ficam só na tabela
+        indexar_eventos(estado)
+        indexar_sequencias(estado, ler_snapshot(sequencias_json, {}))
+        self._assinaturas = self._assinaturas_snapshots()
+        self._offset = 0
+        self._operacoes = 0
+        estado["emails"] = self._carregar_indice_emails(estado)
+
+    def _carregar_indice_emails(self, estado):
+        """Lê o índice de emails salvo junto aos dados; se ele não corresponder aos
+        arquivos de usuários atuais, reconstrói e salva um novo."""
+        assinaturas_usuarios = [list(a) for a in self._assinaturas[1:]]
+        if INDICE_EMAILS_PERSISTENTE and os.path.exists(indice_emails_json):
+            salvo = ler_snapshot(indice_emails_json, {})
+            if salvo.get("assinaturas") == assinaturas_usuarios:
+                return {internar(email): (internar(tipo), internar(user_id))
+                        for email, (tipo, user_id) in salvo["emails"].items()}
+        indice = construir_indice_emails(estado["alunos"], estado["coordenadores"])
+        self._salvar_indice_emails(indice)
+        return indice
+
+    def _salvar_indice_emails(self, indice):
+        if INDICE_EMAILS_PERSISTENTE:
+            escrever_snapshot(indice_emails_json, {
+                "assinaturas": [list(a) for a in self._assinaturas[1:]],
+                "emails": indice
+            })
+
+    def _reaplicar_diario(self, estado):
+        """Aplica ao estado as operações do diário ainda não vistas por este processo."""
+        f = self._arquivo
+        f.seek(0, os.SEEK_END)
+        tamanho = f.tell()
+        if tamanho < self._offset:
+            self._carregar_snapshots(estado)
+        if tamanho == self._offset:
+            return
+        f.seek(self._offset)
+        pendente = f.read(tamanho - self._offset)
+        contar_leitura(len(pendente))
+        fim = pendente.rfind(b"\n") + 1
+        for linha in pendente[:fim].splitlines():
+            if linha.strip():
+                aplicar_operacao(estado, json.loads(linha))
+                self._operacoes += 1
+        self._offset += fim
+
+    def sincronizar(self, estado):
+        if not estado or self._assinaturas_snapshots() != self._assinaturas:
+            self._carregar_snapshots(estado)
+        self._reaplicar_diario(estado)
+
+    def registrar(self, op):
+        linha = (json.dumps(op) + "\n").encode("utf-8")
+        f = self._arquivo
+        f.seek(0, os.SEEK_END)
+        f.write(linha)
+        f.flush()
+        contar_escrita(len(linha))
+        self._offset += len(linha)
+        self._operacoes += 1
+
+    def registrar_lote(self, ops):
+        """Acrescenta várias operações ao diário com uma única escrita."""
+        if not ops:
+            return
+        dados = b"".join((json.dumps(op) + "\n").encode("utf-8") for op in ops)
+        f = self._arquivo
+        f.seek(0, os.SEEK_END)
+        f.write(dados)
+        f.flush()
+        contar_escrita(len(dados))
+        self._offset += len(dados)
+        self._operacoes += len(ops)
+
+    def apos_registro(self):
+        """Garante a operação em disco (fsync) e dispara a compactação, se for a hora."""
+        fd = os.open(diario_log, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self._operacoes >= LIMITE_DIARIO and not self._compactando.is_set():
+            self._compactando.set()
+            threading.Thread(target=self._compactar_em_segundo_plano, daemon=True).start()
+
+    def gravar(self, estado, partes):
+        """Grava os snapshots pedidos; se houver operações no diário, grava todos e trunca o diário."""
+        if self._operacoes:
+            partes = ("eventos", "alunos", "coordenadores")
+        escrever_snapshot(sequencias_json, estado["sequencias"])
+        if "eventos" in partes:
+            escrever_snapshot(eventos_json, {"eventos": eventos_para_lista(estado["eventos"]),
+                                             "inscricoes": estado["inscricoes"].para_dict(),
+                                             **estado["espera"].para_dict()})
+        if "alunos" in partes:
+            escrever_snapshot(alunos_json, usuarios_para_dict(estado["alunos"]))
+        if "coordenadores" in partes:
+            escrever_snapshot(coordenadores_json, usuarios_para_dict(estado["coordenadores"]))
+        if self._operacoes:
+            self._arquivo.truncate(0)
+            self._offset = 0
+            self._operacoes = 0
+        self._assinaturas = self._assinaturas_snapshots()
+        if "alunos" in partes or "coordenadores" in partes:
+            self._salvar_indice_emails(estado["emails"])
+
+    def compactar(self, estado):
+        """Incorpora o diário em um novo snapshot dos arquivos JSON e esvazia o diário."""
+        self.gravar(estado, ())
+
+    def _compactar_em_segundo_plano(self):
+        try:
+            compactar()
+        finally:
+            self._compactando.clear()
+
+_backend = BackendJson()
+
+def usar_backend(nome):
+    """Seleciona o backend de armazenamento ("json", "sqlite" ou "fragmentado"); deve ser chamado na inicialização."""
+    global _backend
+    with _trava:
+        if nome == "json":
+            _backend = BackendJson()
+        elif nome == "sqlite":
+            from persistencia_sqlite import BackendSqlite
+            _backend = BackendSqlite()
+        elif nome == "fragmentado":
+            from persistencia_fragmentada import BackendFragmentado
+            _backend = BackendFragmentado()
+        else:
+            raise ValueError(f"Backend desconhecido: {nome}")
+        _estado.clear()
+
+def usar_codec(nome):
+    """Seleciona o formato de gravação dos snapshots ("json", "json-compacto" ou "binario")."""
+    global CODEC_SNAPSHOTS
+    if nome not in CODECS:
+        raise ValueError(f"Formato desconhecido: {nome}")
+    CODEC_SNAPSHOTS = nome
+
+def regravar_snapshots():
+    """Regrava todos os snapshots no formato atual (conversão entre formatos, sem perdas)."""
+    with _trava, _backend.sessao(exclusiva=True):
+        _backend.sincronizar(_estado)
+        _backend.gravar(_estado, ("eventos", "alunos", "coordenadores"))
+
+def limpar_cache():
+    """Descarta o estado em memória, forçando a releitura de todos os dados na próxima consulta."""
+    with _trava:
+        _estado.clear()
+
+@instrumentar
+def compactar():
+    """Consolida as operações registradas em um novo snapshot do armazenamento."""
+    with _trava, _backend.sessao(exclusiva=True):
+        _backend.sincronizar(_estado)
+        _backend.compactar(_estado)
+
+# ======================================
+# Registro de Operações (inscrições etc.)
+# ======================================
+def _registrar(op, conferir=None):
+    """Persiste a operação no backend e a aplica em memória, sob trava exclusiva.
+        Se informada, conferir(estado) é chamada com o estado já sincronizado, antes
+        da gravação: pode completar a operação ou levantar uma exceção para desistir dela.
+    """
+    with medir("registrar_" + op["op"]):
+        with _trava, _backend.sessao(exclusiva=True):
+            _backend.sincronizar(_estado)
+            if conferir:
+                conferir(_estado)
+            _backend.registrar(op)
+            aplicar_operacao(_estado, op)
+        _backend.apos_registro()
+
+@instrumentar
+def registrar_lote(preparar):
+    """Registra de uma só vez as operações montadas por preparar(estado).
+        preparar recebe o estado já sincronizado, sob a trava exclusiva, e retorna a
+        lista de operações; assim a checagem de duplicados e a gravação acontecem
+        juntas, com uma única escrita no armazenamento. Retorna as operações gravadas.
+    """
+    with _trava, _backend.sessao(exclusiva=True):
+        _backend.sincronizar(_estado)
+        ops = preparar(_estado)
+        _backend.registrar_lote(ops)
+        for op in ops:
+            aplicar_operacao(_estado, op)
+    _backend.apos_registro()
+    return ops
+
+@instrumentar
+def buscar_evento_por_id(id_evento):
+    """Retorna o evento com o ID informado, ou None. Consulta O(1)."""
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        return buscar_evento(_estado, id_evento)
+
+def bloco_inscricoes(id_evento, inicio, quantidade):
+    """Até 'quantidade' inscrições (id_inscricao, id_aluno) do evento, a partir do ID 'inicio',
+        lidas sob a trava: quem percorre um evento grande em blocos não vê a tabela
+        mudar no meio de um bloco (ver exportacao.py).
+    """
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        return list(islice(_estado["inscricoes"].iterar_evento(id_evento, inicio), quantidade))
+
+@instrumentar
+def buscar_eventos_por_nome(nome):
+    """Lista dos eventos com o nome informado (ignorando maiúsculas), na ordem de cadastro."""
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        return list(_estado["eventos_por_nome"].get(nome.strip().lower(), {}).values())
+
+@instrumentar
+def buscar_eventos(termo):
+    """Busca eventos por trecho do nome ou da descrição, ignorando maiúsculas e acentos.
+        Os resultados vêm ordenados por relevância.
+    """
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        if _estado["busca"] is None:
+            _estado["busca"] = IndiceBusca.de_eventos(_estado["eventos"])
+        return [_estado["eventos_por_id"][id_evento] for id_evento in _estado["busca"].buscar(termo)]
+
+@instrumentar
+def carregar_estatisticas():
+    """Estatísticas de inscrições por curso e por mês (Estatisticas), calculadas em lote
+        no primeiro uso e depois mantidas a cada operação.
+    """
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        if _estado["estatisticas"] is None:
+            _estado["estatisticas"] = Estatisticas.de_estado(_estado["eventos"], _estado["inscricoes"], _estado["alunos"])
+        return _estado["estatisticas"]
+
+def registrar_inscricao(id_evento, usuario_id, conferir=None):
+    """Registra a inscrição de um aluno no evento e retorna o ID da inscrição,
+        reservado sob a trava de gravação. Use conferir para checar as vagas junto com
+        a gravação (ver _registrar).
+    """
+    op = {"op": "inscricao", "evento": id_evento, "id_aluno": usuario_id}
+
+    def reservar_id(estado):
+        if conferir:
+            conferir(estado)
+        op["id_inscricao"] = reservar_ids(estado, "inscricao")
+
+    _registrar(op, reservar_id)
+    return op["id_inscricao"]
+
+def registrar_cancelamento(id_evento, usuario_id):
+    """Registra o cancelamento da inscrição de um aluno em um evento. Se o evento tiver
+        fila de espera, a vaga liberada vai para o primeiro da fila na mesma operação
+        (campo "promovidos"), e o aluno promovido é avisado no próximo login.
+    """
+    op = {"op": "cancelamento", "evento": id_evento, "id_aluno": usuario_id}
+
+    def promover(estado):
+        evento = buscar_evento(estado, id_evento)
+        if evento and estado["inscricoes"].esta_inscrito(id_evento, usuario_id):
+            vagas_livres = evento["vagas"] - estado["inscricoes"].ocupacao(id_evento) + 1
+            promovidos = _promocoes(estado, id_evento, vagas_livres)
+            if promovidos:
+                op["promovidos"] = promovidos
+
+    _registrar(op, promover)
+
+def registrar_entrada_espera(id_evento, usuario_id, conferir=None):
+    """Coloca o aluno no fim da fila de espera do evento.
+        Use conferir para checar, junto com a gravação, se o evento continua lotado.
+    """
+    _registrar({"op": "espera_entrada", "evento": id_evento, "id_aluno": usuario_id}, conferir)
+
+def registrar_saida_espera(id_evento, usuario_id):
+    """Tira o aluno da fila de espera do evento."""
+    _registrar({"op": "espera_saida", "evento": id_evento, "id_aluno": usuario_id})
+
+def registrar_avisos_lidos(usuario_id, ids_eventos):
+    """Descarta os avisos de promoção já mostrados ao aluno."""
+    _registrar({"op": "avisos_lidos", "id_aluno": usuario_id, "eventos": list(ids_eventos)})
+
+def registrar_evento_cadastrado(evento, conferir=None):
+    """Registra o cadastro de um novo evento, preenchendo evento["id"] com um ID novo,
+        reservado sob a trava de gravação.
+    """
+    def reservar_id(estado):
+        if conferir:
+            conferir(estado)
+        evento["id"] = reservar_ids(estado, "evento")
+
+    _registrar({"op": "evento_cadastrado", "evento": evento}, reservar_id)
+
+def registrar_evento_atualizado(id_evento, campos):
+    """Registra a alteração de campos (nome, data, descricao, vagas, status) de um evento.
+        Renomear é O(1): as inscrições e os índices usam o ID, que não muda. Vagas a
+        mais vão para a fila de espera, como em registrar_cancelamento.
+    """
+    op = {"op": "evento_atualizado", "evento": id_evento, "campos": campos}
+
+    def promover(estado):
+        if "vagas" in campos and buscar_evento(estado, id_evento):
+            promovidos = _promocoes(estado, id_evento, campos["vagas"] - estado["inscricoes"].ocupacao(id_evento))
+            if promovidos:
+                op["promovidos"] = promovidos
+
+    _registrar(op, promover)
+
+def registrar_status_eventos(status_por_evento):
+    """Registra o novo status de vários eventos (ID -> status) com uma única gravação.
+        Eventos excluídos nesse meio-tempo são ignorados.
+    """
+    if not status_por_evento:
+        return
+    registrar_lote(lambda estado: [{"op": "evento_atualizado", "evento": id_evento, "campos": {"status": status}}
+                                   for id_evento, status in status_por_evento.items() if buscar_evento(estado, id_evento)])
+
+def registrar_evento_excluido(id_evento):
+    """Registra a exclusão de um evento e de suas inscrições."""
+    _registrar({"op": "evento_excluido", "evento": id_evento})
+
+def registrar_usuario_cadastrado(usuario, conferir=None):
+    """Registra um novo aluno ou coordenador, preenchendo usuario["id"] com um ID novo
+        (reservado sob a trava de gravação) e atualizando o índice de emails.
+    """
+    def reservar_id(estado):
+        if conferir:
+            conferir(estado)
+        usuario["id"] = str(reservar_ids(estado, usuario["tipo"]))
+
+    _registrar({"op": "usuario_cadastrado", "usuario": usuario}, reservar_id)
+
+def registrar_usuario_excluido(tipo, user_id):
+    """Registra a exclusão de um usuário (e das inscrições do aluno), atualizando o índice de emails."""
+    _registrar({"op": "usuario_excluido", "tipo": tipo, "id": user_id})
+
+# ======================
+# Persistência de Dados
+# ======================
+def _carregar(*partes):
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        return tuple(_estado[parte] for parte in partes)
+
+def _como_registros(dados):
+    """Converte, no próprio objeto recebido, eventos e usuários em dicionário para registros."""
+    if "eventos" in dados:
+        dados["eventos"][:] = map(Evento.de_dict, dados["eventos"])
+    for parte, classe in (("alunos", Aluno), ("coordenadores", Coordenador)):
+        if parte in dados:
+            usuarios = dados[parte]
+            for user_id, usuario in usuarios.items():
+                usuarios[user_id] = classe.de_dict(usuario)
+
+def _salvar(**dados):
+    """Substitui partes do estado pelos objetos recebidos e as grava no backend."""
+    with _trava, _backend.sessao(exclusiva=True):
+        _backend.sincronizar(_estado)
+        _como_registros(dados)
+        _estado.update(dados)
+        _estado["estatisticas"] = None
+        if "eventos" in dados:
+            indexar_eventos(_estado)
+        if "alunos" in dados:
+            _estado["emails"] = construir_indice_emails(_estado["alunos"], _estado["coordenadores"])
+        indexar_sequencias(_estado)
+        _backend.gravar(_estado, tuple(dados))
+
+@instrumentar
+def carregar_eventos():
+    """Carrega os eventos e a tabela de inscrições (TabelaInscricoes)."""
+    return _carregar("eventos", "inscricoes")
+
+@instrumentar
+def salvar_eventos(eventos, eventos_inscricoes):
+    """Salva os eventos e inscrições."""
+    _salvar(eventos=eventos, inscricoes=eventos_inscricoes)
+
+@instrumentar
+def carregar_fila_espera():
+    """Carrega as filas de espera dos eventos e os avisos de promoção (FilaEspera)."""
+    return _carregar("espera")[0]
+
+@instrumentar
+def carregar_usuarios():
+    """Carrega os usuários (alunos e coordenadores)."""
+    return _carregar("alunos", "coordenadores")
+
+@instrumentar
+def salvar_usuarios(alunos, coordenadores):
+    """Salva os usuários."""
+    _salvar(alunos=alunos, coordenadores=coordenadores)
+
+def versao_eventos():
+    """Número que muda sempre que um evento é cadastrado, excluído ou tem o nome ou a data alterados."""
+    with _trava:
+        return _estado.get("versao_eventos", 0)
+
+@instrumentar
+def buscar_usuario_por_email(email):
+    """Retorna (tipo, id) do usuário com o email informado, ou None. Consulta O(1) no índice."""
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        return _estado["emails"].get(normalizar_email(email))
+
+def sincronizar():
+    """Relê o que outros processos gravaram desde a última consulta; o feed de mudanças,
+        se ligado, publica o que mudou.
+    """
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+
+def ativar_mudancas():
+    """Liga o feed de mudanças (mudancas.feed), tirando o retrato inicial dos eventos."""
+    with _trava, _backend.sessao(exclusiva=False):
+        _backend.sincronizar(_estado)
+        feed.ativar(_estado["eventos"], _estado["inscricoes"])
+    return feed
+
+def usuario_em_memoria(tipo, user_id):
+    """Registro do usuário já carregado em memória, sem consultar o armazenamento, ou None.
+        Serve para conferir se um registro guardado por outro módulo ainda é o atual
+        (ver sessoes.py).
+    """
+    with _trava:
+        usuarios = _estado.get("alunos" if tipo == "aluno" else "coordenadores")
+        return usuarios.get(user_id) if usuarios is not None else None
+
+def migrar(origem, destino):
+    """Copia todos os dados do backend de origem para o de destino (ex.: "json" -> "sqlite" ou
+        "json" -> "fragmentado", e de volta).
+    """
+    usar_backend(origem)
+    eventos, inscricoes, espera, sequencias = _carregar("eventos", "inscricoes", "espera", "sequencias")
+    alunos, coordenadores = carregar_usuarios()
+    usar_backend(destino)
+    with _trava, _backend.sessao(exclusiva=True):
+        _backend.sincronizar(_estado)
+        _estado.update(eventos=eventos, inscricoes=inscricoes, espera=espera, alunos=alunos,
+                       coordenadores=coordenadores, emails=construir_indice_emails(alunos, coordenadores))
+        indexar_eventos(_estado)
+        indexar_sequencias(_estado, sequencias)
+        _backend.gravar(_estado, ("eventos", "alunos", "coordenadores"))
+    limpar_cache()
@@ -0,0 +1,387 @@
+import os
+import zlib
+from contextlib import contextmanager
+
+from persistencia import (
+    data_dir, escrever_snapshot, ler_snapshot, construir_indice_emails, indexar_eventos, indexar_sequencias
+)
+from fila_espera import FilaEspera
+from registros import Evento, Aluno, Coordenador, usuarios_de_dict, usuarios_para_dict
+from tabela_inscricoes import TabelaInscricoes
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+# ==========================================
+# Backend Fragmentado (um arquivo por evento)
+# ==========================================
+# data/fragmentos/
+#   manifesto.json        formato, número de baldes de alunos, geração, sequências de IDs e
+#                         histórico dos fragmentos gravados nas últimas gerações
+#   eventos/000001.json   {"evento": {...}, "inscricoes": {id_aluno: id_inscricao}, "espera": [id_aluno, ...],
+#                         "avisos": [id_aluno, ...]}, um arquivo por evento
+#   alunos/07.json        {id: aluno} dos alunos cujo ID cai no balde 7 (CRC-32 do ID % baldes)
+#   coordenadores.json
+#   trava                 arquivo vazio usado para a trava entre processos
+#
+# O número do arquivo de um evento é o ID do evento, que nunca muda (nem quando o
+# evento é renomeado). Os fragmentos são gravados com o mesmo formato dos
+# snapshots (ver codificacao.py).
+pasta_fragmentos = os.path.join(data_dir, "fragmentos")
+pasta_eventos = os.path.join(pasta_fragmentos, "eventos")
+pasta_alunos = os.path.join(pasta_fragmentos, "alunos")
+manifesto_json = os.path.join(pasta_fragmentos, "manifesto.json")
+coordenadores_fragmento = os.path.join(pasta_fragmentos, "coordenadores.json")
+trava_fragmentos = os.path.join(pasta_fragmentos, "trava")
+
+FORMATO_FRAGMENTOS = 1
+# Baldes de alunos de um novo diretório de fragmentos; depois vale o valor gravado no manifesto.
+BALDES_ALUNOS = 64
+# Gerações mantidas no histórico do manifesto. Um processo que ficou mais atrás do
+# que isso confere a assinatura de todos os fragmentos para achar os alterados.
+HISTORICO_MANIFESTO = 64
+
+
+def balde_aluno(id_aluno, baldes):
+    return zlib.crc32(str(id_aluno).encode("utf-8")) % baldes
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+def _assinaturas_pasta(pasta):
+    """{número do fragmento: assinatura} de todos os fragmentos da pasta."""
+    assinaturas = {}
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.name.endswith(".json"):
+                info = entrada.stat()
+                assinaturas[int(entrada.name[:-5])] = (info.st_mtime_ns, info.st_size, info.st_ino)
+    return assinaturas
+
+
+class BackendFragmentado:
+    """Armazena cada evento (com suas inscrições) em um arquivo próprio, os alunos
+    espalhados em baldes e os coordenadores em um arquivo só.
+
+    A sessão exclusiva funciona como uma transação: registrar apenas anota os
+    fragmentos afetados pela operação e, ao fechar a sessão (com as operações já
+    aplicadas em memória), cada fragmento anotado é regravado uma única vez. Uma
+    inscrição regrava só o arquivo do evento (o mesmo vale para a fila de espera e
+    para uma promoção da fila); um cadastro de aluno, só o seu balde.
+    O manifesto, pequeno, é regravado a cada transação com uma nova geração e a
+    lista dos fragmentos que ela gravou (só as últimas HISTORICO_MANIFESTO gerações
+    são mantidas; uma regravação completa não lista os fragmentos).
+
+    Os outros processos percebem a mudança pela assinatura do manifesto e releem
+    apenas os fragmentos listados nas gerações que ainda não viram, sem abrir nem
+    conferir os demais. Se o histórico não cobre todas elas, releem os fragmentos
+    cuja assinatura mudou. A primeira carga lê todos os fragmentos: como nos outros
+    backends, o estado completo fica em memória.
+    """
+    nome = "fragmentado"
+
+    def __init__(self):
+        os.makedirs(pasta_eventos, exist_ok=True)
+        os.makedirs(pasta_alunos, exist_ok=True)
+        self._estado = None
+        self._manifesto = None
+        self._assinatura_manifesto = None
+        self._assinaturas_eventos = {}
+        self._assinaturas_alunos = {}
+        self._assinatura_coordenadores = None
+        self._baldes = []  # balde -> ids dos alunos
+        self._gravados = []
+        self._limpar_pendentes()
+
+    def _limpar_pendentes(self):
+        self._eventos_alterados = set()
+        self._baldes_alterados = set()
+        self._coordenadores_alterados = False
+        self._regravacao_completa = False
+
+    def _ha_pendentes(self):
+        return bool(self._eventos_alterados or self._baldes_alterados or self._coordenadores_alterados)
+
+    @contextmanager
+    def sessao(self, exclusiva):
+        """Trava compartilhada para leitura e exclusiva para escrita; a escrita grava os fragmentos ao final."""
+        with open(trava_fragmentos, "a+b") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            try:
+                yield
+                if exclusiva:
+                    self._efetivar()
+            except BaseException:
+                if self._ha_pendentes() and self._estado is not None:
+                    self._estado.clear()  # memória à frente do disco: relê tudo na próxima consulta
+                raise
+            finally:
+                self._limpar_pendentes()
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ---------- leitura ----------
+    def _caminho_evento(self, id_evento):
+        return os.path.join(pasta_eventos, f"{id_evento:06d}.json")
+
+    def _caminho_balde(self, balde):
+        return os.path.join(pasta_alunos, f"{balde:02d}.json")
+
+    def _ler_manifesto(self):
+        self._manifesto = ler_snapshot(manifesto_json, {
+            "formato": FORMATO_FRAGMENTOS, "baldes_alunos": BALDES_ALUNOS, "geracao": 0
+        })
+        if self._manifesto["formato"] > FORMATO_FRAGMENTOS:
+            raise ValueError(f"Formato {self._manifesto['formato']} dos fragmentos não suportado")
+        self._assinatura_manifesto = _assinatura(manifesto_json)
+
+    def _ler_evento(self, id_evento):
+        """Retorna (evento, fragmento) do arquivo do evento."""
+        fragmento = ler_snapshot(self._caminho_evento(id_evento), {})
+        evento = fragmento["evento"]
+        if "id" not in evento:  # fragmentos gravados antes dos IDs: o número do arquivo vira o ID
+            evento = {"id": id_evento, **evento}
+        return Evento(evento), fragmento
+
+    def _carregar(self, estado):
+        """Lê todos os fragmentos e monta o estado do zero."""
+        self._ler_manifesto()
+        self._assinaturas_eventos = _assinaturas_pasta(pasta_eventos)
+        eventos, inscricoes, espera = [], {}, {"espera": {}, "avisos": {}}
+        for id_evento in sorted(self._assinaturas_eventos):
+            evento, fragmento = self._ler_evento(id_evento)
+            eventos.append(evento)
+            if fragmento.get("inscricoes"):
+                inscricoes[str(id_evento)] = fragmento["inscricoes"]
+            for parte in ("espera", "avisos"):
+                if fragmento.get(parte):
+                    espera[parte][str(id_evento)] = fragmento[parte]
+        self._assinaturas_alunos = _assinaturas_pasta(pasta_alunos)
+        self._baldes = [set() for _ in range(self._manifesto["baldes_alunos"])]
+        alunos = {}
+        for balde in self._assinaturas_alunos:
+            do_balde = usuarios_de_dict(ler_snapshot(self._caminho_balde(balde), {}), Aluno)
+            alunos.update(do_balde)
+            self._baldes[balde].update(do_balde)
+        coordenadores = usuarios_de_dict(ler_snapshot(coordenadores_fragmento, {}), Coordenador)
+        self._assinatura_coordenadores = _assinatura(coordenadores_fragmento)
+        estado.update(eventos=eventos, inscricoes=TabelaInscricoes.de_dict(inscricoes, eventos),
+                      espera=FilaEspera.de_dict(espera), alunos=alunos, coordenadores=coordenadores,
+                      emails=construir_indice_emails(alunos, coordenadores))
+        indexar_eventos(estado)
+        indexar_sequencias(estado, self._manifesto.get("sequencias", {}))
+
+    def _gravados_desde(self, geracao):
+        """(IDs de eventos, baldes, coordenadores alterados?) gravados depois da geração
+            informada, segundo o histórico do manifesto; None se ele não cobre todas as
+            gerações seguintes ou se alguma delas foi uma regravação completa.
+        """
+        posteriores = [entrada for entrada in self._manifesto.get("historico", []) if entrada["geracao"] > geracao]
+        if len(posteriores) != self._manifesto["geracao"] - geracao:
+            return None
+        eventos, baldes, coordenadores = set(), set(), False
+        for entrada in posteriores:
+            if entrada["eventos"] is None:
+                return None
+            eventos.update(entrada["eventos"])
+            baldes.update(entrada["baldes"])
+            coordenadores = coordenadores or entrada["coordenadores"]
+        return eventos, baldes, coordenadores
+
+    def _recarregar_alterados(self, estado):
+        """Relê só os fragmentos que outro processo alterou desde a última leitura."""
+        geracao = self._manifesto["geracao"]
+        self._ler_manifesto()
+        sequencias = estado["sequencias"]
+        for entidade, proximo in self._manifesto.get("sequencias", {}).items():
+            sequencias[entidade] = max(sequencias[entidade], proximo)
+        gravados = self._gravados_desde(geracao)
+        if gravados is not None:
+            self._recarregar_listados(estado, *gravados)
+            return
+        atuais = _assinaturas_pasta(pasta_eventos)
+        if atuais != self._assinaturas_eventos:
+            self._recarregar_eventos(estado, atuais)
+        atuais = _assinaturas_pasta(pasta_alunos)
+        usuarios_alterados = atuais != self._assinaturas_alunos
+        if usuarios_alterados:
+            for balde, assinatura in atuais.items():
+                if self._assinaturas_alunos.get(balde) != assinatura:
+                    for id_aluno in self._baldes[balde]:
+                        estado["alunos"].pop(id_aluno, None)
+                    do_balde = usuarios_de_dict(ler_snapshot(self._caminho_balde(balde), {}), Aluno)
+                    estado["alunos"].update(do_balde)
+                    self._baldes[balde] = set(do_balde)
+            self._assinaturas_alunos = atuais
+        if _assinatura(coordenadores_fragmento) != self._assinatura_coordenadores:
+            estado["coordenadores"] = usuarios_de_dict(ler_snapshot(coordenadores_fragmento, {}), Coordenador)
+            self._assinatura_coordenadores = _assinatura(coordenadores_fragmento)
+            usuarios_alterados = True
+        if usuarios_alterados:
+            estado["emails"] = construir_indice_emails(estado["alunos"], estado["coordenadores"])
+
+    def _recarregar_listados(self, estado, eventos, baldes, coordenadores):
+        """Relê apenas os fragmentos listados no histórico do manifesto."""
+        if eventos:
+            atuais = dict(self._assinaturas_eventos)
+            for id_evento in eventos:
+                try:
+                    atuais[id_evento] = _assinatura(self._caminho_evento(id_evento))
+                except FileNotFoundError:
+                    atuais.pop(id_evento, None)
+            self._recarregar_eventos(estado, atuais, eventos)
+        for balde in baldes:
+            for id_aluno in self._baldes[balde]:
+                estado["alunos"].pop(id_aluno, None)
+            caminho = self._caminho_balde(balde)
+            do_balde = usuarios_de_dict(ler_snapshot(caminho, {}), Aluno)
+            estado["alunos"].update(do_balde)
+            self._baldes[balde] = set(do_balde)
+            self._assinaturas_alunos[balde] = _assinatura(caminho)
+        if coordenadores:
+            estado["coordenadores"] = usuarios_de_dict(ler_snapshot(coordenadores_fragmento, {}), Coordenador)
+            self._assinatura_coordenadores = _assinatura(coordenadores_fragmento)
+        if baldes or coordenadores:
+            estado["emails"] = construir_indice_emails(estado["alunos"], estado["coordenadores"])
+
+    def _recarregar_eventos(self, estado, atuais, listados=None):
+        """Aplica ao estado os fragmentos de eventos cuja assinatura mudou, ou só os
+            listados (lidos mesmo com a assinatura igual), se informados.
+        """
+        if listados is None:
+            listados = {id_evento for id_evento, assinatura in atuais.items()
+                        if self._assinaturas_eventos.get(id_evento) != assinatura}
+        por_id = dict(estado["eventos_por_id"])
+        inscricoes, espera = estado["inscricoes"], estado["espera"]
+        for id_evento in self._assinaturas_eventos.keys() - atuais.keys():
+            por_id.pop(id_evento, None)
+            inscricoes.remover_evento(id_evento)
+            espera.remover_evento(id_evento)
+        for id_evento in sorted(listados & atuais.keys()):
+            por_id[id_evento], fragmento = self._ler_evento(id_evento)
+            inscricoes.substituir_evento(id_evento, fragmento.get("inscricoes", {}))
+            espera.substituir_evento(id_evento, fragmento.get("espera", []), fragmento.get("avisos", []))
+        estado["eventos"] = [por_id[id_evento] for id_evento in sorted(por_id)]
+        indexar_eventos(estado)
+        self._assinaturas_eventos = atuais
+
+    def sincronizar(self, estado):
+        self._estado = estado
+        if not estado or self._manifesto is None:
+            self._carregar(estado)
+        elif _assinatura(manifesto_json) != self._assinatura_manifesto:
+            self._recarregar_alterados(estado)
+
+    # ---------- escrita ----------
+    def registrar(self, op):
+        """Anota os fragmentos que a operação vai alterar; a gravação acontece ao fim da sessão."""
+        tipo = op["op"]
+        if tipo == "evento_cadastrado":
+            self._eventos_alterados.add(op["evento"]["id"])
+        elif tipo in ("inscricao", "cancelamento", "evento_atualizado", "evento_excluido",
+                      "espera_entrada", "espera_saida"):
+            self._eventos_alterados.add(op["evento"])
+        elif tipo == "avisos_lidos":
+            self._eventos_alterados.update(op["eventos"])
+        elif tipo in ("usuario_cadastrado", "usuario_excluido"):
+            if tipo == "usuario_cadastrado":
+                usuario_tipo, user_id = op["usuario"]["tipo"], op["usuario"]["id"]
+            else:
+                usuario_tipo, user_id = op["tipo"], op["id"]
+            if usuario_tipo != "aluno":
+                self._coordenadores_alterados = True
+                return
+            balde = balde_aluno(user_id, len(self._baldes))
+            self._baldes[balde].add(user_id)
+            self._baldes_alterados.add(balde)
+            if tipo == "usuario_excluido":
+                self._eventos_alterados.update(self._estado["inscricoes"].do_aluno(user_id))
+                self._eventos_alterados.update(self._estado["espera"].do_aluno(user_id))
+                self._eventos_alterados.update(self._estado["espera"].avisos_do_aluno(user_id))
+
+    def registrar_lote(self, ops):
+        for op in ops:
+            self.registrar(op)
+
+    def _efetivar(self):
+        """Grava os fragmentos anotados, já com as operações aplicadas ao estado, e o manifesto."""
+        if not self._ha_pendentes():
+            return
+        estado = self._estado
+        gravados = []
+        for id_evento in self._eventos_alterados:
+            evento = estado["eventos_por_id"].get(id_evento)
+            caminho = self._caminho_evento(id_evento)
+            if evento is None:
+                if id_evento in self._assinaturas_eventos:
+                    os.remove(caminho)
+                    del self._assinaturas_eventos[id_evento]
+                continue
+            fragmento = {"evento": evento.para_dict(), "inscricoes": estado["inscricoes"].inscricoes_do_evento(id_evento)}
+            for parte, alunos in (("espera", estado["espera"].do_evento(id_evento)),
+                                  ("avisos", estado["espera"].avisos_do_evento(id_evento))):
+                if alunos:
+                    fragmento[parte] = alunos
+            escrever_snapshot(caminho, fragmento)
+            self._assinaturas_eventos[id_evento] = _assinatura(caminho)
+            gravados.append(caminho)
+        for balde in self._baldes_alterados:
+            ids = self._baldes[balde] = {id_aluno for id_aluno in self._baldes[balde] if id_aluno in estado["alunos"]}
+            caminho = self._caminho_balde(balde)
+            escrever_snapshot(caminho, {id_aluno: estado["alunos"][id_aluno].para_dict() for id_aluno in sorted(ids)})
+            self._assinaturas_alunos[balde] = _assinatura(caminho)
+            gravados.append(caminho)
+        if self._coordenadores_alterados:
+            escrever_snapshot(coordenadores_fragmento, usuarios_para_dict(estado["coordenadores"]))
+            self._assinatura_coordenadores = _assinatura(coordenadores_fragmento)
+            gravados.append(coordenadores_fragmento)
+        self._manifesto["geracao"] += 1
+        self._manifesto["sequencias"] = dict(estado["sequencias"])
+        completa = self._regravacao_completa
+        historico = self._manifesto.get("historico", [])[-(HISTORICO_MANIFESTO - 1):]
+        historico.append({"geracao": self._manifesto["geracao"],
+                          "eventos": None if completa else sorted(self._eventos_alterados),
+                          "baldes": None if completa else sorted(self._baldes_alterados),
+                          "coordenadores": completa or self._coordenadores_alterados})
+        self._manifesto["historico"] = historico
+        escrever_snapshot(manifesto_json, self._manifesto)
+        self._assinatura_manifesto = _assinatura(manifesto_json)
+        self._gravados.extend(gravados + [manifesto_json])
+        self._limpar_pendentes()
+
+    def apos_registro(self):
+        """Garante em disco (fsync) os fragmentos gravados pela última transação."""
+        gravados, self._gravados = self._gravados, []
+        for caminho in gravados:
+            try:
+                fd = os.open(caminho, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # excluído por uma transação seguinte
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def gravar(self, estado, partes):
+        """Regrava por inteiro os fragmentos das partes pedidas."""
+        self._estado = estado
+        self._regravacao_completa = True
+        if "eventos" in partes:
+            self._eventos_alterados.update(self._assinaturas_eventos)
+            self._eventos_alterados.update(estado["eventos_por_id"])
+        if "alunos" in partes:
+            self._baldes = [set() for _ in range(self._manifesto["baldes_alunos"])]
+            for id_aluno in estado["alunos"]:
+                self._baldes[balde_aluno(id_aluno, len(self._baldes))].add(id_aluno)
+            self._baldes_alterados.update(range(len(self._baldes)))
+        if "coordenadores" in partes:
+            self._coordenadores_alterados = True
+        self._efetivar()
+
+    def compactar(self, estado):
+        """Cada operação já é gravada no seu fragmento; não há diário a compactar."""
+        pass
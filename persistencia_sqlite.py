@@ -0,0 +1,355 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from fila_espera import FilaEspera
+from mudancas import feed
+from persistencia import data_dir, construir_indice_emails, indexar_eventos, indexar_sequencias
+from registros import Evento, Aluno, Coordenador
+from tabela_inscricoes import TabelaInscricoes
+
+# ==============================
+# Backend SQLite (sqlite3 stdlib)
+# ==============================
+banco_sqlite = os.path.join(data_dir, "eventos.db")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    data TEXT NOT NULL,
+    descricao TEXT NOT NULL DEFAULT '',
+    vagas INTEGER NOT NULL,
+    status TEXT
+);
+DROP INDEX IF EXISTS idx_eventos_chave;
+
+CREATE TABLE IF NOT EXISTS alunos (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    email TEXT NOT NULL,
+    curso TEXT
+);
+DROP INDEX IF EXISTS idx_alunos_email;
+
+CREATE TABLE IF NOT EXISTS coordenadores (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_coordenadores_email;
+
+CREATE TABLE IF NOT EXISTS inscricoes (
+    evento_id INTEGER NOT NULL REFERENCES eventos (id) ON DELETE CASCADE,
+    id_aluno TEXT NOT NULL,
+    id_inscricao INTEGER NOT NULL,
+    PRIMARY KEY (evento_id, id_aluno)
+);
+CREATE INDEX IF NOT EXISTS idx_inscricoes_aluno ON inscricoes (id_aluno);
+
+CREATE TABLE IF NOT EXISTS espera (
+    ordem INTEGER PRIMARY KEY AUTOINCREMENT,
+    evento_id INTEGER NOT NULL REFERENCES eventos (id) ON DELETE CASCADE,
+    id_aluno TEXT NOT NULL,
+    UNIQUE (evento_id, id_aluno)
+);
+CREATE INDEX IF NOT EXISTS idx_espera_aluno ON espera (id_aluno);
+
+CREATE TABLE IF NOT EXISTS avisos (
+    evento_id INTEGER NOT NULL REFERENCES eventos (id) ON DELETE CASCADE,
+    id_aluno TEXT NOT NULL,
+    PRIMARY KEY (evento_id, id_aluno)
+);
+CREATE INDEX IF NOT EXISTS idx_avisos_aluno ON avisos (id_aluno);
+
+CREATE TABLE IF NOT EXISTS sequencias (
+    entidade TEXT PRIMARY KEY,
+    proximo INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS versoes (
+    tabela TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+"""
+
+CAMPOS_EVENTO = ("nome", "data", "descricao", "vagas", "status")
+
+# Tabelas com contador de versão (tabela versoes), mantido por gatilhos a cada linha
+# inserida, alterada ou excluída, inclusive pelas exclusões em cascata.
+TABELAS_VERSIONADAS = ("eventos", "inscricoes", "espera", "avisos", "alunos", "coordenadores")
+ESQUEMA += "".join(
+    f"INSERT OR IGNORE INTO versoes (tabela, versao) VALUES ('{tabela}', 0);\n"
+    + "".join(f"CREATE TRIGGER IF NOT EXISTS versao_{tabela}_{acao.lower()} AFTER {acao} ON {tabela} "
+              f"BEGIN UPDATE versoes SET versao = versao + 1 WHERE tabela = '{tabela}'; END;\n"
+              for acao in ("INSERT", "UPDATE", "DELETE"))
+    for tabela in TABELAS_VERSIONADAS)
+
+
+class BackendSqlite:
+    """Armazena os dados em data/eventos.db, com tabelas para eventos, alunos,
+    coordenadores e inscrições.
+
+    Cada operação (inscrição, cancelamento, alteração de evento) vira uma transação
+    com poucas instruções indexadas. O banco usa WAL, então leitores de outros
+    processos não bloqueiam as gravações. Alterações feitas por outras conexões são
+    detectadas pelo PRAGMA data_version, que só muda quando outra conexão confirma
+    uma transação; aí a tabela versoes diz quais tabelas mudaram, e só essas são
+    relidas (uma inscrição feita por outro processo não relê eventos nem usuários).
+
+    As consultas (email, nome do evento, inscrições de um evento) são respondidas
+    pelos índices em memória do estado, como nos outros backends, que ficam em dia
+    com essa releitura por tabela. Os índices do banco servem às gravações (por
+    aluno nas inscrições, na espera e nos avisos); email e nome não são consultados
+    no banco e por isso não têm índice.
+
+    O id da tabela eventos é o próprio ID do evento; a coluna chave (nome em
+    lowercase) continua gravada, por compatibilidade com bancos existentes. A tabela
+    sequencias guarda o próximo ID de cada tipo de entidade e só avança, na mesma
+    transação da operação que usou o ID. A fila de espera (tabela espera) segue a
+    ordem de chegada pela coluna ordem.
+    """
+    nome = "sqlite"
+
+    def __init__(self, caminho=banco_sqlite):
+        self._conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA foreign_keys=ON")
+        self._conexao.executescript(ESQUEMA)
+        self._versao = None
+        self._versoes = {}  # tabela -> versão já carregada no estado
+
+    @contextmanager
+    def sessao(self, exclusiva):
+        if not exclusiva:
+            yield
+            return
+        self._conexao.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            # As versões gravadas por esta transação já estão aplicadas ao estado.
+            self._versoes = self._versoes_atuais()
+        except BaseException:
+            self._conexao.execute("ROLLBACK")
+            raise
+        self._conexao.execute("COMMIT")
+
+    def _versao_atual(self):
+        return self._conexao.execute("PRAGMA data_version").fetchone()[0]
+
+    def _versoes_atuais(self):
+        return dict(self._conexao.execute("SELECT tabela, versao FROM versoes"))
+
+    def _ler_eventos(self):
+        eventos = []
+        for id_evento, nome, data, descricao, vagas, status in self._conexao.execute(
+                "SELECT id, nome, data, descricao, vagas, status FROM eventos ORDER BY id"):
+            evento = Evento(id=id_evento, nome=nome, data=data, descricao=descricao, vagas=vagas)
+            if status is not None:
+                evento["status"] = status
+            eventos.append(evento)
+        return eventos
+
+    def _ler_inscricoes(self):
+        inscricoes = TabelaInscricoes()
+        for id_evento, id_aluno, id_inscricao in self._conexao.execute(
+                "SELECT evento_id, id_aluno, id_inscricao FROM inscricoes ORDER BY evento_id, id_inscricao"):
+            inscricoes.inscrever(id_evento, id_aluno, id_inscricao)
+        return inscricoes
+
+    def _ler_espera(self):
+        espera = FilaEspera()
+        for id_evento, id_aluno in self._conexao.execute("SELECT evento_id, id_aluno FROM espera ORDER BY ordem"):
+            espera.entrar(id_evento, id_aluno)
+        for id_evento, id_aluno in self._conexao.execute("SELECT evento_id, id_aluno FROM avisos"):
+            espera.avisar(id_evento, id_aluno)
+        return espera
+
+    def _ler_alunos(self):
+        alunos = {}
+        for id_aluno, nome, email, curso in self._conexao.execute("SELECT id, nome, email, curso FROM alunos"):
+            alunos[id_aluno] = Aluno(id=id_aluno, nome=nome, email=email, tipo="aluno", curso=curso)
+        return alunos
+
+    def _ler_coordenadores(self):
+        coordenadores = {}
+        for id_coord, nome, email in self._conexao.execute("SELECT id, nome, email FROM coordenadores"):
+            coordenadores[id_coord] = Coordenador(id=id_coord, nome=nome, email=email, tipo="coordenador", curso=None)
+        return coordenadores
+
+    def sincronizar(self, estado):
+        """Relê só as tabelas que outras conexões alteraram desde a última sincronização
+            (todas, na primeira vez). A leitura é feita em uma transação, para ver um
+            retrato consistente do banco.
+        """
+        versao = self._versao_atual()
+        if estado and versao == self._versao:
+            return
+        con = self._conexao
+        transacao = not con.in_transaction
+        if transacao:
+            con.execute("BEGIN")
+        try:
+            versoes = self._versoes_atuais()
+            mudou = {tabela for tabela in TABELAS_VERSIONADAS
+                     if not estado or versoes.get(tabela) != self._versoes.get(tabela)}
+            if "eventos" in mudou:
+                estado["eventos"] = self._ler_eventos()
+            if "inscricoes" in mudou:
+                estado["inscricoes"] = self._ler_inscricoes()
+            if mudou & {"espera", "avisos"}:
+                estado["espera"] = self._ler_espera()
+            if "alunos" in mudou:
+                estado["alunos"] = self._ler_alunos()
+            if "coordenadores" in mudou:
+                estado["coordenadores"] = self._ler_coordenadores()
+            if mudou & {"alunos", "coordenadores"}:
+                estado["emails"] = construir_indice_emails(estado["alunos"], estado["coordenadores"])
+            if "eventos" in mudou:
+                indexar_eventos(estado)
+            elif mudou:
+                # Ocupação ou cursos mudaram: as estatísticas são remontadas no próximo uso.
+                estado["estatisticas"] = None
+                if feed.ativo and "inscricoes" in mudou:
+                    feed.conferir_todos(estado["eventos"], estado["inscricoes"])
+            indexar_sequencias(estado, dict(con.execute("SELECT entidade, proximo FROM sequencias")))
+        finally:
+            if transacao:
+                con.execute("COMMIT")
+        self._versoes = versoes
+        self._versao = versao
+
+    def _avancar_sequencia(self, entidade, id_usado):
+        self._conexao.execute(
+            "INSERT INTO sequencias (entidade, proximo) VALUES (?, ?) "
+            "ON CONFLICT (entidade) DO UPDATE SET proximo = MAX(proximo, excluded.proximo)",
+            (entidade, int(id_usado) + 1))
+
+    def registrar(self, op):
+        con = self._conexao
+        tipo = op["op"]
+        if tipo == "inscricao":
+            id_evento = op["evento"]
+            self._avancar_sequencia("inscricao", op["id_inscricao"])
+            if (not con.execute("SELECT 1 FROM eventos WHERE id = ?", (id_evento,)).fetchone() or
+                    not con.execute("SELECT 1 FROM alunos WHERE id = ?", (op["id_aluno"],)).fetchone()):
+                return
+            con.execute("INSERT OR IGNORE INTO inscricoes (evento_id, id_aluno, id_inscricao) VALUES (?, ?, ?)",
+                        (id_evento, op["id_aluno"], op["id_inscricao"]))
+            con.execute("DELETE FROM espera WHERE evento_id = ? AND id_aluno = ?", (id_evento, op["id_aluno"]))
+        elif tipo == "cancelamento":
+            con.execute("DELETE FROM inscricoes WHERE evento_id = ? AND id_aluno = ?", (op["evento"], op["id_aluno"]))
+            self._promover(op)
+        elif tipo == "espera_entrada":
+            if (con.execute("SELECT 1 FROM eventos WHERE id = ?", (op["evento"],)).fetchone() and
+                    con.execute("SELECT 1 FROM alunos WHERE id = ?", (op["id_aluno"],)).fetchone()):
+                con.execute("INSERT OR IGNORE INTO espera (evento_id, id_aluno) VALUES (?, ?)",
+                            (op["evento"], op["id_aluno"]))
+        elif tipo == "espera_saida":
+            con.execute("DELETE FROM espera WHERE evento_id = ? AND id_aluno = ?", (op["evento"], op["id_aluno"]))
+        elif tipo == "avisos_lidos":
+            con.executemany("DELETE FROM avisos WHERE evento_id = ? AND id_aluno = ?",
+                            [(id_evento, op["id_aluno"]) for id_evento in op["eventos"]])
+        elif tipo == "evento_cadastrado":
+            evento = op["evento"]
+            self._avancar_sequencia("evento", evento["id"])
+            con.execute("INSERT OR IGNORE INTO eventos (id, chave, nome, data, descricao, vagas, status) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (evento["id"], evento["nome"].strip().lower(), evento["nome"], evento["data"],
+                         evento.get("descricao", ""), evento["vagas"], evento.get("status")))
+        elif tipo == "evento_atualizado":
+            id_evento = op["evento"]
+            campos = {campo: valor for campo, valor in op["campos"].items() if campo in CAMPOS_EVENTO}
+            if not campos:
+                return
+            if "nome" in campos:
+                campos["chave"] = campos["nome"].strip().lower()
+            atribuicoes = ", ".join(f"{campo} = ?" for campo in campos)
+            con.execute(f"UPDATE eventos SET {atribuicoes} WHERE id = ?", (*campos.values(), id_evento))
+            self._promover(op)
+        elif tipo == "evento_excluido":
+            con.execute("DELETE FROM eventos WHERE id = ?", (op["evento"],))
+        elif tipo == "usuario_cadastrado":
+            usuario = op["usuario"]
+            self._avancar_sequencia(usuario["tipo"], usuario["id"])
+            if usuario["tipo"] == "aluno":
+                con.execute("INSERT OR IGNORE INTO alunos (id, nome, email, curso) VALUES (?, ?, ?, ?)",
+                            (usuario["id"], usuario["nome"], usuario["email"], usuario.get("curso")))
+            else:
+                con.execute("INSERT OR IGNORE INTO coordenadores (id, nome, email) VALUES (?, ?, ?)",
+                            (usuario["id"], usuario["nome"], usuario["email"]))
+        elif tipo == "usuario_excluido":
+            if op["tipo"] == "aluno":
+                for (id_evento,) in con.execute(
+                        "SELECT evento_id FROM inscricoes WHERE id_aluno = ?", (op["id"],)).fetchall():
+                    self.registrar({"op": "cancelamento", "evento": id_evento, "id_aluno": op["id"]})
+                con.execute("DELETE FROM espera WHERE id_aluno = ?", (op["id"],))
+                con.execute("DELETE FROM avisos WHERE id_aluno = ?", (op["id"],))
+                con.execute("DELETE FROM alunos WHERE id = ?", (op["id"],))
+            else:
+                con.execute("DELETE FROM coordenadores WHERE id = ?", (op["id"],))
+
+    def _promover(self, op):
+        """Move os alunos promovidos pela operação da fila de espera para as inscrições."""
+        con = self._conexao
+        for promovido in op.get("promovidos", ()):
+            self._avancar_sequencia("inscricao", promovido["id_inscricao"])
+            con.execute("DELETE FROM espera WHERE evento_id = ? AND id_aluno = ?", (op["evento"], promovido["id_aluno"]))
+            if not con.execute("SELECT 1 FROM alunos WHERE id = ?", (promovido["id_aluno"],)).fetchone():
+                continue
+            inseridas = con.execute(
+                "INSERT OR IGNORE INTO inscricoes (evento_id, id_aluno, id_inscricao) VALUES (?, ?, ?)",
+                (op["evento"], promovido["id_aluno"], promovido["id_inscricao"])).rowcount
+            if inseridas:
+                con.execute("INSERT OR IGNORE INTO avisos (evento_id, id_aluno) VALUES (?, ?)",
+                            (op["evento"], promovido["id_aluno"]))
+
+    def registrar_lote(self, ops):
+        """Grava várias operações dentro da mesma transação."""
+        for op in ops:
+            self.registrar(op)
+
+    def apos_registro(self):
+        pass
+
+    def gravar(self, estado, partes):
+        """Substitui o conteúdo das tabelas correspondentes às partes do estado recebidas."""
+        con = self._conexao
+        con.executemany("INSERT OR REPLACE INTO sequencias (entidade, proximo) VALUES (?, ?)",
+                        list(estado["sequencias"].items()))
+        if "eventos" in partes:
+            con.execute("DELETE FROM espera")
+            con.execute("DELETE FROM avisos")
+            con.execute("DELETE FROM inscricoes")
+            con.execute("DELETE FROM eventos")
+            con.executemany(
+                "INSERT INTO eventos (id, chave, nome, data, descricao, vagas, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(evento["id"], evento["nome"].strip().lower(), evento["nome"], evento["data"],
+                  evento.get("descricao", ""), evento["vagas"], evento.get("status")) for evento in estado["eventos"]])
+            con.executemany(
+                "INSERT OR IGNORE INTO inscricoes (evento_id, id_aluno, id_inscricao) VALUES (?, ?, ?)",
+                [(id_evento, id_aluno, id_inscricao)
+                 for id_evento in estado["inscricoes"].ids_eventos() if id_evento in estado["eventos_por_id"]
+                 for id_inscricao, id_aluno in estado["inscricoes"].do_evento(id_evento)])
+            espera = estado["espera"]
+            ids_eventos = [id_evento for id_evento in espera.ids_eventos() if id_evento in estado["eventos_por_id"]]
+            con.executemany("INSERT OR IGNORE INTO espera (evento_id, id_aluno) VALUES (?, ?)",
+                            [(id_evento, id_aluno) for id_evento in ids_eventos for id_aluno in espera.do_evento(id_evento)])
+            con.executemany("INSERT OR IGNORE INTO avisos (evento_id, id_aluno) VALUES (?, ?)",
+                            [(id_evento, id_aluno) for id_evento in ids_eventos
+                             for id_aluno in espera.avisos_do_evento(id_evento)])
+        if "alunos" in partes:
+            con.execute("DELETE FROM alunos")
+            con.executemany("INSERT INTO alunos (id, nome, email, curso) VALUES (?, ?, ?, ?)",
+                            [(id_aluno, a["nome"], a["email"], a.get("curso")) for id_aluno, a in estado["alunos"].items()])
+        if "coordenadores" in partes:
+            con.execute("DELETE FROM coordenadores")
+            con.executemany("INSERT INTO coordenadores (id, nome, email) VALUES (?, ?, ?)",
+                            [(id_coord, c["nome"], c["email"]) for id_coord, c in estado["coordenadores"].items()])
+        self._versao = self._versao_atual()
+
+    def compactar(self, estado):
+        """No SQLite cada operação já é gravada no lugar; não há diário próprio a compactar."""
+        pass
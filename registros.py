@@ -0,0 +1,157 @@
+import sys
+from collections.abc import MutableMapping
+
+# ====================================
+# Registros Compactos (eventos e usuários)
+# ====================================
+# Eventos, alunos e coordenadores ficam em memória como objetos com __slots__ em
+# vez de dicionários: cada registro ocupa só os ponteiros dos seus campos, sem a
+# tabela de hash de um dicionário por registro. Os textos que se repetem muito (o
+# tipo do usuário, o curso, o status do evento, os IDs dos alunos, que também
+# aparecem na tabela de inscrições, e os emails, que também são as chaves do
+# índice de emails) são internados com sys.intern, de modo que cada
+# valor distinto existe uma única vez na memória.
+#
+# Os registros se comportam como os dicionários de antes (evento["nome"],
+# evento.get("status"), "status" in evento, evento.update(...), dict(evento)),
+# então o restante do código não precisa saber a diferença. Na gravação eles são
+# convertidos de volta para dicionários com para_dict(), no mesmo formato JSON.
+# Campos fora dos previstos (dados de versões futuras ou antigas) são preservados.
+_AUSENTE = object()
+
+
+def internar(texto):
+    """Interna o texto (a mesma instância para valores iguais); outros valores passam direto."""
+    return sys.intern(texto) if type(texto) is str else texto
+
+
+class Registro(MutableMapping):
+    """Base dos registros: os campos de CAMPOS ficam em slots; os demais, em _extras."""
+    __slots__ = ("_extras",)
+    CAMPOS = ()
+    INTERNADOS = frozenset()
+    _CONJUNTO_CAMPOS = frozenset()
+
+    def __init__(self, dados=(), **campos):
+        self._extras = None
+        for campo in self.CAMPOS:
+            setattr(self, campo, _AUSENTE)
+        # O mesmo que self.update(dados, **campos), sem passar por __setitem__ a
+        # cada campo: é o caminho de todos os registros lidos na carga.
+        conjunto, internados = self._CONJUNTO_CAMPOS, self.INTERNADOS
+        for chave, valor in dict(dados, **campos).items():
+            if chave in internados and type(valor) is str:
+                valor = sys.intern(valor)
+            if chave in conjunto:
+                setattr(self, chave, valor)
+            else:
+                if self._extras is None:
+                    self._extras = {}
+                self._extras[chave] = valor
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria o registro a partir do dicionário gravado (ou devolve o próprio registro)."""
+        return dados if type(dados) is cls else cls(dados)
+
+    def para_dict(self):
+        """Dicionário no formato gravado em JSON, com os campos na ordem de CAMPOS."""
+        return dict(self.items())
+
+    def __getitem__(self, chave):
+        if chave in self._CONJUNTO_CAMPOS:
+            valor = getattr(self, chave)
+        elif self._extras is not None:
+            valor = self._extras.get(chave, _AUSENTE)
+        else:
+            valor = _AUSENTE
+        if valor is _AUSENTE:
+            raise KeyError(chave)
+        return valor
+
+    def __setitem__(self, chave, valor):
+        if chave in self.INTERNADOS:
+            valor = internar(valor)
+        if chave in self._CONJUNTO_CAMPOS:
+            setattr(self, chave, valor)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[chave] = valor
+
+    def __delitem__(self, chave):
+        if chave in self._CONJUNTO_CAMPOS and getattr(self, chave) is not _AUSENTE:
+            setattr(self, chave, _AUSENTE)
+        elif self._extras is not None and chave in self._extras:
+            del self._extras[chave]
+        else:
+            raise KeyError(chave)
+
+    def __iter__(self):
+        for campo in self.CAMPOS:
+            if getattr(self, campo) is not _AUSENTE:
+                yield campo
+        if self._extras is not None:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        # "if evento:" é comum no código; sem isto o teste passaria por __len__ e
+        # percorreria todos os campos. Como um dicionário, só o registro vazio é falso.
+        for campo in self.CAMPOS:
+            if getattr(self, campo) is not _AUSENTE:
+                return True
+        return bool(self._extras)
+
+    def __contains__(self, chave):
+        if chave in self._CONJUNTO_CAMPOS:
+            return getattr(self, chave) is not _AUSENTE
+        return self._extras is not None and chave in self._extras
+
+    def get(self, chave, padrao=None):
+        # Mais rápido que o get genérico de MutableMapping, que passa por uma exceção.
+        if chave in self._CONJUNTO_CAMPOS:
+            valor = getattr(self, chave)
+        elif self._extras is not None:
+            valor = self._extras.get(chave, _AUSENTE)
+        else:
+            valor = _AUSENTE
+        return padrao if valor is _AUSENTE else valor
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.para_dict()!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._CONJUNTO_CAMPOS = frozenset(cls.CAMPOS)
+
+
+class Evento(Registro):
+    __slots__ = ("id", "nome", "data", "descricao", "vagas", "status")
+    CAMPOS = __slots__
+    INTERNADOS = frozenset({"status"})
+
+
+class Aluno(Registro):
+    __slots__ = ("id", "nome", "email", "tipo", "curso")
+    CAMPOS = __slots__
+    INTERNADOS = frozenset({"id", "email", "tipo", "curso"})
+
+
+class Coordenador(Registro):
+    __slots__ = ("id", "nome", "email", "tipo", "curso")
+    CAMPOS = __slots__
+    INTERNADOS = frozenset({"id", "email", "tipo", "curso"})
+
+
+def usuarios_de_dict(usuarios, classe):
+    """{id: registro} a partir do formato gravado {id: dicionário}, com os IDs internados."""
+    return {internar(user_id): classe.de_dict(dados) for user_id, dados in usuarios.items()}
+
+def usuarios_para_dict(usuarios):
+    return {user_id: registro.para_dict() for user_id, registro in usuarios.items()}
+
+def eventos_para_lista(eventos):
+    return [evento.para_dict() for evento in eventos]
@@ -0,0 +1,430 @@
+import asyncio
+import json
+import re
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import metricas
+import operacoes
+from fila_inscricoes import FilaInscricoes, JANELA_LOTE, TAMANHO_LOTE
+from mudancas import feed
+from operacoes import ErroOperacao, NaoEncontrado, INTERVALO_SINCRONIZACAO
+from paginacao import TAMANHO_PAGINA
+from persistencia import ativar_mudancas, sincronizar
+from sessoes import abrir_sessao, usuario_da_sessao, encerrar_sessao, carregar_sessoes, salvar_sessoes
+
+# ==============================
+# Modo Serviço (HTTP/JSON)
+# ==============================
+# Servidor asyncio que expõe as mesmas operações do menu como uma API JSON, para
+# atender muitos clientes simultâneos em um único processo, sobre os dados em
+# memória. As operações de persistência (que podem fazer fsync) rodam em threads
+# via asyncio.to_thread, para não travar o laço de eventos.
+#
+# As listagens de eventos e de inscrições aceitam ?limite=N (e ?ordem=data|nome|vagas
+# para eventos); a resposta traz então o cursor "proximo", a ser enviado em ?cursor=
+# para obter a página seguinte.
+#
+# GET /eventos também aceita ?dia=DD/MM/AAAA, ?mes=MM/AAAA ou ?proximos=N (dias),
+# devolvendo os eventos do período em ordem de data.
+#
+# GET /metricas devolve as métricas das operações (ver metricas.py) no formato de
+# texto do Prometheus, ou em JSON com ?formato=json.
+#
+# GET /mudancas?desde=N (e, opcionalmente, &evento=ID e &espera=segundos) é o feed
+# de mudanças dos eventos e das vagas (ver mudancas.py), em long-poll: a resposta
+# vem assim que houver mudanças depois da sequência N, ou vazia ao fim da espera, e
+# traz "ultima", a sequência a enviar no próximo pedido.
+#
+# Os eventos são identificados nas rotas pelo ID numérico ("id" nas respostas).
+#
+# Um aluno que encontra o evento lotado pode entrar na fila de espera
+# (POST /eventos/<id>/espera); quando uma vaga é liberada ele é inscrito
+# automaticamente, e GET /alunos/<id>/avisos devolve (uma única vez) os eventos em
+# que isso aconteceu.
+#
+# As inscrições (POST /eventos/<id>/inscricoes) passam pela FilaInscricoes: os
+# pedidos que chegam juntos são conferidos e gravados em lote, com um único fsync
+# (ver fila_inscricoes.py). A janela e o tamanho dos lotes são parâmetros de iniciar.
+# A rota só envia o pedido e devolve uma RespostaPendente: o resultado é aguardado no
+# laço de eventos, sem ocupar uma thread por pedido, então o tamanho dos lotes não
+# fica limitado ao número de threads do asyncio.to_thread.
+#
+# O usuário que faz a requisição é identificado pelo cabeçalho X-Sessao, com o
+# token devolvido por POST /login (ver sessoes.py), ou pelo cabeçalho X-Usuario
+# (email). DELETE /sessoes/<token> encerra a sessão; as sessões abertas são gravadas
+# ao encerrar o serviço e recuperadas ao iniciá-lo.
+# Cadastro, alteração e exclusão de eventos e a lista de inscritos exigem um
+# coordenador; um aluno só pode inscrever ou cancelar a si mesmo.
+MOTIVOS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+           403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+ESPERA_PADRAO_MUDANCAS = 30
+ESPERA_MAXIMA_MUDANCAS = 60
+
+_fila = None  # FilaInscricoes do serviço, criada em servir
+
+
+class ErroHttp(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class RespostaPendente:
+    """Dados de uma resposta que dependem de um pedido ainda em andamento (um Future
+        da FilaInscricoes). Quando o pedido termina, concluir() monta os dados.
+    """
+
+    def __init__(self, pedido, concluir):
+        self.pedido = pedido
+        self.concluir = concluir
+
+
+def _exigir_usuario(usuario, *tipos):
+    if usuario is None:
+        raise ErroHttp(401, "Faça login e envie o token no cabeçalho X-Sessao (ou o email em X-Usuario).")
+    if tipos and usuario["tipo"] not in tipos:
+        raise ErroHttp(403, "Operação permitida apenas para " + " ou ".join(tipos) + ".")
+
+def _exigir_proprio_aluno(usuario, id_aluno):
+    _exigir_usuario(usuario)
+    if usuario["tipo"] == "aluno" and usuario["id"] != id_aluno:
+        raise ErroHttp(403, "Um aluno só pode alterar as próprias inscrições.")
+
+def _paginacao(consulta):
+    """Lê ?limite= e ?cursor= da URL. Retorna (limite ou None, cursor ou None)."""
+    limite = consulta.get("limite", [None])[0]
+    if limite is not None:
+        if not limite.isdigit() or int(limite) <= 0:
+            raise ErroHttp(400, "O parâmetro 'limite' deve ser um número maior que zero.")
+        limite = int(limite)
+    return limite, consulta.get("cursor", [None])[0]
+
+def _campo(corpo, nome, tipo=str):
+    valor = corpo.get(nome)
+    if not isinstance(valor, tipo) or isinstance(valor, bool):
+        raise ErroHttp(400, f"Campo '{nome}' ausente ou inválido.")
+    return valor
+
+def _campo_opcional(corpo, nome, padrao=None, tipo=str):
+    """Como _campo, mas retorna 'padrao' se o campo não foi enviado (ou veio nulo)."""
+    return padrao if corpo.get(nome) is None else _campo(corpo, nome, tipo)
+
+# =======================
+# Rotas (uma por operação)
+# =======================
+def rota_metricas(usuario, corpo, consulta):
+    if consulta.get("formato", [""])[0] == "json":
+        return 200, metricas.instantaneo()
+    return 200, metricas.texto_prometheus()
+
+def rota_registrar(usuario, corpo, consulta):
+    return 201, operacoes.registrar_usuario(_campo(corpo, "nome"), _campo(corpo, "email"),
+                                            _campo(corpo, "tipo"), _campo_opcional(corpo, "curso"))
+
+def rota_login(usuario, corpo, consulta):
+    encontrado = operacoes.autenticar_usuario(_campo(corpo, "email").strip().lower())
+    if not encontrado:
+        raise NaoEncontrado("Usuário não encontrado.")
+    return 200, {**encontrado.para_dict(), "token": abrir_sessao(encontrado)}
+
+def rota_encerrar_sessao(usuario, corpo, consulta, token):
+    if not encerrar_sessao(token):
+        raise NaoEncontrado("Sessão não encontrada.")
+    return 204, None
+
+def rota_listar_eventos(usuario, corpo, consulta):
+    termo = consulta.get("busca", [""])[0]
+    if termo:
+        return 200, operacoes.pesquisar_eventos(termo)
+    if {"dia", "mes", "proximos"} & consulta.keys():
+        proximos = consulta.get("proximos", [None])[0]
+        if proximos is not None:
+            if not proximos.isdigit():
+                raise ErroHttp(400, "O parâmetro 'proximos' deve ser um número de dias.")
+            proximos = int(proximos)
+        eventos = operacoes.eventos_do_calendario(consulta.get("dia", [None])[0], consulta.get("mes", [None])[0], proximos)
+        return 200, [operacoes.resumo_evento(evento) for evento in eventos]
+    limite, cursor = _paginacao(consulta)
+    ordem = consulta.get("ordem", [None])[0]
+    if limite is None and cursor is None and ordem is None:
+        return 200, operacoes.listar_eventos()
+    eventos, proximo = operacoes.pagina_eventos(ordem, cursor, limite or TAMANHO_PAGINA)
+    return 200, {"eventos": eventos, "proximo": proximo}
+
+def rota_cadastrar_evento(usuario, corpo, consulta):
+    _exigir_usuario(usuario, "coordenador")
+    evento = operacoes.cadastrar_evento(_campo(corpo, "nome"), _campo(corpo, "data"),
+                                        _campo_opcional(corpo, "descricao", ""), _campo(corpo, "vagas", int))
+    return 201, operacoes.resumo_evento(evento)
+
+def rota_atualizar_evento(usuario, corpo, consulta, id_evento):
+    _exigir_usuario(usuario, "coordenador")
+    for nome, tipo in (("nome", str), ("data", str), ("descricao", str), ("vagas", int)):
+        if nome in corpo:
+            _campo(corpo, nome, tipo)
+    return 200, operacoes.resumo_evento(operacoes.atualizar_evento(id_evento, corpo))
+
+def rota_excluir_evento(usuario, corpo, consulta, id_evento):
+    _exigir_usuario(usuario, "coordenador")
+    operacoes.excluir_evento(id_evento)
+    return 204, None
+
+def rota_inscrever(usuario, corpo, consulta, id_evento):
+    id_aluno = _campo_opcional(corpo, "id_aluno", usuario["id"] if usuario else None)
+    _exigir_proprio_aluno(usuario, id_aluno)
+    pedido = _fila.enviar(id_evento, id_aluno)
+    return 201, RespostaPendente(pedido, lambda: operacoes.resumo_evento(operacoes.obter_evento(id_evento)))
+
+def rota_cancelar(usuario, corpo, consulta, id_evento, id_aluno):
+    _exigir_proprio_aluno(usuario, id_aluno)
+    operacoes.cancelar_inscricao(id_evento, id_aluno)
+    return 204, None
+
+def rota_inscricoes_evento(usuario, corpo, consulta, id_evento):
+    _exigir_usuario(usuario, "coordenador")
+    limite, cursor = _paginacao(consulta)
+    if limite is None and cursor is None:
+        return 200, operacoes.inscricoes_do_evento(id_evento)
+    inscricoes, proximo = operacoes.pagina_inscricoes_evento(id_evento, cursor, limite or TAMANHO_PAGINA)
+    return 200, {"inscricoes": inscricoes, "proximo": proximo}
+
+def rota_entrar_espera(usuario, corpo, consulta, id_evento):
+    id_aluno = _campo_opcional(corpo, "id_aluno", usuario["id"] if usuario else None)
+    _exigir_proprio_aluno(usuario, id_aluno)
+    return 201, {"posicao": operacoes.entrar_fila_espera(id_evento, id_aluno)}
+
+def rota_sair_espera(usuario, corpo, consulta, id_evento, id_aluno):
+    _exigir_proprio_aluno(usuario, id_aluno)
+    operacoes.sair_fila_espera(id_evento, id_aluno)
+    return 204, None
+
+def rota_avisos_aluno(usuario, corpo, consulta, id_aluno):
+    _exigir_proprio_aluno(usuario, id_aluno)
+    return 200, [operacoes.resumo_evento(evento) for evento in operacoes.avisos_promocao(id_aluno)]
+
+def rota_inscricoes_aluno(usuario, corpo, consulta, id_aluno):
+    _exigir_proprio_aluno(usuario, id_aluno)
+    return 200, [operacoes.resumo_evento(evento) for evento in operacoes.eventos_do_aluno(id_aluno)]
+
+ROTAS = [
+    ("POST", r"/usuarios", rota_registrar),
+    ("POST", r"/login", rota_login),
+    ("DELETE", r"/sessoes/([^/]+)", rota_encerrar_sessao),
+    ("GET", r"/eventos", rota_listar_eventos),
+    ("POST", r"/eventos", rota_cadastrar_evento),
+    ("PATCH", r"/eventos/([^/]+)", rota_atualizar_evento),
+    ("DELETE", r"/eventos/([^/]+)", rota_excluir_evento),
+    ("GET", r"/eventos/([^/]+)/inscricoes", rota_inscricoes_evento),
+    ("POST", r"/eventos/([^/]+)/inscricoes", rota_inscrever),
+    ("DELETE", r"/eventos/([^/]+)/inscricoes/([^/]+)", rota_cancelar),
+    ("POST", r"/eventos/([^/]+)/espera", rota_entrar_espera),
+    ("DELETE", r"/eventos/([^/]+)/espera/([^/]+)", rota_sair_espera),
+    ("GET", r"/alunos/([^/]+)/inscricoes", rota_inscricoes_aluno),
+    ("GET", r"/alunos/([^/]+)/avisos", rota_avisos_aluno),
+    ("GET", r"/metricas", rota_metricas),
+]
+ROTAS = [(metodo, re.compile(padrao + r"/?"), funcao) for metodo, padrao, funcao in ROTAS]
+
+
+def atender(metodo, caminho, cabecalhos, corpo):
+    """Executa a requisição e retorna (status, dados). Roda fora do laço de eventos."""
+    url = urlsplit(caminho)
+    metodo_permitido = False
+    for metodo_rota, padrao, funcao in ROTAS:
+        encontrado = padrao.fullmatch(url.path)
+        if not encontrado:
+            continue
+        metodo_permitido = True
+        if metodo_rota != metodo:
+            continue
+        try:
+            dados = json.loads(corpo) if corpo else {}
+        except (ValueError, UnicodeDecodeError):
+            return 400, {"erro": "Corpo da requisição não é um JSON válido."}
+        if not isinstance(dados, dict):
+            return 400, {"erro": "O corpo da requisição deve ser um objeto JSON."}
+        token, email = cabecalhos.get("x-sessao"), cabecalhos.get("x-usuario")
+        if token:
+            usuario = usuario_da_sessao(token)
+            if usuario is None:
+                return 401, {"erro": "Sessão inválida ou expirada. Faça login novamente."}
+        else:
+            usuario = operacoes.autenticar_usuario(email.strip().lower()) if email else None
+            if email and usuario is None:
+                return 401, {"erro": "Usuário não encontrado."}
+        argumentos = [unquote(parte) for parte in encontrado.groups()]
+        try:
+            with metricas.medir(funcao.__name__):
+                return funcao(usuario, dados, parse_qs(url.query), *argumentos)
+        except ErroHttp as erro:
+            return erro.status, {"erro": str(erro)}
+        except NaoEncontrado as erro:
+            return 404, {"erro": str(erro)}
+        except ErroOperacao as erro:
+            return 400, {"erro": str(erro)}
+    if metodo_permitido:
+        return 405, {"erro": "Método não permitido."}
+    return 404, {"erro": "Rota não encontrada."}
+
+async def concluir_pendente(status, pendente):
+    """Aguarda o pedido de uma RespostaPendente no laço de eventos. Retorna (status, dados)."""
+    try:
+        await asyncio.wrap_future(pendente.pedido)
+        return status, await asyncio.to_thread(pendente.concluir)
+    except NaoEncontrado as erro:
+        return 404, {"erro": str(erro)}
+    except ErroOperacao as erro:
+        return 400, {"erro": str(erro)}
+
+# =============================
+# Feed de Mudanças (long-poll)
+# =============================
+# Os clientes que esperam mudanças ficam no laço de eventos, e não nas threads que
+# atendem as demais requisições. Cada publicação do feed (feita na thread que
+# gravou) acorda todos eles, trocando o asyncio.Event _novidade; enquanto houver
+# alguém esperando, _sincronizar_assinantes confere a cada INTERVALO_SINCRONIZACAO o
+# que outros processos gravaram.
+_novidade = None
+_assinantes = 0
+
+def _parametros_mudancas(consulta):
+    """Lê ?desde=, ?evento= e ?espera= da URL. Retorna (desde, id_evento, espera)."""
+    valores = []
+    for nome in ("desde", "evento", "espera"):
+        valor = consulta.get(nome, [None])[0]
+        if valor is not None and not valor.isdigit():
+            raise ErroHttp(400, f"O parâmetro '{nome}' deve ser um número.")
+        valores.append(int(valor) if valor is not None else None)
+    desde, id_evento, espera = valores
+    return desde, id_evento, min(ESPERA_PADRAO_MUDANCAS if espera is None else espera, ESPERA_MAXIMA_MUDANCAS)
+
+def _avisar_novidade():
+    global _novidade
+    _novidade.set()
+    _novidade = asyncio.Event()
+
+async def _sincronizar_assinantes():
+    while True:
+        await asyncio.sleep(INTERVALO_SINCRONIZACAO)
+        if _assinantes:
+            await asyncio.to_thread(sincronizar)
+
+async def atender_mudancas(consulta):
+    """Atende GET /mudancas, esperando no laço de eventos. Retorna (status, dados)."""
+    global _assinantes
+    try:
+        desde, id_evento, espera = _parametros_mudancas(consulta)
+        if id_evento is not None:
+            await asyncio.to_thread(operacoes.obter_evento, id_evento)
+    except ErroHttp as erro:
+        return erro.status, {"erro": str(erro)}
+    except NaoEncontrado as erro:
+        return 404, {"erro": str(erro)}
+    await asyncio.to_thread(ativar_mudancas)
+    if desde is None:
+        desde = feed.ultima
+    laco = asyncio.get_running_loop()
+    limite = laco.time() + espera
+    _assinantes += 1
+    try:
+        while True:
+            novidade = _novidade
+            mudancas, ultima, perdidas = feed.desde(desde, id_evento)
+            restante = limite - laco.time()
+            if mudancas or perdidas or restante <= 0:
+                return 200, {"mudancas": mudancas, "ultima": ultima, "perdidas": perdidas}
+            try:
+                await asyncio.wait_for(novidade.wait(), restante)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _assinantes -= 1
+
+# ==========================
+# Servidor HTTP/1.1 mínimo
+# ==========================
+async def _responder(escritor, status, dados, manter):
+    if isinstance(dados, str):
+        tipo, corpo = "text/plain; version=0.0.4", dados.encode("utf-8")
+    else:
+        tipo, corpo = "application/json", b"" if dados is None else json.dumps(dados, ensure_ascii=False).encode("utf-8")
+    cabecalho = (f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+                 f"Content-Type: {tipo}; charset=utf-8\r\n"
+                 f"Content-Length: {len(corpo)}\r\n"
+                 f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n")
+    escritor.write(cabecalho.encode("latin-1") + corpo)
+    await escritor.drain()
+
+async def tratar_conexao(leitor, escritor):
+    """Atende as requisições de uma conexão (com keep-alive) até o cliente fechar."""
+    try:
+        while True:
+            linha = await leitor.readline()
+            if not linha.strip():
+                break
+            try:
+                metodo, caminho, versao = linha.decode("latin-1").split()
+            except ValueError:
+                await _responder(escritor, 400, {"erro": "Requisição inválida."}, False)
+                break
+            cabecalhos = {}
+            while True:
+                linha = await leitor.readline()
+                if linha in (b"\r\n", b"\n", b""):
+                    break
+                nome, _, valor = linha.decode("latin-1").partition(":")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+            tamanho = int(cabecalhos.get("content-length", "0") or 0)
+            if tamanho > TAMANHO_MAXIMO_CORPO:
+                await _responder(escritor, 413, {"erro": "Corpo da requisição muito grande."}, False)
+                break
+            corpo = await leitor.readexactly(tamanho) if tamanho else b""
+            manter = (cabecalhos.get("connection", "").lower() != "close" and versao == "HTTP/1.1")
+            try:
+                url = urlsplit(caminho)
+                if metodo.upper() == "GET" and url.path.rstrip("/") == "/mudancas":
+                    status, dados = await atender_mudancas(parse_qs(url.query))
+                else:
+                    status, dados = await asyncio.to_thread(atender, metodo.upper(), caminho, cabecalhos, corpo)
+                    if isinstance(dados, RespostaPendente):
+                        status, dados = await concluir_pendente(status, dados)
+            except Exception as erro:
+                status, dados = 500, {"erro": f"Erro interno: {erro}"}
+            await _responder(escritor, status, dados, manter)
+            if not manter:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        escritor.close()
+
+async def servir(host="127.0.0.1", porta=8080, janela_lote=JANELA_LOTE, tamanho_lote=TAMANHO_LOTE):
+    global _fila, _novidade
+    _fila = FilaInscricoes(janela_lote, tamanho_lote)
+    carregar_sessoes()
+    laco = asyncio.get_running_loop()
+    _novidade = asyncio.Event()
+
+    def ouvinte():
+        laco.call_soon_threadsafe(_avisar_novidade)
+
+    feed.ouvir(ouvinte)
+    sincronizacao = asyncio.create_task(_sincronizar_assinantes())
+    try:
+        servidor = await asyncio.start_server(tratar_conexao, host, porta)
+        print(f"🌐 Serviço de eventos em http://{host}:{porta} (Ctrl+C para encerrar)")
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        sincronizacao.cancel()
+        feed.deixar_de_ouvir(ouvinte)
+        _fila.encerrar()
+        salvar_sessoes()
+
+def iniciar(host="127.0.0.1", porta=8080, janela_lote=JANELA_LOTE, tamanho_lote=TAMANHO_LOTE):
+    try:
+        asyncio.run(servir(host, porta, janela_lote, tamanho_lote))
+    except KeyboardInterrupt:
+        print("\n👋 Serviço encerrado.\n")
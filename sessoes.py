@@ -0,0 +1,147 @@
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from persistencia import data_dir, escrever_snapshot, ler_snapshot, carregar_usuarios, usuario_em_memoria
+
+# ==========================
+# Sessões (tokens de login)
+# ==========================
+# O login gera um token opaco; as requisições seguintes se identificam por ele e o
+# registro do usuário sai de um cache em memória, em O(1) e sem ler arquivos nem
+# pegar a trava do armazenamento.
+#
+# Cada sessão guarda o tipo e o ID do usuário, o instante em que expira e o
+# registro resolvido. A validade é renovada a cada uso (VALIDADE_SESSAO segundos
+# sem uso encerram a sessão) e, acima de MAXIMO_SESSOES, sai a sessão usada há mais
+# tempo (LRU). Antes de devolver o registro guardado, a sessão confere se ele ainda
+# é o mesmo objeto mantido pela persistência (persistencia.usuario_em_memoria): se o
+# usuário foi excluído, ou os dados foram relidos do disco, o registro é buscado de
+# novo, e a sessão de um usuário que não existe mais é encerrada.
+#
+# A sessão do menu interativo é aberta com expira=False: quem deixa o menu parado,
+# ou acompanha as vagas de um evento por mais de VALIDADE_SESSAO segundos, não é
+# desconectado. Só os tokens do modo serviço expiram.
+#
+# Os tokens não são guardados, só o seu hash SHA-256. Com salvar_sessoes e
+# carregar_sessoes (usadas pelo modo serviço) as sessões sobrevivem a um reinício
+# do processo, sem obrigar todos os clientes a fazer login de novo.
+VALIDADE_SESSAO = 30 * 60
+MAXIMO_SESSOES = 10000
+
+# Grava as sessões em data/sessoes.json ao encerrar o serviço (ver salvar_sessoes).
+SESSOES_PERSISTENTES = True
+
+sessoes_json = os.path.join(data_dir, "sessoes.json")
+
+
+def _chave(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class CacheSessoes:
+    """Sessões abertas: hash do token -> [tipo, id do usuário, expira em (None: não expira),
+        registro ou None], em ordem de uso (a mais recente no fim).
+    """
+
+    def __init__(self, validade=VALIDADE_SESSAO, maximo=MAXIMO_SESSOES):
+        self.validade = validade
+        self.maximo = maximo
+        self._sessoes = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessoes)
+
+    def abrir(self, usuario, expira=True):
+        """Abre uma sessão para o registro do usuário e retorna o token."""
+        token = secrets.token_urlsafe(32)
+        with self._trava:
+            self._sessoes[_chave(token)] = [usuario["tipo"], usuario["id"],
+                                            time.time() + self.validade if expira else None, usuario]
+            while len(self._sessoes) > self.maximo:
+                self._sessoes.popitem(last=False)
+        return token
+
+    def encerrar(self, token):
+        """Encerra a sessão (logout). Retorna False se ela não existia."""
+        with self._trava:
+            return self._sessoes.pop(_chave(token), None) is not None
+
+    def resolver(self, token):
+        """Registro do usuário da sessão, ou None se o token for inválido ou tiver expirado."""
+        chave = _chave(token)
+        agora = time.time()
+        with self._trava:
+            sessao = self._sessoes.get(chave)
+            if sessao is None:
+                return None
+            if sessao[2] is not None:
+                if sessao[2] <= agora:
+                    del self._sessoes[chave]
+                    return None
+                sessao[2] = agora + self.validade
+            self._sessoes.move_to_end(chave)
+            tipo, user_id, _, registro = sessao
+        if registro is not None and usuario_em_memoria(tipo, user_id) is registro:
+            return registro
+        # O registro mudou (ou a sessão veio do disco): busca o atual no armazenamento.
+        alunos, coordenadores = carregar_usuarios()
+        registro = (alunos if tipo == "aluno" else coordenadores).get(user_id)
+        with self._trava:
+            if registro is None:
+                self._sessoes.pop(chave, None)
+            elif chave in self._sessoes:
+                self._sessoes[chave][3] = registro
+        return registro
+
+    def para_dict(self):
+        """Sessões ainda válidas no formato gravado: hash do token -> [tipo, id, expira em].
+            As sessões que não expiram (as do menu) não são gravadas.
+        """
+        agora = time.time()
+        with self._trava:
+            return {chave: [tipo, user_id, expira_em]
+                    for chave, (tipo, user_id, expira_em, _) in self._sessoes.items()
+                    if expira_em is not None and expira_em > agora}
+
+    def carregar_dict(self, dados):
+        """Acrescenta as sessões gravadas por para_dict que ainda não expiraram."""
+        agora = time.time()
+        with self._trava:
+            for chave, (tipo, user_id, expira_em) in sorted(dados.items(), key=lambda item: item[1][2]):
+                if expira_em > agora and chave not in self._sessoes:
+                    self._sessoes[chave] = [tipo, user_id, expira_em, None]
+            while len(self._sessoes) > self.maximo:
+                self._sessoes.popitem(last=False)
+
+
+_cache = CacheSessoes()
+
+
+def abrir_sessao(usuario, expira=True):
+    """Abre uma sessão para o usuário (o registro devolvido pelo login) e retorna o token.
+        Com expira=False a sessão só termina com encerrar_sessao ou se o usuário for removido.
+    """
+    return _cache.abrir(usuario, expira)
+
+def usuario_da_sessao(token):
+    """Registro do usuário dono do token, ou None se a sessão for inválida ou tiver expirado."""
+    return _cache.resolver(token) if token else None
+
+def encerrar_sessao(token):
+    """Encerra a sessão do token. Retorna False se ela não existia."""
+    return _cache.encerrar(token)
+
+def salvar_sessoes():
+    """Grava as sessões válidas em data/sessoes.json (se SESSOES_PERSISTENTES)."""
+    if SESSOES_PERSISTENTES:
+        escrever_snapshot(sessoes_json, _cache.para_dict())
+
+def carregar_sessoes():
+    """Recupera as sessões gravadas por salvar_sessoes (se SESSOES_PERSISTENTES)."""
+    if SESSOES_PERSISTENTES and os.path.exists(sessoes_json):
+        _cache.carregar_dict(ler_snapshot(sessoes_json, {}))
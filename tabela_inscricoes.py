@@ -0,0 +1,152 @@
+from registros import internar
+
+# ======================
+# Tabela de Inscrições
+# ======================
+class TabelaInscricoes:
+    """Guarda cada inscrição uma única vez, com índices por evento e por aluno.
+
+    - _por_evento: ID do evento -> {id_aluno: id_inscricao}, na ordem de inscrição.
+      O tamanho de cada dicionário é a ocupação do evento (consulta O(1)).
+    - _por_aluno: id_aluno -> [ID do evento, ...]. Uma lista curta (um aluno tem
+      poucas inscrições) ocupa bem menos memória que um dicionário por aluno.
+
+    Como os eventos são identificados pelo ID, e não pelo nome, renomear um
+    evento não mexe em nada aqui. Os IDs dos alunos são internados (ver
+    registros.py): a mesma instância do texto serve ao dicionário de alunos e a
+    todas as inscrições do aluno.
+
+    O ID da inscrição é reservado na gravação (ver persistencia.reservar_ids) e
+    nunca muda: cancelar uma inscrição não renumera as demais, e um ID cancelado
+    não volta a ser usado. Como os IDs só crescem, a ordem de inscrição de um
+    evento também é a ordem dos IDs.
+    """
+
+    def __init__(self):
+        self._por_evento = {}
+        self._por_aluno = {}
+        self._maior_id = 0
+
+    def inscrever(self, id_evento, id_aluno, id_inscricao):
+        """Inscreve o aluno no evento. Retorna False se ele já estava inscrito."""
+        alunos_evento = self._por_evento.setdefault(id_evento, {})
+        if id_aluno in alunos_evento:
+            return False
+        id_aluno = internar(id_aluno)
+        alunos_evento[id_aluno] = id_inscricao
+        if id_inscricao > self._maior_id:
+            self._maior_id = id_inscricao
+        self._por_aluno.setdefault(id_aluno, []).append(id_evento)
+        return True
+
+    def cancelar(self, id_evento, id_aluno):
+        """Remove a inscrição do aluno no evento. Retorna False se ela não existia."""
+        alunos_evento = self._por_evento.get(id_evento, {})
+        if id_aluno not in alunos_evento:
+            return False
+        del alunos_evento[id_aluno]
+        eventos_aluno = self._por_aluno[id_aluno]
+        eventos_aluno.remove(id_evento)
+        if not eventos_aluno:
+            del self._por_aluno[id_aluno]
+        return True
+
+    def esta_inscrito(self, id_evento, id_aluno):
+        return id_aluno in self._por_evento.get(id_evento, {})
+
+    def ocupacao(self, id_evento):
+        """Número de inscritos no evento."""
+        return len(self._por_evento.get(id_evento, {}))
+
+    def do_evento(self, id_evento):
+        """Lista de (id_inscricao, id_aluno) do evento, na ordem de inscrição."""
+        return list(self.iterar_evento(id_evento))
+
+    def iterar_evento(self, id_evento, inicio=1):
+        """Gera (id_inscricao, id_aluno) do evento, na ordem de inscrição, a partir do ID 'inicio'."""
+        for id_aluno, id_inscricao in self._por_evento.get(id_evento, {}).items():
+            if id_inscricao >= inicio:
+                yield id_inscricao, id_aluno
+
+    def aluno_da_inscricao(self, id_evento, id_inscricao):
+        """ID do aluno da inscrição informada, ou None se ela não existe (ou foi cancelada)."""
+        for id_aluno, id_atual in self._por_evento.get(id_evento, {}).items():
+            if id_atual == id_inscricao:
+                return id_aluno
+        return None
+
+    def inscricoes_do_evento(self, id_evento):
+        """{id_aluno: id_inscricao} do evento (uma cópia), na ordem de inscrição."""
+        return dict(self._por_evento.get(id_evento, {}))
+
+    def substituir_evento(self, id_evento, inscricoes):
+        """Troca todas as inscrições do evento pelas recebidas (no formato de para_dict)."""
+        self.remover_evento(id_evento)
+        for id_aluno, id_inscricao in _normalizar(inscricoes).items():
+            self.inscrever(id_evento, id_aluno, id_inscricao)
+
+    def maior_id(self):
+        """Maior ID de inscrição já visto (0 se nenhum)."""
+        return self._maior_id
+
+    def do_aluno(self, id_aluno):
+        """Lista dos IDs dos eventos em que o aluno está inscrito."""
+        return list(self._por_aluno.get(id_aluno, ()))
+
+    def remover_evento(self, id_evento):
+        """Remove todas as inscrições de um evento."""
+        for id_aluno in list(self._por_evento.get(id_evento, {})):
+            self.cancelar(id_evento, id_aluno)
+        self._por_evento.pop(id_evento, None)
+
+    def ids_eventos(self):
+        return list(self._por_evento)
+
+    def para_dict(self):
+        """Formato gravado em eventos.json: {ID do evento (texto): {id_aluno: id_inscricao}}."""
+        return {str(id_evento): dict(alunos_evento) for id_evento, alunos_evento in self._por_evento.items()}
+
+    @classmethod
+    def de_dict(cls, inscricoes, eventos=()):
+        """Monta a tabela a partir do formato gravado em eventos.json (com os eventos
+        já identificados por ID; ver persistencia.migrar_ids_eventos).
+
+        Também aceita os formatos antigos: a lista [id_aluno, ...] na ordem de
+        inscrição e, antes dela, a lista de dicionários com id_inscricao, nome e email
+        do aluno, com os eventos trazendo a lista "inscritos" (removida dos eventos
+        recebidos). Nesses casos o ID da inscrição é a posição na lista, o mesmo
+        número que era exibido ao coordenador.
+        """
+        tabela = cls()
+        for id_evento, lista in inscricoes.items():
+            id_evento = int(id_evento)
+            lista = _normalizar(lista)
+            alunos_evento = tabela._por_evento.setdefault(id_evento, {})
+            if not alunos_evento:
+                # Caminho rápido (o caso comum): preenche os dois índices sem chamar inscrever.
+                alunos_evento.update((internar(id_aluno), id_inscricao) for id_aluno, id_inscricao in lista.items())
+                tabela._maior_id = max(tabela._maior_id, max(lista.values(), default=0))
+                por_aluno = tabela._por_aluno
+                for id_aluno in alunos_evento:
+                    if id_aluno in por_aluno:
+                        por_aluno[id_aluno].append(id_evento)
+                    else:
+                        por_aluno[id_aluno] = [id_evento]
+                continue
+            for id_aluno, id_inscricao in lista.items():
+                tabela.inscrever(id_evento, id_aluno, id_inscricao)
+        for evento in eventos:
+            inscritos = evento.pop("inscritos", None)
+            if inscritos and not tabela.ocupacao(evento["id"]):
+                for id_aluno, id_inscricao in _normalizar(inscritos).items():
+                    tabela.inscrever(evento["id"], id_aluno, id_inscricao)
+        return tabela
+
+
+def _normalizar(inscricoes):
+    """Converte as inscrições de um evento, em qualquer formato gravado, para {id_aluno: id_inscricao}."""
+    if isinstance(inscricoes, dict):
+        return inscricoes
+    if inscricoes and isinstance(inscricoes[0], dict):
+        inscricoes = [insc["id_aluno"] for insc in sorted(inscricoes, key=lambda insc: insc.get("id_inscricao", 0))]
+    return {id_aluno: posicao for posicao, id_aluno in enumerate(inscricoes, start=1)}